@@ -0,0 +1,11 @@
+"""核心PDF操作的性能基准
+
+用法（在项目根目录下运行）：
+
+    python -m benchmarks run --scale small --output results.json
+    python -m benchmarks compare before.json after.json
+
+测试文件由 corpus 模块按固定随机种子生成，同一规模下每次生成的文件完全相同，
+不同提交之间的测量结果因此可以直接比较。每个操作在独立的子进程中运行，
+记录耗时和峰值内存（RSS）。
+"""
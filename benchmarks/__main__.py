@@ -0,0 +1,83 @@
+"""基准测试命令行入口，见 benchmarks/__init__.py 中的用法"""
+import argparse
+import os
+import sys
+
+# 直接以 python benchmarks 运行时也能导入 src 和 benchmarks
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import harness  # noqa: E402
+
+
+def _format_bytes(value):
+    if value is None:
+        return '-'
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+def _print_result(result):
+    if result['status'] != 'ok':
+        print(f"{result['name']:<34} {result['status']:>8}  {result.get('message', '')}")
+        return
+    print(f"{result['name']:<34} {result['min']:>8.3f}s  median {result['median']:.3f}s  "
+          f"peak RSS {_format_bytes(result.get('peak_rss'))}  output {_format_bytes(result.get('output_bytes'))}")
+
+
+def cmd_run(args):
+    from benchmarks import suite
+    from benchmarks.corpus import build_corpus
+
+    benchmarks = suite.select(args.filter)
+    if not benchmarks:
+        print("没有匹配的用例", file=sys.stderr)
+        return 1
+    print(f"生成测试文件 ({args.scale}) ...")
+    corpus = build_corpus(args.corpus_dir, args.scale)
+    report = harness.run_suite(benchmarks, corpus, args.scale, args.repeat, args.timeout, _print_result)
+    if args.output:
+        harness.save_report(report, args.output)
+        print(f"结果已保存到: {args.output}")
+    return 0 if all(r['status'] in ('ok', 'skipped') for r in report['results']) else 1
+
+
+def cmd_compare(args):
+    rows = harness.compare(harness.load_report(args.old), harness.load_report(args.new), args.threshold)
+    for name, before, after, time_change, memory_change, regressed in rows:
+        memory = f"{memory_change:+.1%}" if memory_change is not None else '-'
+        flag = '  退化' if regressed else ''
+        print(f"{name:<34} {before:>8.3f}s -> {after:>8.3f}s  {time_change:+.1%}  内存 {memory}{flag}")
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='PDF工具箱性能基准')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('run', help='运行基准测试')
+    p.add_argument('--scale', choices=['small', 'medium', 'large'], default='small', help='测试文件规模')
+    p.add_argument('--filter', action='append', help='只运行名称包含该字符串的用例，可重复')
+    p.add_argument('--repeat', type=int, default=3, help='每个用例的重复次数')
+    p.add_argument('--timeout', type=float, help='单个用例的超时时间（秒）')
+    p.add_argument('--corpus-dir', default=os.path.join('.benchmarks', 'corpus'), help='测试文件目录')
+    p.add_argument('-o', '--output', help='JSON结果文件')
+    p.set_defaults(func=cmd_run)
+
+    p = subparsers.add_parser('compare', help='比较两次运行的结果')
+    p.add_argument('old', help='旧的JSON结果文件')
+    p.add_argument('new', help='新的JSON结果文件')
+    p.add_argument('--threshold', type=float, default=0.1, help='视为退化的相对变化，默认10%%')
+    p.set_defaults(func=cmd_compare)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""基准测试文件生成
+
+所有内容都由固定种子的随机数生成，reportlab 以 invariant 模式输出（不写入时间戳和随机ID），
+同一规模下生成的文件逐字节相同。
+"""
+import io
+import os
+import random
+from PIL import Image, ImageDraw
+from reportlab.lib.pagesizes import A3, A4, A5, letter, landscape
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+SEED = 20240101
+
+# 各规模下的文件参数
+SCALES = {
+    'small': {'text_pages': 20, 'image_pages': 4, 'small_pages': 100, 'mixed_pages': 20, 'images': 4,
+              'documents': 50},
+    'medium': {'text_pages': 200, 'image_pages': 40, 'small_pages': 2000, 'mixed_pages': 200, 'images': 20,
+               'documents': 500},
+    'large': {'text_pages': 2000, 'image_pages': 200, 'small_pages': 20000, 'mixed_pages': 1000, 'images': 100,
+              'documents': 5000},
+}
+
+# 加密文件的密码，在 PDFMetadata 的常用密码列表中，破解和提取操作可以完成
+ENCRYPTED_PASSWORD = '123456'
+
+_WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+          "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud").split()
+
+
+def _canvas(path, pagesize=A4):
+    return canvas.Canvas(path, pagesize=pagesize, invariant=1)
+
+
+def _photo(rng, width, height):
+    """生成一张类似照片的图片：渐变背景加随机色块，既不是纯色也不是噪声"""
+    image = Image.new('RGB', (width, height))
+    draw = ImageDraw.Draw(image)
+    top = tuple(rng.randrange(256) for _ in range(3))
+    bottom = tuple(rng.randrange(256) for _ in range(3))
+    for y in range(height):
+        t = y / max(1, height - 1)
+        draw.line([(0, y), (width, y)], fill=tuple(int(a + (b - a) * t) for a, b in zip(top, bottom)))
+    for _ in range(40):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = x0 + rng.randrange(10, width // 3), y0 + rng.randrange(10, height // 3)
+        draw.ellipse([x0, y0, x1, y1], fill=tuple(rng.randrange(256) for _ in range(3)))
+    return image
+
+
+def text_heavy(path, pages, rng):
+    """每页约60行文字的长文档"""
+    c = _canvas(path)
+    width, height = A4
+    for page in range(pages):
+        c.setFont('Helvetica', 9)
+        y = height - 50
+        while y > 50:
+            c.drawString(40, y, ' '.join(rng.choice(_WORDS) for _ in range(16)))
+            y -= 12
+        c.drawString(width / 2, 25, str(page + 1))
+        c.showPage()
+    c.save()
+
+
+def image_heavy(path, pages, rng):
+    """每页一张不同的大图，外加所有页面共用的标志图片"""
+    c = _canvas(path)
+    width, height = A4
+    logo = ImageReader(_photo(rng, 200, 80))
+    for _ in range(pages):
+        buffer = io.BytesIO()
+        _photo(rng, 1600, 1200).save(buffer, format='JPEG', quality=85)
+        buffer.seek(0)
+        c.drawImage(ImageReader(buffer), 40, 200, width=width - 80, height=(width - 80) * 0.75)
+        c.drawImage(logo, 40, height - 100, width=200, height=80)
+        c.showPage()
+    c.save()
+
+
+def many_small_pages(path, pages, rng):
+    """大量只有一行文字的小页面"""
+    c = _canvas(path, pagesize=A5)
+    for page in range(pages):
+        c.setFont('Helvetica', 12)
+        c.drawString(30, 500, f"Item {page + 1}: {rng.choice(_WORDS)}")
+        c.showPage()
+    c.save()
+
+
+def mixed_sizes(path, pages, rng):
+    """页面尺寸和方向混合的文档"""
+    sizes = [A4, letter, landscape(A3), A5, (300, 900)]
+    c = _canvas(path)
+    for page in range(pages):
+        size = sizes[page % len(sizes)]
+        c.setPageSize(size)
+        c.setFont('Helvetica', 11)
+        c.drawString(30, size[1] - 40, f"Page {page + 1} {size[0]:.0f}x{size[1]:.0f}")
+        c.rect(30, 30, size[0] - 60, size[1] - 90)
+        c.showPage()
+    c.save()
+
+
+def image_files(directory, count, rng):
+    """JPEG和PNG各占一半的图片文件"""
+    paths = []
+    for i in range(count):
+        image = _photo(rng, 2400, 1800)
+        if i % 2 == 0:
+            path = os.path.join(directory, f"photo_{i + 1:04d}.jpg")
+            image.save(path, format='JPEG', quality=90)
+        else:
+            path = os.path.join(directory, f"scan_{i + 1:04d}.png")
+            image.convert('L').save(path, format='PNG')
+        paths.append(path)
+    return paths
+
+
+def documents(directory, count, rng):
+    """大量单页的小文档（如发票），用于测试合并大量输入文件"""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"invoice_{i + 1:05d}.pdf")
+        c = _canvas(path)
+        c.setFont('Helvetica', 14)
+        c.drawString(60, 780, f"Invoice {i + 1:05d}")
+        c.setFont('Helvetica', 10)
+        for line in range(10):
+            c.drawString(60, 740 - line * 16, f"{rng.choice(_WORDS)} {rng.randint(1, 999)}.{rng.randint(0, 99):02d}")
+        c.showPage()
+        c.save()
+        paths.append(path)
+    return paths
+
+
+def encrypted(path, source):
+    """用已知密码加密的文档（RC4 128位，没有随机盐，PyPDF2不需要额外的加密库即可解密）"""
+    import pikepdf
+    encryption = pikepdf.Encryption(user=ENCRYPTED_PASSWORD, owner=ENCRYPTED_PASSWORD, R=3,
+                                    aes=False, metadata=False)
+    with pikepdf.open(source) as pdf:
+        pdf.save(path, encryption=encryption, static_id=True)
+
+
+def build_corpus(directory, scale='small'):
+    """
+    生成基准测试文件，已存在的文件不会重新生成
+    :param directory: 输出目录，每个规模使用单独的子目录
+    :param scale: 规模 ('small', 'medium', 'large')
+    :return: dict - 文件名称到路径（images、documents 为路径列表）的映射
+    """
+    params = SCALES[scale]
+    directory = os.path.join(directory, scale)
+    image_dir = os.path.join(directory, 'images')
+    document_dir = os.path.join(directory, 'documents')
+    os.makedirs(image_dir, exist_ok=True)
+    os.makedirs(document_dir, exist_ok=True)
+
+    corpus = {}
+    builders = [
+        ('text_heavy', text_heavy, params['text_pages']),
+        ('image_heavy', image_heavy, params['image_pages']),
+        ('many_small_pages', many_small_pages, params['small_pages']),
+        ('mixed_sizes', mixed_sizes, params['mixed_pages']),
+    ]
+    for index, (name, builder, pages) in enumerate(builders):
+        path = os.path.join(directory, f"{name}.pdf")
+        if not os.path.exists(path):
+            # 每个文件使用独立的随机数序列，单独重新生成某个文件时结果不变
+            builder(path + '.tmp', pages, random.Random(SEED + index))
+            os.replace(path + '.tmp', path)
+        corpus[name] = path
+
+    path = os.path.join(directory, 'encrypted.pdf')
+    if not os.path.exists(path):
+        encrypted(path, corpus['text_heavy'])
+    corpus['encrypted'] = path
+
+    images = sorted(os.path.join(image_dir, name) for name in os.listdir(image_dir))
+    if len(images) != params['images']:
+        for name in os.listdir(image_dir):
+            os.remove(os.path.join(image_dir, name))
+        images = image_files(image_dir, params['images'], random.Random(SEED + len(builders)))
+    corpus['images'] = images
+
+    paths = sorted(os.path.join(document_dir, name) for name in os.listdir(document_dir))
+    if len(paths) != params['documents']:
+        for name in os.listdir(document_dir):
+            os.remove(os.path.join(document_dir, name))
+        paths = documents(document_dir, params['documents'], random.Random(SEED + len(builders) + 1))
+    corpus['documents'] = paths
+    return corpus
@@ -0,0 +1,208 @@
+"""基准测试的运行和比较
+
+每个用例在单独的 spawn 子进程中运行，峰值RSS因此只包含该用例本身（以及导入核心模块）的内存。
+"""
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# 报告格式版本，字段变化时递增
+REPORT_VERSION = 1
+
+
+def peak_rss(children=False):
+    """
+    当前进程（或已结束的子进程中）的峰值常驻内存
+    :param children: 是否读取子进程的峰值（例如操作内部使用的进程池）
+    :return: int|None - 字节数，当前平台无法获取时返回 None
+    """
+    if not children and sys.platform.startswith('linux'):
+        # getrusage 的峰值在 exec 后仍然保留父进程的值，VmHWM 只统计当前进程
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    try:
+        import resource
+    except ImportError:
+        if children:
+            return None
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return getattr(psutil.Process().memory_info(), 'peak_wset', None)
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    rss = resource.getrusage(who).ru_maxrss
+    # Linux 以KB为单位，macOS 以字节为单位
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _directory_size(path):
+    total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def _child_main(name, source, repeat, workdir, conn):
+    """子进程：执行用例 repeat 次并回传测量结果"""
+    try:
+        from benchmarks import suite
+        benchmark = suite.get(name)
+        rss_before = peak_rss()
+        times = []
+        output_bytes = 0
+        success, message = True, ''
+        for _ in range(repeat):
+            out_dir = tempfile.mkdtemp(dir=workdir)
+            try:
+                start = time.perf_counter()
+                success, message = benchmark.run(source, out_dir)
+                times.append(time.perf_counter() - start)
+                output_bytes = _directory_size(out_dir)
+            finally:
+                shutil.rmtree(out_dir, ignore_errors=True)
+            if not success:
+                break
+        conn.send({
+            'status': 'ok' if success else 'failed',
+            'message': str(message)[:500],
+            'times': times,
+            'rss_before': rss_before,
+            'peak_rss': peak_rss(),
+            'peak_rss_children': peak_rss(children=True),
+            'output_bytes': output_bytes,
+        })
+    except Exception as e:
+        conn.send({'status': 'error', 'message': f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_benchmark(benchmark, corpus, repeat=3, workdir=None, timeout=None):
+    """
+    在子进程中运行一个用例
+    :param benchmark: suite.Benchmark
+    :param corpus: corpus.build_corpus 返回的文件映射
+    :param repeat: 重复次数
+    :param workdir: 临时输出目录的上级目录
+    :param timeout: 超时时间（秒），None表示不限制
+    :return: dict - 测量结果
+    """
+    from benchmarks.suite import missing_requirement
+    result = {'name': benchmark.name, 'input': benchmark.input}
+    reason = missing_requirement(benchmark)
+    if reason:
+        result.update(status='skipped', message=reason)
+        return result
+
+    ctx = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_child_main,
+                          args=(benchmark.name, corpus[benchmark.input], repeat, workdir, child_conn))
+    process.start()
+    child_conn.close()
+    if parent_conn.poll(timeout):
+        try:
+            result.update(parent_conn.recv())
+        except EOFError:
+            result.update(status='error', message=f"子进程异常退出 (退出码 {process.exitcode})")
+    else:
+        process.terminate()
+        result.update(status='error', message=f"超时 (超过{timeout}秒)")
+    process.join()
+    parent_conn.close()
+
+    times = result.get('times')
+    if times:
+        result.update(min=min(times), median=statistics.median(times), mean=statistics.fmean(times))
+    return result
+
+
+def environment():
+    """记录运行环境，用于区分不同提交和机器上的结果"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def run_suite(benchmarks, corpus, scale, repeat=3, timeout=None, callback=None):
+    """
+    依次运行多个用例
+    :param benchmarks: Benchmark列表
+    :param corpus: 文件映射
+    :param scale: 语料规模，写入报告
+    :param repeat: 每个用例的重复次数
+    :param timeout: 单个用例的超时时间（秒）
+    :param callback: 每个用例完成后调用 callback(result)
+    :return: dict - 报告
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix='pdf-benchmarks-') as workdir:
+        for benchmark in benchmarks:
+            result = run_benchmark(benchmark, corpus, repeat, workdir, timeout)
+            results.append(result)
+            if callback:
+                callback(result)
+    return {
+        'version': REPORT_VERSION,
+        'scale': scale,
+        'repeat': repeat,
+        'environment': environment(),
+        'results': results,
+    }
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def load_report(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(old, new, threshold=0.1):
+    """
+    比较两份报告中相同用例的最短耗时和峰值内存
+    :param old: 旧报告
+    :param new: 新报告
+    :param threshold: 视为退化的相对变化阈值
+    :return: list - [(用例名称, 旧耗时, 新耗时, 耗时变化比例, 内存变化比例, 是否退化), ...]
+    """
+    old_results = {r['name']: r for r in old['results'] if r.get('status') == 'ok'}
+    rows = []
+    for result in new['results']:
+        before = old_results.get(result['name'])
+        if before is None or result.get('status') != 'ok':
+            continue
+        time_change = result['min'] / before['min'] - 1 if before['min'] else 0.0
+        memory_change = None
+        if before.get('peak_rss') and result.get('peak_rss'):
+            memory_change = result['peak_rss'] / before['peak_rss'] - 1
+        regressed = time_change > threshold or (memory_change is not None and memory_change > threshold)
+        rows.append((result['name'], before['min'], result['min'], time_change, memory_change, regressed))
+    return rows
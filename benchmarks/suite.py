@@ -0,0 +1,170 @@
+"""基准测试用例
+
+每个用例对应一个核心操作：input 为 corpus 中的文件名称，run(source, out_dir) 执行一次操作
+并返回操作本身的 (是否成功, 消息)。需要poppler的用例在找不到poppler时跳过。
+"""
+import os
+import shutil
+
+from src.core import backend
+from src.core.converter import PDFConverter
+from src.core.editor import PDFEditor
+from src.core.merger import PDFMerger
+from src.core.metadata import PDFMetadata
+from src.core.splitter import PDFSplitter
+from benchmarks.corpus import ENCRYPTED_PASSWORD
+
+
+class Benchmark:
+    """一个基准测试用例"""
+
+    def __init__(self, name, input, run, requires=None):
+        """
+        :param name: 用例名称，格式为 模块.操作[.变体]
+        :param input: corpus 中的输入文件名称
+        :param run: 执行函数 run(source, out_dir)，返回 (bool, str)
+        :param requires: 依赖的外部程序（目前只有 'poppler'）
+        """
+        self.name = name
+        self.input = input
+        self.run = run
+        self.requires = requires
+
+
+def has_poppler():
+    """是否可以调用poppler渲染页面"""
+    return bool(shutil.which('pdftoppm', path=PDFConverter.get_poppler_path()) or shutil.which('pdftoppm'))
+
+
+def missing_requirement(benchmark):
+    """
+    检查用例依赖的外部程序
+    :return: str|None - 缺少的依赖说明，满足时返回 None
+    """
+    if benchmark.requires == 'poppler' and not has_poppler():
+        return "未找到poppler"
+    return None
+
+
+def _output(out_dir, name='output.pdf'):
+    return os.path.join(out_dir, name)
+
+
+def _page_count(source):
+    return PDFEditor.get_pdf_page_count(source)
+
+
+BENCHMARKS = [
+    # PDFEditor
+    Benchmark('editor.add_watermark', 'text_heavy',
+              lambda src, out: PDFEditor.add_watermark(src, _output(out), 'CONFIDENTIAL')),
+    Benchmark('editor.add_watermark.merge', 'text_heavy',
+              lambda src, out: PDFEditor.add_watermark(src, _output(out), 'CONFIDENTIAL', mode='merge')),
+    Benchmark('editor.remove_watermark', 'text_heavy',
+              lambda src, out: PDFEditor.remove_watermark(src, _output(out))),
+    Benchmark('editor.compress_pdf', 'image_heavy',
+              lambda src, out: PDFEditor.compress_pdf(src, _output(out), 'medium')),
+    Benchmark('editor.compress_pdf.downsample', 'image_heavy',
+              lambda src, out: PDFEditor.compress_pdf(src, _output(out), 'low', image_dpi=100)),
+    Benchmark('editor.pdf_to_images', 'mixed_sizes',
+              lambda src, out: PDFEditor.pdf_to_images(src, out, 'png', dpi=72), requires='poppler'),
+    Benchmark('editor.images_to_pdf', 'images',
+              lambda src, out: PDFEditor.images_to_pdf(src, _output(out))),
+    Benchmark('editor.split_pdf.pages', 'many_small_pages',
+              lambda src, out: PDFEditor.split_pdf(src, out)),
+    Benchmark('editor.split_pdf.groups', 'text_heavy',
+              lambda src, out: PDFEditor.split_pdf(
+                  src, out, [f"{i}-{min(i + 9, _page_count(src))}" for i in range(1, _page_count(src) + 1, 10)])),
+    Benchmark('editor.merge_pdfs', 'mixed_sizes',
+              lambda src, out: PDFEditor.merge_pdfs([src] * 10, _output(out))),
+    Benchmark('editor.merge_pdfs.many', 'documents',
+              lambda src, out: PDFEditor.merge_pdfs(src, _output(out))),
+    Benchmark('editor.reorder_pages', 'mixed_sizes',
+              lambda src, out: PDFEditor.reorder_pages(
+                  src, _output(out), ','.join(str(i) for i in range(_page_count(src), 0, -1)))),
+    Benchmark('editor.add_page_numbers', 'text_heavy',
+              lambda src, out: PDFEditor.add_page_numbers(src, _output(out))),
+    # PDFConverter
+    Benchmark('converter.images_to_pdf', 'images',
+              lambda src, out: PDFConverter.images_to_pdf(src, _output(out))),
+    Benchmark('converter.pdf_to_images', 'mixed_sizes',
+              lambda src, out: PDFConverter.pdf_to_images(src, out, dpi=72), requires='poppler'),
+    # PDFSplitter / PDFMerger
+    Benchmark('splitter.split_pdf.separate', 'many_small_pages',
+              lambda src, out: PDFSplitter.split_pdf(
+                  src, out, [list(range(1, _page_count(src) + 1))], separate_files=True)),
+    Benchmark('merger.merge_pdfs', 'text_heavy',
+              lambda src, out: PDFMerger.merge_pdfs([src] * 10, _output(out))),
+    Benchmark('merger.merge_pdfs.many', 'documents',
+              lambda src, out: PDFMerger.merge_pdfs(src, _output(out), workers=1)),
+    Benchmark('merger.merge_pdfs.many.parallel', 'documents',
+              lambda src, out: PDFMerger.merge_pdfs(src, _output(out))),
+    # PDFMetadata
+    Benchmark('metadata.get_metadata', 'text_heavy',
+              lambda src, out: PDFMetadata.get_metadata(src)),
+    Benchmark('metadata.set_metadata', 'text_heavy',
+              lambda src, out: PDFMetadata.set_metadata(src, _output(out), {'/Title': 'Benchmark'})),
+    Benchmark('metadata.add_encryption', 'text_heavy',
+              lambda src, out: PDFMetadata.add_encryption(src, _output(out), 'secret')),
+    Benchmark('metadata.crack_password', 'encrypted',
+              lambda src, out: PDFMetadata.crack_password(src, common_passwords=['0000', ENCRYPTED_PASSWORD])),
+    Benchmark('metadata.extract_content', 'encrypted',
+              lambda src, out: PDFMetadata.extract_content(src, _output(out))),
+]
+
+def _backend_rewrite(name, **options):
+    """用指定后端另存文件，options 为 rewrite 的参数"""
+    def run(src, out):
+        backend.get_backend(name).rewrite(src, _output(out), **options)
+        return True, ''
+    return run
+
+
+def _backend_page_count(name):
+    """打开文件并读取页数（PDFEditor.load_pdf 之后的典型用法）"""
+    def run(src, out):
+        count = backend.get_backend(name).page_count(src)
+        return count > 0, f"{count}页"
+    return run
+
+
+def _backend_check_password(name):
+    def run(src, out):
+        b = backend.get_backend(name)
+        # 先试错误的密码，再试正确的密码
+        found = [password for password in ['0000', '1111', ENCRYPTED_PASSWORD] if b.check_password(src, password)]
+        return found == [ENCRYPTED_PASSWORD], f"找到的密码: {found}"
+    return run
+
+
+# 后端对比：同一操作分别用 qpdf 和 PyPDF2 后端执行，耗时可以直接比较
+for _name in backend.BACKENDS:
+    BENCHMARKS += [
+        Benchmark(f'backend.{_name}.set_metadata', 'text_heavy',
+                  _backend_rewrite(_name, metadata={'/Title': 'Benchmark'})),
+        Benchmark(f'backend.{_name}.encrypt', 'text_heavy',
+                  _backend_rewrite(_name, encryption=backend.encryption_options('secret'))),
+        Benchmark(f'backend.{_name}.decrypt', 'encrypted',
+                  _backend_rewrite(_name, password=ENCRYPTED_PASSWORD)),
+        Benchmark(f'backend.{_name}.check_password', 'encrypted', _backend_check_password(_name)),
+        Benchmark(f'backend.{_name}.open', 'text_heavy', _backend_page_count(_name)),
+    ]
+
+
+def select(patterns=None):
+    """
+    按名称选择用例
+    :param patterns: 名称中包含的子串列表，None表示全部
+    :return: Benchmark列表
+    """
+    if not patterns:
+        return list(BENCHMARKS)
+    return [b for b in BENCHMARKS if any(p in b.name for p in patterns)]
+
+
+def get(name):
+    """按名称查找用例"""
+    for benchmark in BENCHMARKS:
+        if benchmark.name == name:
+            return benchmark
+    raise KeyError(name)
@@ -0,0 +1,284 @@
+"""PDF工具箱命令行入口
+
+所有子命令都在处理函数内部按需导入核心模块，因此 ``--help`` 和参数解析
+不会加载 PyQt6、pikepdf 等重量级依赖，适合在容器和定时任务中使用。
+不带任何参数运行时启动图形界面。
+"""
+import argparse
+import os
+import sys
+
+
+def _report(success, message):
+    """输出操作结果并返回进程退出码"""
+    if success:
+        print(message)
+        return 0
+    print(message, file=sys.stderr)
+    return 1
+
+
+def _collect_pdf_files(paths):
+    """展开输入路径，目录中的PDF文件按名称排序加入"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.lower().endswith('.pdf'):
+                        files.append(os.path.join(root, name))
+        else:
+            files.append(path)
+    return files
+
+
+def cmd_watermark(args):
+    from src.core.editor import PDFEditor
+    return _report(*PDFEditor.add_watermark(
+        args.input, args.output, args.text, args.opacity, args.angle, mode=args.mode
+    ))
+
+
+def cmd_remove_watermark(args):
+    from src.core.editor import PDFEditor
+    return _report(*PDFEditor.remove_watermark(args.input, args.output))
+
+
+def cmd_compress(args):
+    from src.core.editor import PDFEditor
+    return _report(*PDFEditor.compress_pdf(
+        args.input, args.output, quality=args.quality, image_dpi=args.image_dpi
+    ))
+
+
+def cmd_split(args):
+    from src.core.editor import PDFEditor
+    return _report(*PDFEditor.split_pdf(args.input, args.output_dir, args.groups))
+
+
+def cmd_merge(args):
+    from src.core.editor import PDFEditor
+    return _report(*PDFEditor.merge_pdfs(args.inputs, args.output))
+
+
+def cmd_reorder(args):
+    from src.core.editor import PDFEditor
+    return _report(*PDFEditor.reorder_pages(args.input, args.output, args.order))
+
+
+def cmd_page_numbers(args):
+    from src.core.editor import PDFEditor
+    return _report(*PDFEditor.add_page_numbers(
+        args.input, args.output, start_number=args.start, position=args.position,
+        number_format=args.format, font_size=args.font_size
+    ))
+
+
+def cmd_to_images(args):
+    from src.core.editor import PDFEditor
+    return _report(*PDFEditor.pdf_to_images(
+        args.input, args.output_dir, image_format=args.format, dpi=args.dpi
+    ))
+
+
+def cmd_from_images(args):
+    from src.core.editor import PDFEditor
+    return _report(*PDFEditor.images_to_pdf(
+        args.images, args.output, page_size=args.page_size, margin=args.margin
+    ))
+
+
+def cmd_metadata(args):
+    from src.core.metadata import PDFMetadata
+    if args.set:
+        metadata = {}
+        for item in args.set:
+            key, sep, value = item.partition('=')
+            if not sep:
+                return _report(False, f"元数据格式错误，应为 KEY=VALUE: {item}")
+            metadata[key if key.startswith('/') else f"/{key}"] = value
+        return _report(*PDFMetadata.set_metadata(
+            args.input, args.output or args.input, metadata
+        ))
+
+    success, result = PDFMetadata.get_metadata(args.input)
+    if not success:
+        return _report(False, result)
+    if args.json:
+        import json
+        print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    else:
+        for key, value in result.items():
+            print(f"{key}: {value}")
+    return 0
+
+
+def cmd_encrypt(args):
+    from src.core.metadata import PDFMetadata
+    if not args.user_password and not args.owner_password:
+        return _report(False, "请至少设置一个密码")
+    allowed = set(args.allow.split(',')) if args.allow else set()
+    permissions = {name: name in allowed for name in ('print', 'modify', 'copy', 'annotate')}
+    return _report(*PDFMetadata.add_encryption(
+        args.input, args.output, args.user_password, args.owner_password, permissions
+    ))
+
+
+def cmd_batch(args):
+    from src.core.batch import BatchProcessor
+    files = _collect_pdf_files(args.inputs)
+    if not files:
+        return _report(False, "没有找到PDF文件")
+    if not os.path.exists(args.output_dir):
+        os.makedirs(args.output_dir)
+
+    params = {'output_dir': args.output_dir}
+    if args.task == 'watermark':
+        if not args.text:
+            return _report(False, "请使用 --text 指定水印文字")
+        params.update({'text': args.text, 'opacity': args.opacity, 'angle': args.angle})
+    elif args.task == 'compress':
+        params['quality'] = args.quality
+
+    def on_result(index, file_path, success, message):
+        status = '成功' if success else '失败'
+        print(f"[{status}] {file_path}: {message}", file=sys.stdout if success else sys.stderr)
+
+    processor = BatchProcessor(max_workers=args.workers, timeout=args.timeout)
+    results = processor.run(args.task, files, params, on_result)
+    failed = sum(1 for _, success, _ in results if not success)
+    return _report(failed == 0, f"批量处理完成\n成功: {len(results) - failed}\n失败: {failed}")
+
+
+def cmd_gui(args):
+    from src.main import main as gui_main
+    gui_main()
+    return 0
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog='pdf-toolbox',
+        description='PDF工具箱命令行工具，不带参数运行时启动图形界面'
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='<命令>')
+
+    p = subparsers.add_parser('watermark', help='添加文字水印')
+    p.add_argument('input', help='输入PDF文件')
+    p.add_argument('output', help='输出PDF文件')
+    p.add_argument('--text', required=True, help='水印文字')
+    p.add_argument('--opacity', type=float, default=0.3, help='透明度 (0-1)，默认0.3')
+    p.add_argument('--angle', type=float, default=45, help='旋转角度，默认45')
+    p.add_argument('--mode', choices=['xobject', 'merge'], default='xobject',
+                   help='xobject: 水印只存储一次并在每页引用（默认）；merge: 逐页合并')
+    p.set_defaults(func=cmd_watermark)
+
+    p = subparsers.add_parser('remove-watermark', help='移除水印')
+    p.add_argument('input', help='输入PDF文件')
+    p.add_argument('output', help='输出PDF文件')
+    p.set_defaults(func=cmd_remove_watermark)
+
+    p = subparsers.add_parser('compress', help='压缩PDF')
+    p.add_argument('input', help='输入PDF文件')
+    p.add_argument('output', help='输出PDF文件')
+    p.add_argument('--quality', choices=['low', 'medium', 'high'], default='medium',
+                   help='压缩质量，默认medium')
+    p.add_argument('--image-dpi', type=int, default=None, help='图片目标DPI，默认保持原始DPI')
+    p.set_defaults(func=cmd_compress)
+
+    p = subparsers.add_parser('split', help='分割PDF')
+    p.add_argument('input', help='输入PDF文件')
+    p.add_argument('output_dir', help='输出目录')
+    p.add_argument('--groups', nargs='+', default=None,
+                   help='页面组，如 "1-3,5" "6-9"；不指定时按单页拆分')
+    p.set_defaults(func=cmd_split)
+
+    p = subparsers.add_parser('merge', help='合并多个PDF')
+    p.add_argument('inputs', nargs='+', help='输入PDF文件（按顺序合并）')
+    p.add_argument('-o', '--output', required=True, help='输出PDF文件')
+    p.set_defaults(func=cmd_merge)
+
+    p = subparsers.add_parser('reorder', help='重新排序页面')
+    p.add_argument('input', help='输入PDF文件')
+    p.add_argument('output', help='输出PDF文件')
+    p.add_argument('--order', required=True, help='页面顺序，如 "3,1,2" 或 "1-2,4,3"')
+    p.set_defaults(func=cmd_reorder)
+
+    p = subparsers.add_parser('page-numbers', help='添加页码')
+    p.add_argument('input', help='输入PDF文件')
+    p.add_argument('output', help='输出PDF文件')
+    p.add_argument('--start', type=int, default=1, help='起始页码，默认1')
+    p.add_argument('--position', default='bottom',
+                   choices=['bottom', 'top', 'bottom-left', 'bottom-right', 'top-left', 'top-right'],
+                   help='页码位置，默认bottom')
+    p.add_argument('--format', default='{page}',
+                   help='页码格式，{page} 为页码，{total} 为总页码，如 "第 {page} 页"，默认 "{page}"')
+    p.add_argument('--font-size', type=float, default=10, help='字号，默认10')
+    p.set_defaults(func=cmd_page_numbers)
+
+    p = subparsers.add_parser('to-images', help='PDF转图片')
+    p.add_argument('input', help='输入PDF文件')
+    p.add_argument('output_dir', help='输出目录')
+    p.add_argument('--format', choices=['png', 'jpeg', 'tiff'], default='png', help='图片格式，默认png')
+    p.add_argument('--dpi', type=int, default=300, help='图片DPI，默认300')
+    p.set_defaults(func=cmd_to_images)
+
+    p = subparsers.add_parser('from-images', help='图片转PDF')
+    p.add_argument('images', nargs='+', help='输入图片文件（按顺序排列）')
+    p.add_argument('-o', '--output', required=True, help='输出PDF文件')
+    p.add_argument('--page-size', choices=['A4', 'Letter', '自动'], default='A4', help='页面大小，默认A4')
+    p.add_argument('--margin', type=float, default=10, help='页边距（毫米），默认10')
+    p.set_defaults(func=cmd_from_images)
+
+    p = subparsers.add_parser('metadata', help='查看或修改元数据')
+    p.add_argument('input', help='输入PDF文件')
+    p.add_argument('--set', nargs='+', metavar='KEY=VALUE', help='要设置的元数据，如 Title=报告')
+    p.add_argument('-o', '--output', help='修改元数据时的输出文件，默认覆盖输入文件')
+    p.add_argument('--json', action='store_true', help='以JSON格式输出元数据')
+    p.set_defaults(func=cmd_metadata)
+
+    p = subparsers.add_parser('encrypt', help='加密PDF')
+    p.add_argument('input', help='输入PDF文件')
+    p.add_argument('output', help='输出PDF文件')
+    p.add_argument('--user-password', default='', help='打开文档密码')
+    p.add_argument('--owner-password', default='', help='编辑文档密码')
+    p.add_argument('--allow', default='print,copy',
+                   help='允许的权限，逗号分隔 (print,modify,copy,annotate)，默认print,copy')
+    p.set_defaults(func=cmd_encrypt)
+
+    p = subparsers.add_parser('batch', help='多进程批量处理文件或目录')
+    p.add_argument('task', choices=['watermark', 'remove_watermark', 'compress'], help='任务类型')
+    p.add_argument('inputs', nargs='+', help='输入PDF文件或目录')
+    p.add_argument('-o', '--output-dir', required=True, help='输出目录')
+    p.add_argument('--workers', type=int, default=None, help='并行进程数，默认CPU核心数')
+    p.add_argument('--timeout', type=float, default=None, help='单文件超时（秒），默认不限')
+    p.add_argument('--quality', choices=['low', 'medium', 'high'], default='medium', help='压缩质量')
+    p.add_argument('--text', help='水印文字')
+    p.add_argument('--opacity', type=float, default=0.3, help='水印透明度')
+    p.add_argument('--angle', type=float, default=45, help='水印角度')
+    p.set_defaults(func=cmd_batch)
+
+    p = subparsers.add_parser('gui', help='启动图形界面')
+    p.set_defaults(func=cmd_gui)
+
+    return parser
+
+
+def main(argv=None):
+    """命令行主函数"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        return cmd_gui(None)
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 1
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""PDF解析后端
+
+整个文档的读取和另存（元数据、加密、解密、密码检查）以及 PDFEditor.load_pdf 通过本模块执行，
+使用 qpdf（通过 pikepdf）：qpdf 按需读取对象，大文件的打开和保存都比纯Python的 PyPDF2 快得多。
+PyPDF2 只作为后备：qpdf 无法解析的文件（PdfError，密码错误除外）会改用 PyPDF2 再试一次。
+两个后端提供相同的静态方法，benchmarks 中的 backend.* 用例比较两者的耗时。
+
+编辑、分割和合并直接操作 pikepdf 的对象（跨文档复制页面、裁剪资源、改写内容流），
+不经过本模块，也没有 PyPDF2 后备。
+"""
+import os
+
+import pikepdf
+from PyPDF2 import PdfReader, PdfWriter
+
+from src.core.progress import ensure_progress
+
+# 默认权限：允许打印和复制，禁止修改和添加注释
+DEFAULT_PERMISSIONS = {
+    "print": True,
+    "modify": False,
+    "copy": True,
+    "annotate": False,
+}
+
+
+def encryption_options(user_password=None, owner_password=None, permissions=None):
+    """
+    整理加密参数，未设置所有者密码时使用用户密码
+    :param user_password: 用户密码（打开文档密码）
+    :param owner_password: 所有者密码（编辑文档密码）
+    :param permissions: 权限设置字典，键为 print、modify、copy、annotate
+    :return: dict - 传给后端 rewrite 的 encryption 参数
+    """
+    user = user_password if user_password else ""
+    return {
+        'user': user,
+        'owner': owner_password if owner_password else user,
+        'permissions': dict(DEFAULT_PERMISSIONS, **(permissions or {})),
+    }
+
+
+def _docinfo_key(key):
+    return key if key.startswith('/') else f"/{key}"
+
+
+class QpdfBackend:
+    """基于 qpdf（pikepdf）的后端"""
+
+    name = 'qpdf'
+
+    @staticmethod
+    def open(input_path, password='', writable=False):
+        """
+        打开PDF文件
+        :param password: 密码，没有加密时忽略
+        :param writable: 保存时是否可能覆盖输入文件
+        :return: pikepdf.Pdf
+        """
+        return pikepdf.Pdf.open(input_path, password=password, allow_overwriting_input=writable)
+
+    @staticmethod
+    def is_encrypted(input_path):
+        """文件是否加密（包括只设置了所有者密码的文件）"""
+        try:
+            with pikepdf.Pdf.open(input_path) as pdf:
+                return pdf.is_encrypted
+        except pikepdf.PasswordError:
+            return True
+
+    @staticmethod
+    def check_password(input_path, password):
+        """密码是否可以打开文件"""
+        try:
+            with pikepdf.Pdf.open(input_path, password=password):
+                return True
+        except pikepdf.PasswordError:
+            return False
+
+    @staticmethod
+    def page_count(input_path, password=''):
+        with pikepdf.Pdf.open(input_path, password=password) as pdf:
+            return len(pdf.pages)
+
+    @staticmethod
+    def rewrite(input_path, output_path, password='', metadata=None, encryption=None, progress=None):
+        """
+        打开文件，按需修改文档信息和加密方式后另存。未指定 encryption 时输出不加密
+        :param input_path: 输入PDF文件路径
+        :param output_path: 输出PDF文件路径（可以与输入路径相同）
+        :param password: 输入文件的密码
+        :param metadata: 要写入文档信息字典的条目，如 {'/Title': '标题'}
+        :param encryption: encryption_options 的返回值
+        :param progress: Progress，报告保存进度并支持取消
+        """
+        progress = ensure_progress(progress)
+        writable = os.path.exists(output_path) and os.path.samefile(input_path, output_path)
+        with QpdfBackend.open(input_path, password, writable) as pdf:
+            for key, value in (metadata or {}).items():
+                pdf.docinfo[_docinfo_key(key)] = str(value)
+            options = {}
+            if encryption is not None:
+                permissions = encryption['permissions']
+                # 与之前的 PyPDF2 实现相同，使用128位RC4（R=3），旧的阅读器也能打开
+                options['encryption'] = pikepdf.Encryption(
+                    user=encryption['user'], owner=encryption['owner'], R=3, aes=False, metadata=False,
+                    allow=pikepdf.Permissions(
+                        accessibility=permissions['copy'],
+                        extract=permissions['copy'],
+                        modify_annotation=permissions['annotate'],
+                        modify_form=permissions['annotate'],
+                        modify_assembly=permissions['modify'],
+                        modify_other=permissions['modify'],
+                        print_lowres=permissions['print'],
+                        print_highres=permissions['print'],
+                    ))
+            pdf.save(output_path, progress=progress.saving(), **options)
+
+
+class PyPDF2Backend:
+    """基于 PyPDF2 的后备实现"""
+
+    name = 'pypdf2'
+
+    @staticmethod
+    def open(input_path, password='', writable=False):
+        reader = PdfReader(input_path)
+        if reader.is_encrypted and not reader.decrypt(password):
+            raise ValueError("密码错误")
+        return reader
+
+    @staticmethod
+    def is_encrypted(input_path):
+        return PdfReader(input_path).is_encrypted
+
+    @staticmethod
+    def check_password(input_path, password):
+        try:
+            return PdfReader(input_path).decrypt(password) > 0
+        except Exception:
+            return False
+
+    @staticmethod
+    def page_count(input_path, password=''):
+        return len(PyPDF2Backend.open(input_path, password).pages)
+
+    @staticmethod
+    def rewrite(input_path, output_path, password='', metadata=None, encryption=None, progress=None):
+        progress = ensure_progress(progress)
+        reader = PyPDF2Backend.open(input_path, password)
+        writer = PdfWriter()
+        progress.start("复制页面", len(reader.pages))
+        for page in reader.pages:
+            writer.add_page(page)
+            progress.advance()
+        if reader.metadata:
+            writer.add_metadata(dict(reader.metadata))
+        if metadata:
+            writer.add_metadata({_docinfo_key(key): str(value) for key, value in metadata.items()})
+        if encryption is not None:
+            permissions = encryption['permissions']
+            # 标准PDF权限掩码：4 打印，8 修改内容，16 复制内容，32 添加注释
+            mask = ((4 if permissions['print'] else 0) | (8 if permissions['modify'] else 0) |
+                    (16 if permissions['copy'] else 0) | (32 if permissions['annotate'] else 0))
+            writer.encrypt(user_password=encryption['user'], owner_password=encryption['owner'],
+                           use_128bit=True, permissions_flag=mask)
+        progress.start("保存文件")
+        with open(output_path, 'wb') as output_file:
+            writer.write(output_file)
+
+
+BACKENDS = {backend.name: backend for backend in (QpdfBackend, PyPDF2Backend)}
+
+
+def get_backend(name=None):
+    """
+    按名称获取后端
+    :param name: 'qpdf' 或 'pypdf2'，None表示默认的 qpdf
+    """
+    return BACKENDS[name or QpdfBackend.name]
+
+
+def call(method, *args, **kwargs):
+    """
+    用 qpdf 后端执行操作，qpdf 无法解析文件时改用 PyPDF2 后端
+    :param method: 后端方法名，如 'rewrite'
+    :return: 后端方法的返回值
+    """
+    try:
+        return getattr(QpdfBackend, method)(*args, **kwargs)
+    except pikepdf.PasswordError:
+        raise
+    except pikepdf.PdfError as e:
+        try:
+            return getattr(PyPDF2Backend, method)(*args, **kwargs)
+        except Exception:
+            # 两个后端都失败时报告 qpdf 的错误
+            raise e
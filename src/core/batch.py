@@ -0,0 +1,232 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from src.core.editor import PDFEditor
+from src.core.progress import OperationCancelled, ensure_progress
+
+
+def build_output_path(file_path, output_dir, task_type):
+    """
+    生成批处理任务的输出文件路径
+    :param file_path: 输入PDF文件路径
+    :param output_dir: 输出目录
+    :param task_type: 任务类型
+    :return: 输出文件路径
+    """
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(output_dir, f"{base_name}_{task_type}.pdf")
+
+
+def run_task(task_type, input_path, output_path, params):
+    """
+    在当前进程中执行单个批处理任务
+    :param task_type: 任务类型 ('watermark', 'remove_watermark', 'compress')
+    :param input_path: 输入PDF文件路径
+    :param output_path: 输出PDF文件路径
+    :param params: 任务参数字典
+    :return: (bool, str) - (是否成功, 错误信息)
+    """
+    if task_type == 'watermark':
+        return PDFEditor.add_watermark(
+            input_path,
+            output_path,
+            params['text'],
+            params['opacity'],
+            params['angle']
+        )
+    elif task_type == 'remove_watermark':
+        return PDFEditor.remove_watermark(input_path, output_path)
+    elif task_type == 'compress':
+        return PDFEditor.compress_pdf(input_path, output_path, params['quality'])
+    return False, f"未知的任务类型: {task_type}"
+
+
+def _worker_main(conn):
+    """工作进程主循环：逐个接收任务并回传结果"""
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+
+        index, task_type, input_path, output_path, params = task
+        try:
+            success, message = run_task(task_type, input_path, output_path, params)
+        except Exception as e:
+            success, message = False, str(e)
+        conn.send((index, success, message))
+    conn.close()
+
+
+class _Worker:
+    """单个工作进程及其当前任务"""
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.task = None
+        self.deadline = None
+
+    def submit(self, index, file_path, task, timeout):
+        self.conn.send((index,) + task)
+        self.task = (index, file_path)
+        self.deadline = time.monotonic() + timeout if timeout else None
+
+    def stop(self):
+        """正常退出工作进程"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        """强制结束工作进程"""
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+
+class BatchProcessor:
+    """多进程批处理引擎
+
+    每个文件在独立的工作进程中处理，单个文件导致的进程崩溃或超时
+    只会使该文件失败，工作进程随后被重建，其余文件继续处理。
+    """
+
+    # 等待结果时检查取消标记的间隔（秒）
+    POLL_INTERVAL = 0.2
+
+    def __init__(self, max_workers=None, timeout=None, ordered=False):
+        """
+        :param max_workers: 工作进程数，None表示使用CPU核心数
+        :param timeout: 单个文件的超时时间（秒），None或0表示不限制
+        :param ordered: 是否按输入顺序回调结果，False表示按完成顺序回调
+        """
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.timeout = timeout or None
+        self.ordered = ordered
+
+    def run(self, task_type, files, params, callback=None, progress=None):
+        """
+        批量处理文件
+        :param task_type: 任务类型 ('watermark', 'remove_watermark', 'compress')
+        :param files: 输入PDF文件路径列表
+        :param params: 任务参数字典，必须包含 output_dir
+        :param callback: 结果回调 callback(index, file_path, success, message)
+        :param progress: Progress，每完成一个文件报告一次；取消时结束所有工作进程并抛出 OperationCancelled
+        :return: 按输入顺序排列的结果列表 [(file_path, success, message), ...]
+        """
+        progress = ensure_progress(progress)
+        total = len(files)
+        results = [None] * total
+        if total == 0:
+            return results
+
+        next_index = 0
+
+        def record(index, success, message):
+            nonlocal next_index
+            results[index] = (files[index], success, message)
+            progress.advance()
+            if callback is None:
+                return
+            if not self.ordered:
+                callback(index, files[index], success, message)
+                return
+            while next_index < total and results[next_index] is not None:
+                file_path, ok, msg = results[next_index]
+                callback(next_index, file_path, ok, msg)
+                next_index += 1
+
+        progress.start("批量处理", total)
+        ctx = multiprocessing.get_context('spawn')
+        pending = deque(enumerate(files))
+        workers = [_Worker(ctx) for _ in range(min(self.max_workers, total))]
+
+        try:
+            while pending or any(w.task is not None for w in workers):
+                # 为空闲的工作进程分配任务
+                for i, worker in enumerate(workers):
+                    if worker.task is not None or not pending:
+                        continue
+                    index, file_path = pending.popleft()
+                    task = (
+                        task_type,
+                        file_path,
+                        build_output_path(file_path, params['output_dir'], task_type),
+                        params
+                    )
+                    try:
+                        worker.submit(index, file_path, task, self.timeout)
+                    except (OSError, ValueError):
+                        # 工作进程已退出，重建后重新提交
+                        worker.kill()
+                        workers[i] = worker = _Worker(ctx)
+                        worker.submit(index, file_path, task, self.timeout)
+
+                busy = [w for w in workers if w.task is not None]
+                wait_timeout = self.POLL_INTERVAL
+                if self.timeout:
+                    wait_timeout = min(wait_timeout,
+                                       max(0, min(w.deadline for w in busy) - time.monotonic()))
+                wait([w.conn for w in busy] + [w.process.sentinel for w in busy], wait_timeout)
+                progress.check()
+
+                # 收集结果，处理崩溃和超时的工作进程
+                now = time.monotonic()
+                for i, worker in enumerate(workers):
+                    if worker.task is None:
+                        continue
+                    index, file_path = worker.task
+                    failure = None
+                    if worker.conn.poll():
+                        try:
+                            _, success, message = worker.conn.recv()
+                        except (EOFError, OSError):
+                            failure = f"工作进程异常退出 (退出码 {worker.process.exitcode})"
+                        else:
+                            worker.task = None
+                            record(index, success, message)
+                            continue
+                    elif not worker.process.is_alive():
+                        failure = f"工作进程异常退出 (退出码 {worker.process.exitcode})"
+                    elif worker.deadline is not None and now >= worker.deadline:
+                        failure = f"处理超时 (超过{self.timeout}秒)"
+                    else:
+                        continue
+
+                    worker.kill()
+                    workers[i] = _Worker(ctx) if pending else _IdleWorker()
+                    record(index, False, failure)
+        except OperationCancelled:
+            # 正在处理的文件不再等待，直接结束工作进程
+            for worker in workers:
+                worker.kill()
+            raise
+        finally:
+            for worker in workers:
+                worker.stop()
+
+        return results
+
+
+class _IdleWorker:
+    """已结束工作进程的占位对象，避免在没有剩余任务时重建进程"""
+
+    task = None
+
+    def stop(self):
+        pass
+
+    def kill(self):
+        pass
@@ -0,0 +1,276 @@
+"""本地缓存
+
+缓存保存在用户缓存目录下，可以通过环境变量 PDF_TOOLBOX_CACHE_DIR 指定其他位置。
+缓存只用于加速，任何读写错误都会被忽略，不影响正常处理。
+"""
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+
+def get_cache_dir():
+    """
+    获取缓存目录，不存在时创建
+    :return: str - 缓存目录路径
+    """
+    path = os.environ.get('PDF_TOOLBOX_CACHE_DIR')
+    if not path:
+        if sys.platform == 'win32':
+            base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+        elif sys.platform == 'darwin':
+            base = os.path.expanduser('~/Library/Caches')
+        else:
+            base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+        path = os.path.join(base, 'pdf-toolbox')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class ProbeCache:
+    """
+    PDF探测结果和文件指纹的缓存，以 (路径, 文件大小, 修改时间, inode) 为键，
+    文件被修改或替换后自动失效。超过条目数或总大小上限时淘汰最久未使用的条目
+    """
+    DEFAULT_MAX_ENTRIES = 20000
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    # 条目是否属于未修改的同一个文件（UPSERT 中 excluded 为新写入的值）
+    _SAME_FILE = ("CASE WHEN size = excluded.size AND mtime_ns = excluded.mtime_ns"
+                  " AND inode = excluded.inode")
+
+    def __init__(self, db_path=None, max_entries=None, max_bytes=None):
+        """
+        :param db_path: 数据库文件路径，默认为缓存目录下的 probe.sqlite3
+        :param max_entries: 最大条目数
+        :param max_bytes: 缓存数据的最大总字节数
+        """
+        self.db_path = db_path or os.path.join(get_cache_dir(), 'probe.sqlite3')
+        self.max_entries = max_entries or self.DEFAULT_MAX_ENTRIES
+        self.max_bytes = max_bytes or self.DEFAULT_MAX_BYTES
+        with self._connect() as conn:
+            # WAL 模式记录在数据库文件中，只需设置一次
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS probe ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER, mtime_ns INTEGER, inode INTEGER,"
+                " data TEXT, bytes INTEGER, accessed REAL, fingerprint TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS probe_accessed ON probe (accessed)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """
+        打开一个连接，在事务中执行操作后提交并关闭。
+        缓存可能在多个线程中使用，多个进程（批量处理的工作进程）也可能同时读写，
+        因此不在对象上保留连接
+        """
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def file_key(pdf_path):
+        """
+        计算文件的缓存键
+        :return: (绝对路径, 文件大小, 修改时间(ns), inode)
+        """
+        path = os.path.abspath(pdf_path)
+        st = os.stat(path)
+        return path, st.st_size, st.st_mtime_ns, st.st_ino
+
+    def get(self, pdf_path, page_sizes=False):
+        """
+        读取缓存的探测结果
+        :param pdf_path: PDF文件路径
+        :param page_sizes: 是否需要每一页的尺寸，缓存中没有时视为未命中
+        :return: dict|None - 探测结果，未命中时返回 None
+        """
+        path, size, mtime_ns, inode = self.file_key(pdf_path)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM probe WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ?"
+                " AND data IS NOT NULL",
+                (path, size, mtime_ns, inode)
+            ).fetchone()
+            if row is None:
+                return None
+            info = json.loads(row[0])
+            if page_sizes and 'PageSizes' not in info:
+                return None
+            conn.execute("UPDATE probe SET accessed = ? WHERE path = ?", (time.time(), path))
+
+        # JSON 会把元组变成列表
+        if info.get('PageSize') is not None:
+            info['PageSize'] = tuple(info['PageSize'])
+        if 'PageSizes' in info:
+            info['PageSizes'] = [tuple(s) if s is not None else None for s in info['PageSizes']]
+        return info
+
+    def put(self, pdf_path, info):
+        """
+        保存探测结果，同一路径的旧结果会被替换；文件未修改时保留已缓存的指纹
+        :param pdf_path: PDF文件路径
+        :param info: PDFProbe.probe 返回的信息字典
+        """
+        path, size, mtime_ns, inode = self.file_key(pdf_path)
+        data = json.dumps(info, ensure_ascii=False)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO probe (path, size, mtime_ns, inode, data, bytes, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (path) DO UPDATE SET"
+                " fingerprint = " + self._SAME_FILE + " THEN fingerprint END,"
+                " size = excluded.size, mtime_ns = excluded.mtime_ns, inode = excluded.inode,"
+                " data = excluded.data, bytes = excluded.bytes, accessed = excluded.accessed",
+                (path, size, mtime_ns, inode, data, len(data), time.time())
+            )
+            self._evict(conn)
+
+    def get_fingerprint(self, pdf_path):
+        """
+        读取缓存的文件指纹
+        :param pdf_path: PDF文件路径
+        :return: str|None - 文件指纹，未命中时返回 None
+        """
+        path, size, mtime_ns, inode = self.file_key(pdf_path)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fingerprint FROM probe WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ?",
+                (path, size, mtime_ns, inode)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def put_fingerprint(self, pdf_path, fingerprint):
+        """
+        保存文件指纹；文件未修改时保留已缓存的探测结果
+        :param pdf_path: PDF文件路径
+        :param fingerprint: 文件指纹（见 PDFProbe.fingerprint）
+        """
+        path, size, mtime_ns, inode = self.file_key(pdf_path)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO probe (path, size, mtime_ns, inode, bytes, accessed, fingerprint)"
+                " VALUES (?, ?, ?, ?, 0, ?, ?)"
+                " ON CONFLICT (path) DO UPDATE SET"
+                " data = " + self._SAME_FILE + " THEN data END,"
+                " bytes = " + self._SAME_FILE + " THEN bytes ELSE 0 END,"
+                " size = excluded.size, mtime_ns = excluded.mtime_ns, inode = excluded.inode,"
+                " accessed = excluded.accessed, fingerprint = excluded.fingerprint",
+                (path, size, mtime_ns, inode, time.time(), fingerprint)
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """淘汰最久未使用的条目，直到满足条目数和大小上限"""
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM probe").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        removed = []
+        for path, nbytes in conn.execute("SELECT path, bytes FROM probe ORDER BY accessed"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            removed.append((path,))
+            count -= 1
+            total -= nbytes
+        conn.executemany("DELETE FROM probe WHERE path = ?", removed)
+
+    def clear(self):
+        """清空缓存"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM probe")
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM probe").fetchone()[0]
+
+
+class ThumbnailCache:
+    """
+    页面缩略图的磁盘缓存，以 (文件指纹, 页码, 尺寸) 为键保存PNG文件。
+    读取时更新文件的修改时间，超过大小上限时按修改时间淘汰最久未使用的缩略图
+    """
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    # 每写入多少个缩略图检查一次总大小
+    EVICT_INTERVAL = 64
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        :param cache_dir: 缓存目录，默认为缓存目录下的 thumbnails
+        :param max_bytes: 缓存的最大总字节数
+        """
+        self.cache_dir = cache_dir or os.path.join(get_cache_dir(), 'thumbnails')
+        self.max_bytes = max_bytes or self.DEFAULT_MAX_BYTES
+        self._writes = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path_for(self, fingerprint, page, size):
+        """
+        缩略图文件路径
+        :param fingerprint: 文件指纹（见 PDFProbe.fingerprint）
+        :param page: 页码（从1开始）
+        :param size: (宽, 高)
+        :return: str - PNG文件路径
+        """
+        return os.path.join(self.cache_dir, fingerprint[:2],
+                            f"{fingerprint}_{page}_{size[0]}x{size[1]}.png")
+
+    def get(self, fingerprint, page, size):
+        """
+        查找缩略图
+        :return: str|None - PNG文件路径，未缓存时返回 None
+        """
+        path = self.path_for(fingerprint, page, size)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, fingerprint, page, size, image):
+        """
+        保存缩略图
+        :param image: PIL图像
+        :return: str - PNG文件路径
+        """
+        path = self.path_for(fingerprint, page, size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先写临时文件再改名，避免其他线程读到不完整的文件
+        temp_path = f"{path}.{os.getpid()}.{id(image)}.tmp"
+        image.save(temp_path, format='PNG')
+        os.replace(temp_path, path)
+
+        self._writes += 1
+        if self._writes % self.EVICT_INTERVAL == 0:
+            self.evict()
+        return path
+
+    def evict(self):
+        """淘汰最久未使用的缩略图，直到总大小不超过上限"""
+        entries = []
+        total = 0
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
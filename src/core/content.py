@@ -0,0 +1,77 @@
+import pikepdf
+from pikepdf import Name
+
+
+# 视为水印的标记内容标签
+WATERMARK_TAGS = {'/Watermark', '/Stamp', '/Background', '/Overlay', '/Underlay'}
+
+
+def drop_instruction(operands, operator):
+    """删除该指令"""
+    return []
+
+
+def retag_watermark(operands, operator):
+    """
+    将水印相关的标记内容（BMC/BDC）改标为 /Artifact
+    BDC 的属性字典会一并保留，不影响 EMC 的配对
+    """
+    if operands and str(operands[0]) in WATERMARK_TAGS:
+        return [([Name.Artifact] + list(operands[1:]), operator)]
+    return None
+
+
+class ContentRewriter:
+    # 移除水印使用的规则表：操作符 -> 规则函数
+    # 规则函数接收 (operands, operator)，返回 None 表示保持原样，
+    # 返回 [(operands, operator), ...] 表示替换为这些指令（空列表即删除）
+    WATERMARK_RULES = {
+        'gs': drop_instruction,
+        'BMC': retag_watermark,
+        'BDC': retag_watermark,
+    }
+
+    @staticmethod
+    def rewrite_instructions(instructions, rules):
+        """
+        按规则表一次遍历改写内容流指令
+        :param instructions: parse_content_stream 返回的指令序列
+        :param rules: {操作符: 规则函数}
+        :return: (改写后的指令列表, 被修改的指令数)
+        """
+        result = []
+        changed = 0
+        for instruction in instructions:
+            rule = rules.get(str(instruction.operator))
+            replacement = rule(instruction.operands, instruction.operator) if rule else None
+            if replacement is None:
+                result.append(instruction)
+            else:
+                result.extend(replacement)
+                changed += 1
+        return result, changed
+
+    @staticmethod
+    def rewrite_page(pdf, page, rules):
+        """
+        改写页面的内容流，多个内容流会作为一个整体解析，修改后写为单个内容流
+        :param pdf: 页面所属的pikepdf.Pdf对象
+        :param page: pikepdf.Page对象
+        :param rules: {操作符: 规则函数}
+        :return: int - 被修改的指令数，没有修改时页面保持不变
+        """
+        # 内容流中不包含任何规则操作符时跳过解析，逐条解析指令的开销远大于字节查找
+        contents = page.obj.get('/Contents')
+        if isinstance(contents, pikepdf.Stream):
+            contents = [contents]
+        if contents is None:
+            return 0
+        data = b''.join(stream.read_bytes() for stream in contents)
+        if not any(operator.encode() in data for operator in rules):
+            return 0
+
+        instructions = pikepdf.parse_content_stream(page)
+        result, changed = ContentRewriter.rewrite_instructions(instructions, rules)
+        if changed:
+            page.Contents = pdf.make_stream(pikepdf.unparse_content_stream(result))
+        return changed
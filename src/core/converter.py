@@ -1,90 +1,60 @@
-from pdf2image import convert_from_path
-from PyPDF2 import PdfReader
-from reportlab.pdfgen import canvas
+from pdf2image import convert_from_path, pdfinfo_from_path
 from reportlab.lib.pagesizes import letter, A4
 from PIL import Image
 import os
 import io
+import pikepdf
+from src.core.image_pdf import ImagePDFWriter, fit_image, prepare_images
+from src.core.probe import PDFProbe
+from src.core.progress import ensure_progress
 
 class PDFConverter:
+    # 渲染缓冲的默认内存上限（MB）
+    DEFAULT_MAX_MEMORY_MB = 512
+    # 无法获取页面尺寸时每块渲染的页数
+    DEFAULT_CHUNK_SIZE = 8
+    
     @staticmethod
-    def images_to_pdf(image_paths, output_path, page_size='A4', margin=20):
+    def images_to_pdf(image_paths, output_path, page_size='A4', margin=20, progress=None,
+                      workers=None, max_image_size=None):
         """
         将图片转换为PDF
         :param image_paths: 图片文件路径列表或PIL Image对象列表
         :param output_path: 输出PDF文件路径
         :param page_size: 页面大小 ('A4' 或 'letter')
         :param margin: 页面边距（像素）
+        :param progress: Progress，报告逐张图片的进度并支持取消
+        :param workers: 并行处理图片的进程数，None表示使用CPU核心数
+        :param max_image_size: 图片最长边的像素上限，超过时缩小，None表示保持原始尺寸
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
             # 选择页面大小
             if page_size.upper() == 'A4':
                 pdf_size = A4
             else:
                 pdf_size = letter
-                
-            # 创建PDF文档
-            c = canvas.Canvas(output_path, pagesize=pdf_size)
-            
-            # 获取页面尺寸
             page_width, page_height = pdf_size
             
-            # 计算可用区域（考虑边距）
-            available_width = page_width - 2 * margin
-            available_height = page_height - 2 * margin
-            
-            for image_source in image_paths:
-                try:
-                    # 处理图片
-                    if isinstance(image_source, str):
-                        # 如果是文件路径，打开图片
-                        img = Image.open(image_source)
-                    else:
-                        # 如果是PIL Image对象，直接使用
-                        img = image_source
-                        
-                    # 转换为RGB模式（如果需要）
-                    if img.mode not in ('RGB', 'L'):
-                        img = img.convert('RGB')
-                    
-                    # 获取图片尺寸
-                    img_width, img_height = img.size
-                    
-                    # 计算缩放比例
-                    width_ratio = available_width / img_width
-                    height_ratio = available_height / img_height
-                    scale = min(width_ratio, height_ratio)
-                    
-                    # 计算缩放后的尺寸
-                    new_width = img_width * scale
-                    new_height = img_height * scale
+            # 图片直接写入输出文件，JPEG原样嵌入，不产生临时文件
+            with ImagePDFWriter(output_path) as writer:
+                progress.start("转换图片", len(image_paths))
+                # 进程池并行解码图片，这里按原顺序逐页写入
+                for image, error in prepare_images(image_paths, workers, max_image_size):
+                    progress.advance()
+                    if error is not None:
+                        print(f"处理图片时出错: {str(error)}")
+                        continue
                     
-                    # 计算居中位置
-                    x = margin + (available_width - new_width) / 2
-                    y = margin + (available_height - new_height) / 2
-                    
-                    # 将图片保存为临时文件
-                    temp_path = f"temp_{os.getpid()}.jpg"
-                    img = img.resize((int(new_width), int(new_height)), Image.Resampling.LANCZOS)
-                    img.save(temp_path, "JPEG", quality=95)
-                    
-                    # 在PDF中绘制图片
-                    c.drawImage(temp_path, x, y, width=new_width, height=new_height)
-                    
-                    # 删除临时文件
-                    os.remove(temp_path)
-                    
-                    # 添加新页面（除了最后一张图片）
-                    if image_source != image_paths[-1]:
-                        c.showPage()
-                        
-                except Exception as e:
-                    print(f"处理图片时出错: {str(e)}")
-                    continue
-            
-            # 保存PDF
-            c.save()
+                    # 等比缩放到可用区域（考虑边距）并居中
+                    box = fit_image(*image.display_size, page_width, page_height, margin)
+                    writer.add_page(image, page_width, page_height, box)
+                
+                if writer.page_count == 0:
+                    raise ValueError("没有可以转换的图片")
+                progress.start("保存文件")
+            progress.saved(output_path)
             
             return True, f"成功将 {len(image_paths)} 张图片转换为PDF"
             
@@ -92,7 +62,128 @@ class PDFConverter:
             return False, f"转换失败: {str(e)}"
             
     @staticmethod
-    def pdf_to_images(input_path, output_dir, format='PNG', dpi=200, first_page=None, last_page=None):
+    def get_poppler_path():
+        """
+        获取项目自带的poppler路径
+        :return: poppler的bin目录，未找到时返回None
+        """
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        project_root = os.path.dirname(os.path.dirname(current_dir))
+        poppler_path = os.path.join(project_root, 'poppler', 'Library', 'bin')
+        
+        if not os.path.exists(poppler_path):
+            # 尝试其他可能的路径
+            poppler_path = os.path.join(project_root, 'poppler', 'bin')
+            
+        return poppler_path if os.path.exists(poppler_path) else None
+    
+    @staticmethod
+    def render_thumbnails(pdf_path, first_page, last_page, size=(120, 160)):
+        """
+        渲染连续几页的缩略图，一次调用poppler完成
+        :param pdf_path: PDF文件路径
+        :param first_page: 起始页码（从1开始）
+        :param last_page: 结束页码（包含）
+        :param size: 缩略图的最大 (宽, 高)，保持页面比例
+        :return: [(页码, PIL图像), ...]
+        """
+        images = convert_from_path(
+            pdf_path,
+            dpi=72,
+            first_page=first_page,
+            last_page=last_page,
+            size=size,
+            poppler_path=PDFConverter.get_poppler_path(),
+            userpw=None
+        )
+        return list(zip(range(first_page, last_page + 1), images))
+    
+    @staticmethod
+    def _plan_render(input_path, first_page, last_page):
+        """
+        确定渲染的页码范围和其中最大页面的面积。
+        页数和页面尺寸来自 PDFProbe（结果有缓存），只有探测无法确定尺寸的页面才用 pikepdf 读取
+        :return: (起始页码, 结束页码, 最大页面面积（平方点）|None)
+        """
+        success, info = PDFProbe.probe(input_path, page_sizes=True)
+        if not success or info['Pages'] is None:
+            # 加密等情况下回退到pdfinfo获取页数
+            total_pages = pdfinfo_from_path(input_path, poppler_path=PDFConverter.get_poppler_path())['Pages']
+            return max(1, first_page or 1), min(total_pages, last_page or total_pages), None
+        
+        total_pages = info['Pages']
+        first_page = max(1, first_page or 1)
+        last_page = min(total_pages, last_page or total_pages)
+        sizes = info['PageSizes'][first_page - 1:last_page]
+        areas = [size[0] * size[1] for size in sizes if size is not None]
+        unknown = [first_page + i for i, size in enumerate(sizes) if size is None]
+        if unknown:
+            try:
+                with pikepdf.Pdf.open(input_path) as pdf:
+                    for page_num in unknown:
+                        box = [float(v) for v in pdf.pages[page_num - 1].mediabox]
+                        areas.append(abs(box[2] - box[0]) * abs(box[3] - box[1]))
+            except Exception:
+                return first_page, last_page, None
+        return first_page, last_page, max(areas, default=0.0) or None
+    
+    @staticmethod
+    def estimate_chunk_size(page_area, dpi, max_memory_mb):
+        """
+        根据内存上限估算每块渲染的页数
+        :param page_area: 最大页面面积（平方点），None表示未知
+        :param dpi: 渲染DPI
+        :param max_memory_mb: 内存上限（MB）
+        :return: 每块页数，至少为1（单页超过上限时仍逐页渲染）
+        """
+        if not page_area:
+            return PDFConverter.DEFAULT_CHUNK_SIZE
+        # poppler输出的PPM缓冲区和解码后的RGB图片各占一份
+        page_bytes = page_area * (dpi / 72.0) ** 2 * 3 * 2
+        return max(1, int(max_memory_mb * 1024 * 1024 // page_bytes))
+    
+    @staticmethod
+    def iter_pdf_images(input_path, dpi=200, first_page=None, last_page=None,
+                        max_memory_mb=None, chunk_size=None, poppler_path=None):
+        """
+        分块渲染PDF页面，逐页产出图片，峰值内存只与块大小有关
+        :param input_path: 输入PDF文件路径
+        :param dpi: 输出图片的DPI（分辨率）
+        :param first_page: 起始页码（从1开始），None表示从第一页开始
+        :param last_page: 结束页码，None表示到最后一页
+        :param max_memory_mb: 渲染缓冲的内存上限（MB），None表示使用默认值
+        :param chunk_size: 每块渲染的页数，指定后忽略内存上限
+        :param poppler_path: poppler路径，None表示使用项目自带的poppler
+        :return: 生成器，逐个产出 (页码, PIL图片)
+        """
+        if poppler_path is None:
+            poppler_path = PDFConverter.get_poppler_path()
+        
+        first_page, last_page, page_area = PDFConverter._plan_render(input_path, first_page, last_page)
+        if chunk_size is None:
+            chunk_size = PDFConverter.estimate_chunk_size(
+                page_area, dpi, max_memory_mb or PDFConverter.DEFAULT_MAX_MEMORY_MB
+            )
+        
+        for start in range(first_page, last_page + 1, chunk_size):
+            end = min(start + chunk_size - 1, last_page)
+            images = convert_from_path(
+                input_path,
+                dpi=dpi,
+                first_page=start,
+                last_page=end,
+                poppler_path=poppler_path
+            )
+            # 逐个交出图片并释放引用，使已保存的页面可以立即被回收
+            images.reverse()
+            page_num = start
+            while images:
+                yield page_num, images.pop()
+                page_num += 1
+            
+    @staticmethod
+    def pdf_to_images(input_path, output_dir, format='PNG', dpi=200, first_page=None, last_page=None,
+                      max_memory_mb=None, progress=None):
         """
         将PDF文件转换为图片
         :param input_path: 输入PDF文件路径
@@ -101,8 +192,11 @@ class PDFConverter:
         :param dpi: 输出图片的DPI（分辨率）
         :param first_page: 起始页码（从1开始），None表示从第一页开始
         :param last_page: 结束页码，None表示到最后一页
+        :param max_memory_mb: 渲染缓冲的内存上限（MB），None表示使用默认值
+        :param progress: Progress，报告逐页进度和写入的字节数并支持取消
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
             if not os.path.exists(input_path):
                 return False, "输入文件不存在"
@@ -114,42 +208,41 @@ class PDFConverter:
             base_name = os.path.splitext(os.path.basename(input_path))[0]
             
             # 设置poppler路径
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(os.path.dirname(current_dir))
-            poppler_path = os.path.join(project_root, 'poppler', 'Library', 'bin')
-            
-            if not os.path.exists(poppler_path):
-                # 尝试其他可能的路径
-                poppler_path = os.path.join(project_root, 'poppler', 'bin')
-                
-            if not os.path.exists(poppler_path):
+            poppler_path = PDFConverter.get_poppler_path()
+            if poppler_path is None:
                 return False, "未找到poppler，请确保已正确安装poppler"
                 
-            # 转换PDF为图片
-            images = convert_from_path(
+            # 分块渲染，每页生成后立即保存。同时读取页面尺寸，之后规划渲染时直接使用缓存的结果
+            success, info = PDFProbe.probe(input_path, page_sizes=True)
+            total_pages = info['Pages'] if success else None
+            if total_pages:
+                total_pages = min(last_page or total_pages, total_pages) - (first_page or 1) + 1
+            progress.start("渲染页面", max(0, total_pages) if total_pages else 0)
+            count = 0
+            for page_num, image in PDFConverter.iter_pdf_images(
                 input_path,
                 dpi=dpi,
                 first_page=first_page,
                 last_page=last_page,
+                max_memory_mb=max_memory_mb,
                 poppler_path=poppler_path
-            )
-            
-            # 保存图片
-            for i, image in enumerate(images, start=1):
-                # 如果指定了起始页码，调整文件名中的页码
-                page_num = i if first_page is None else first_page + i - 1
+            ):
                 output_path = os.path.join(
                     output_dir,
                     f"{base_name}_第{page_num}页.{format.lower()}"
                 )
                 
-                # 如果是JPEG格式，转换为RGB模式��去除alpha通道）
+                # 如果是JPEG格式，转换为RGB模式（去除alpha通道）
                 if format.upper() == 'JPEG':
                     image = image.convert('RGB')
                 
                 image.save(output_path, format=format)
+                image.close()
+                count += 1
+                progress.saved(output_path)
+                progress.advance()
             
-            return True, f"转换完成，共生成{len(images)}个图片文件"
+            return True, f"转换完成，共生成{count}个图片文件"
             
         except Exception as e:
             return False, f"转换失败: {str(e)}"
@@ -157,7 +250,7 @@ class PDFConverter:
     @staticmethod
     def get_pdf_page_count(pdf_path):
         """
-        获取PDF文件的总页数
+        获取PDF文件的总页数，只读取页面树根节点，不解析整个文件
         :param pdf_path: PDF文件路径
         :return: (bool, int|str) - (是否成功, 页数|错误信息)
         """
@@ -165,9 +258,10 @@ class PDFConverter:
             if not os.path.exists(pdf_path):
                 return False, "文件不存在"
                 
-            # 使用PyPDF2获取页数
-            reader = PdfReader(pdf_path)
-            return True, len(reader.pages)
+            success, result = PDFProbe.get_page_count(pdf_path)
+            if not success:
+                return False, f"获取页数失败: {result}"
+            return True, result
             
         except Exception as e:
             return False, f"获取页数失败: {str(e)}" 
\ No newline at end of file
@@ -1,4 +1,3 @@
-from PyPDF2 import PdfReader, PdfWriter
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfbase import pdfmetrics
@@ -6,7 +5,16 @@ from reportlab.pdfbase.ttfonts import TTFont
 import os
 import io
 import pikepdf
+from collections import OrderedDict
 from reportlab.lib.colors import black
+from src.core import backend
+from src.core.optimizer import PDFOptimizer
+from src.core.content import ContentRewriter
+from src.core.image_pdf import ImagePDFWriter, fit_image, prepare_images
+from src.core.probe import PDFProbe
+from src.core.progress import ensure_progress
+from src.core.merge_engine import MergeEngine, MergeInputError
+from src.core.split_engine import PruneState, SplitEngine
 
 class PDFEditor:
     # 注册中文字体
@@ -26,13 +34,15 @@ class PDFEditor:
             DEFAULT_FONT = 'Helvetica'
 
     @staticmethod
-    def remove_watermark(input_path, output_path):
+    def remove_watermark(input_path, output_path, progress=None):
         """
         移除PDF水印
         :param input_path: 输入PDF文件路径
-        :param output_path: 输出PDF文件路径
+        :param output_path: 输出PDF文件路径，也可以是 BytesIO 等可写的文件对象
+        :param progress: Progress，报告逐页进度并支持取消
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
             # 检查输入文件是否存在
             if not os.path.exists(input_path):
@@ -42,6 +52,7 @@ class PDFEditor:
             pdf = pikepdf.Pdf.open(input_path)
             
             # 清理透明对象和图层
+            progress.start("移除水印", len(pdf.pages))
             for page in pdf.pages:
                 if page.get('/Resources'):
                     # 处理XObject
@@ -77,70 +88,12 @@ class PDFEditor:
                             except:
                                 pass
                     
-                    # 处理内容流
+                    # 处理内容流：按规则表一次遍历所有指令
                     if page.get('/Contents'):
-                        contents = page.Contents
-                        if isinstance(contents, pikepdf.Array):
-                            new_contents = pikepdf.Array()
-                            for content in contents:
-                                try:
-                                    stream = content.read_bytes()
-                                    # 移除水印相关操作
-                                    replacements = [
-                                        (b'/Watermark', b'/Artifact'),
-                                        (b'/Stamp', b'/Artifact'),
-                                        (b'/Background', b'/Artifact'),
-                                        (b'/Overlay', b'/Artifact'),
-                                        (b'/Underlay', b'/Artifact'),
-                                        (b'gs', b'n'),
-                                        (b'GS', b'n'),
-                                        (b'Gs', b'n'),
-                                        (b'BMC', b'BDC /Artifact'),
-                                        (b'BDC', b'BDC /Artifact'),
-                                        (b'EMC', b'EMC'),
-                                        (b'BM /Normal', b'BM /Compatible'),
-                                        (b'BM /Multiply', b'BM /Normal'),
-                                        (b'BM /Screen', b'BM /Normal'),
-                                        (b'BM /Overlay', b'BM /Normal'),
-                                        (b'BM /Darken', b'BM /Normal'),
-                                        (b'BM /Lighten', b'BM /Normal'),
-                                        (b'SMask', b'Artifact'),
-                                    ]
-                                    for old, new in replacements:
-                                        stream = stream.replace(old, new)
-                                    new_contents.append(pikepdf.Stream(pdf, stream))
-                                except Exception:
-                                    new_contents.append(content)
-                            page.Contents = new_contents
-                        elif isinstance(contents, pikepdf.Stream):
-                            try:
-                                stream = contents.read_bytes()
-                                # 应用相同的替换
-                                replacements = [
-                                    (b'/Watermark', b'/Artifact'),
-                                    (b'/Stamp', b'/Artifact'),
-                                    (b'/Background', b'/Artifact'),
-                                    (b'/Overlay', b'/Artifact'),
-                                    (b'/Underlay', b'/Artifact'),
-                                    (b'gs', b'n'),
-                                    (b'GS', b'n'),
-                                    (b'Gs', b'n'),
-                                    (b'BMC', b'BDC /Artifact'),
-                                    (b'BDC', b'BDC /Artifact'),
-                                    (b'EMC', b'EMC'),
-                                    (b'BM /Normal', b'BM /Compatible'),
-                                    (b'BM /Multiply', b'BM /Normal'),
-                                    (b'BM /Screen', b'BM /Normal'),
-                                    (b'BM /Overlay', b'BM /Normal'),
-                                    (b'BM /Darken', b'BM /Normal'),
-                                    (b'BM /Lighten', b'BM /Normal'),
-                                    (b'SMask', b'Artifact'),
-                                ]
-                                for old, new in replacements:
-                                    stream = stream.replace(old, new)
-                                page.Contents = pikepdf.Stream(pdf, stream)
-                            except Exception:
-                                pass
+                        try:
+                            ContentRewriter.rewrite_page(pdf, page, ContentRewriter.WATERMARK_RULES)
+                        except Exception:
+                            pass
                     
                     # 处理扩展图形状态
                     if '/ExtGState' in page.Resources:
@@ -180,6 +133,8 @@ class PDFEditor:
                             del page.Resources['/Properties']
                         except:
                             pass
+                
+                progress.advance()
             
             # 移除文档级别的设置
             for key in ['/OCProperties', '/Metadata', '/MarkInfo']:
@@ -189,33 +144,96 @@ class PDFEditor:
                     except:
                         pass
             
-            # 保存处理后的文件，使用最大压缩
+            # 所有修改都在内存中完成，只写出一次，使用最大压缩
             pdf.save(output_path,
                     compress_streams=True,
                     preserve_pdfa=True,
                     object_stream_mode=pikepdf.ObjectStreamMode.generate,
-                    stream_decode_level=pikepdf.StreamDecodeLevel.generalized)
+                    stream_decode_level=pikepdf.StreamDecodeLevel.generalized,
+                    progress=progress.saving())
             pdf.close()
-            
-            # 尝试二次处理
-            try:
-                pdf = pikepdf.Pdf.open(output_path)
-                pdf.save(output_path,
-                        compress_streams=True,
-                        preserve_pdfa=True,
-                        object_stream_mode=pikepdf.ObjectStreamMode.generate,
-                        stream_decode_level=pikepdf.StreamDecodeLevel.generalized)
-                pdf.close()
-            except:
-                pass
+            progress.saved(output_path)
             
             return True, "水印清理完成"
             
         except Exception as e:
             return False, f"水印处理失败: {str(e)}"
     
+    # 水印页面缓存：(页面宽, 页面高, 旋转, 文字, 透明度, 角度, 字体) -> 水印PDF数据
+    # 在同一进程内跨文件复用，批量处理时每个工作进程各自缓存
+    WATERMARK_CACHE_SIZE = 64
+    _watermark_cache = OrderedDict()
+
     @staticmethod
-    def add_watermark(input_path, output_path, watermark_text, opacity=0.3, angle=45):
+    def _create_watermark_overlay(watermark_text, opacity, angle, page_width, page_height, rotation=0):
+        """
+        生成水印页面
+        :param watermark_text: 水印文字
+        :param opacity: 水印透明度 (0-1)
+        :param angle: 旋转角度
+        :param page_width: 页面宽度
+        :param page_height: 页面高度
+        :param rotation: 页面的 /Rotate 值，水印会反向补偿，使其在显示时保持指定角度
+        :return: bytes - 只有一页水印的PDF数据
+        """
+        packet = io.BytesIO()
+        c = canvas.Canvas(packet, pagesize=(page_width, page_height))
+        c.saveState()
+        
+        # 移动到页面中心
+        c.translate(page_width/2, page_height/2)
+        c.rotate(angle + rotation)
+        c.setFillAlpha(float(opacity))
+        
+        # 设置字体和大小
+        font_size = min(page_width, page_height) / 10  # 根据页面大小调整字体大小
+        c.setFont(PDFEditor.DEFAULT_FONT, font_size)
+        
+        # 绘制水印文字
+        c.setFillGray(0.5)  # 设置水印颜色为灰色
+        c.drawCentredString(0, 0, watermark_text)
+        c.restoreState()
+        c.save()
+        
+        return packet.getvalue()
+
+    @staticmethod
+    def _get_watermark_overlay(watermark_text, opacity, angle, page_width, page_height, rotation=0):
+        """
+        获取指定页面几何的水印页面，每种几何只生成一次
+        :return: (缓存键, 水印PDF数据)
+        """
+        key = (round(page_width, 2), round(page_height, 2), rotation % 360,
+               watermark_text, float(opacity), float(angle), PDFEditor.DEFAULT_FONT)
+        cache = PDFEditor._watermark_cache
+        if key in cache:
+            cache.move_to_end(key)
+        else:
+            cache[key] = PDFEditor._create_watermark_overlay(
+                watermark_text, opacity, angle, key[0], key[1], key[2]
+            )
+            while len(cache) > PDFEditor.WATERMARK_CACHE_SIZE:
+                cache.popitem(last=False)
+        return key, cache[key]
+
+    @staticmethod
+    def _get_inherited(page_obj, key):
+        """
+        读取页面属性，页面本身没有时沿页面树向上查找继承值
+        :param page_obj: 页面字典
+        :param key: 属性名，如 '/Rotate'、'/Resources'
+        :return: 属性值，找不到时返回 None
+        """
+        node = page_obj
+        while node is not None:
+            if key in node:
+                return node[key]
+            node = node.get('/Parent')
+        return None
+
+    @staticmethod
+    def add_watermark(input_path, output_path, watermark_text, opacity=0.3, angle=45, mode='xobject',
+                      progress=None):
         """
         添加文字水印
         :param input_path: 输入PDF文件路径
@@ -223,78 +241,182 @@ class PDFEditor:
         :param watermark_text: 水印文字
         :param opacity: 水印透明度 (0-1)
         :param angle: 旋转角度
+        :param mode: 'xobject' 将水印作为一个共享的Form XObject引用到每一页；
+                     'merge' 逐页合并水印内容流（旧方式）
+        :param progress: Progress，报告逐页进度并支持取消
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
-            # 创建水印PDF
-            packet = io.BytesIO()
-            c = canvas.Canvas(packet, pagesize=letter)
-            c.saveState()
-            
-            # 获取页面尺寸
-            reader = PdfReader(input_path)
-            if reader.pages:
-                # 获取第一页的尺寸
-                page = reader.pages[0]
-                mediabox = page.mediabox
-                page_width = float(mediabox.width)
-                page_height = float(mediabox.height)
+            if mode == 'merge':
+                PDFEditor._add_watermark_merge(input_path, output_path, watermark_text, opacity, angle, progress)
+            elif mode == 'xobject':
+                PDFEditor._add_watermark_xobject(input_path, output_path, watermark_text, opacity, angle, progress)
             else:
-                page_width = float(letter[0])
-                page_height = float(letter[1])
-            
-            # 创建画布使用实际页面尺寸
-            packet = io.BytesIO()
-            c = canvas.Canvas(packet, pagesize=(page_width, page_height))
-            c.saveState()
-            
-            # 移动到页面中心
-            c.translate(page_width/2, page_height/2)
-            c.rotate(angle)
-            c.setFillAlpha(float(opacity))
-            
-            # 设置字体和大小
-            font_size = min(page_width, page_height) / 10  # 根据页面大小调整字体大小
-            c.setFont(PDFEditor.DEFAULT_FONT, font_size)
-            
-            # 绘制水印文字
-            c.setFillGray(0.5)  # 设置水印颜色为灰色
-            c.drawCentredString(0, 0, watermark_text)
-            c.restoreState()
-            c.save()
-            
-            # 移动到开始位置
-            packet.seek(0)
-            watermark = PdfReader(packet)
-            watermark_page = watermark.pages[0]
-            
-            # 读取原始PDF
-            writer = PdfWriter()
-            
-            # 为每一页添加水印
-            for page in reader.pages:
-                page.merge_page(watermark_page)
-                writer.add_page(page)
-            
-            # 保存结果
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
+                return False, f"不支持的水印模式: {mode}"
+            progress.saved(output_path)
                 
             return True, "水印添加成功"
             
         except Exception as e:
             return False, f"添加水印失败: {str(e)}"
-    
+
+    @staticmethod
+    def _add_watermark_merge(input_path, output_path, watermark_text, opacity, angle, progress):
+        """
+        将水印页面的内容流直接合并到每一页（不使用Form XObject）。
+        水印用到的字体等资源以 Wm 开头的名称加入页面资源，与页面原有资源重名时改名，
+        改名方式相同的页面共用同一条水印内容流
+        """
+        with pikepdf.Pdf.open(input_path) as pdf:
+            prefix = pdf.make_stream(b'q\n')
+            # 每种页面几何对应的 (水印资源列表, 水印内容流指令)
+            overlays = {}
+            # (几何, 资源名, 位置) -> 合并到页面的内容流
+            stamps = {}
+            
+            progress.start("添加水印", len(pdf.pages))
+            for page in pdf.pages:
+                x0, y0, x1, y1 = [float(v) for v in page.mediabox]
+                rotation = int(PDFEditor._get_inherited(page.obj, '/Rotate') or 0)
+                key, data = PDFEditor._get_watermark_overlay(
+                    watermark_text, opacity, angle, x1 - x0, y1 - y0, rotation
+                )
+                if key not in overlays:
+                    overlays[key] = PDFEditor._copy_overlay(pdf, data)
+                resources, instructions = overlays[key]
+                
+                # 水印资源加入页面资源，记录实际使用的名称
+                names = {}
+                for category, name, resource in resources:
+                    names[name] = PDFEditor._add_page_resource(page, category, resource, 'Wm' + name[1:])
+                
+                stamp_key = (key, tuple(sorted((name, str(new)) for name, new in names.items())),
+                             round(x0, 4), round(y0, 4))
+                if stamp_key not in stamps:
+                    renamed = [
+                        ([names.get(str(v), v) if isinstance(v, pikepdf.Name) else v for v in operands], operator)
+                        for operands, operator in instructions
+                    ]
+                    # 对齐到页面的 MediaBox 原点
+                    stamps[stamp_key] = pdf.make_stream(
+                        f"Q q 1 0 0 1 {stamp_key[2]:g} {stamp_key[3]:g} cm\n".encode()
+                        + pikepdf.unparse_content_stream(renamed) + b"\nQ\n"
+                    )
+                
+                page.contents_add(prefix, prepend=True)
+                page.contents_add(stamps[stamp_key])
+                progress.advance()
+            
+            pdf.save(output_path, progress=progress.saving())
+
+    @staticmethod
+    def _copy_overlay(pdf, data):
+        """
+        将水印页面的资源复制到目标文档
+        :param pdf: 目标 pikepdf.Pdf
+        :param data: 只有一页水印的PDF数据
+        :return: ([(资源类别, 资源名, 目标文档中的间接对象), ...], 水印内容流指令列表)
+        """
+        with pikepdf.Pdf.open(io.BytesIO(data)) as overlay:
+            page = overlay.pages[0]
+            instructions = [(list(operands), operator)
+                            for operands, operator in pikepdf.parse_content_stream(page)]
+            resources = []
+            for category, entries in page.obj.get('/Resources', {}).items():
+                if not isinstance(entries, pikepdf.Dictionary):
+                    continue
+                for name, resource in entries.items():
+                    if not resource.is_indirect:
+                        resource = overlay.make_indirect(resource)
+                    resources.append((category, name, pdf.copy_foreign(resource)))
+            return resources, instructions
+
+    @staticmethod
+    def _add_watermark_xobject(input_path, output_path, watermark_text, opacity, angle, progress):
+        """
+        将水印作为Form XObject只存储一次，每页只增加一条很短的内容流来引用它，
+        页面原有内容用共享的 q 前缀和 Q 包裹，避免其图形状态影响水印。
+        不同尺寸和旋转的页面使用各自的水印，每种几何在文件中只存储一份
+        """
+        with pikepdf.Pdf.open(input_path) as pdf:
+            prefix = pdf.make_stream(b'q\n')
+            # 每种页面几何对应的Form XObject
+            forms = {}
+            # 资源名和位置相同的页面共用同一条引用水印的内容流
+            stamps = {}
+            
+            progress.start("添加水印", len(pdf.pages))
+            for page in pdf.pages:
+                x0, y0, x1, y1 = [float(v) for v in page.mediabox]
+                rotation = int(PDFEditor._get_inherited(page.obj, '/Rotate') or 0)
+                key, data = PDFEditor._get_watermark_overlay(
+                    watermark_text, opacity, angle, x1 - x0, y1 - y0, rotation
+                )
+                if key not in forms:
+                    with pikepdf.Pdf.open(io.BytesIO(data)) as overlay:
+                        forms[key] = pdf.copy_foreign(overlay.pages[0].as_form_xobject())
+                
+                name = PDFEditor._add_page_resource(page, '/XObject', forms[key], 'Wm')
+                
+                # 对齐到页面的 MediaBox 原点
+                stamp_key = (str(name), round(x0, 4), round(y0, 4))
+                if stamp_key not in stamps:
+                    stamps[stamp_key] = pdf.make_stream(
+                        f"Q q 1 0 0 1 {stamp_key[1]:g} {stamp_key[2]:g} cm {name} Do Q\n".encode()
+                    )
+                
+                page.contents_add(prefix, prepend=True)
+                page.contents_add(stamps[stamp_key])
+                progress.advance()
+            
+            pdf.save(output_path, progress=progress.saving())
+
     @staticmethod
-    def compress_pdf(input_path, output_path, quality='medium', image_dpi=None):
+    def _add_page_resource(page, category, resource, prefix):
+        """
+        将资源对象加入页面资源字典，返回其资源名
+        同一个对象已存在时直接复用，名称被其他对象占用时依次尝试 prefix1、prefix2 ...
+        :param page: pikepdf.Page对象
+        :param category: 资源类别，如 '/XObject'、'/Font'
+        :param resource: 要加入的资源（间接对象）
+        :param prefix: 资源名前缀
+        :return: pikepdf.Name - 资源名
+        """
+        resources = page.obj.get('/Resources')
+        if resources is None:
+            # 资源可能继承自页面树的上级节点，复制一份到页面上再修改
+            inherited = PDFEditor._get_inherited(page.obj, '/Resources') or {}
+            page.obj.Resources = resources = pikepdf.Dictionary(dict(inherited.items()))
+        if category not in resources:
+            resources[category] = pikepdf.Dictionary()
+        entries = resources[category]
+        
+        index = 0
+        while True:
+            name = pikepdf.Name('/' + prefix + (str(index) if index else ''))
+            existing = entries.get(name)
+            if existing is None:
+                entries[name] = resource
+                return name
+            if existing.is_indirect and existing.objgen == resource.objgen:
+                return name
+            index += 1
+
+    @staticmethod
+    def compress_pdf(input_path, output_path, quality='medium', image_dpi=None, deduplicate=True,
+                     progress=None):
         """
         压缩PDF文件
         :param input_path: 输入PDF文件路径
         :param output_path: 输出PDF文件路径
         :param quality: 压缩质量 ('low', 'medium', 'high')
-        :param image_dpi: 图片DPI，None表示保持原始DPI
+        :param image_dpi: 图片目标DPI，按图片在页面上的显示尺寸计算，超过该DPI的图片会被重新采样，None表示保持原始DPI
+        :param deduplicate: 是否合并内容相同的图片和字体
+        :param progress: Progress，报告图片处理和保存进度并支持取消
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
             # 检查输入文件是否存在
             if not os.path.exists(input_path):
@@ -303,38 +425,15 @@ class PDFEditor:
             # 使用pikepdf打开PDF
             pdf = pikepdf.Pdf.open(input_path)
             
-            # 处理每一页
-            for page in pdf.pages:
-                if page.get('/Resources'):
-                    # 处理图片
-                    if '/XObject' in page.Resources:
-                        xobjects = page.Resources.XObject
-                        for key, xobject in list(xobjects.items()):  # 使用list()创建副本进行迭代
-                            try:
-                                if isinstance(xobject, pikepdf.Dictionary) and xobject.get('/Subtype') == '/Image':
-                                    # 如果是图片，进行压缩
-                                    if image_dpi is not None and image_dpi != 72:  # 72 DPI是PDF的标分辨率
-                                        try:
-                                            # 获取原始尺寸
-                                            orig_w = int(xobject.get('/Width', 0))
-                                            orig_h = int(xobject.get('/Height', 0))
-                                            
-                                            if orig_w > 0 and orig_h > 0:
-                                                # 计算新尺寸
-                                                scale = image_dpi / 72.0
-                                                new_w = max(1, int(orig_w * scale))
-                                                new_h = max(1, int(orig_h * scale))
-                                                
-                                                # 更新图片尺寸
-                                                if new_w != orig_w or new_h != orig_h:
-                                                    xobject['/Width'] = new_w
-                                                    xobject['/Height'] = new_h
-                                        except Exception as e:
-                                            print(f"处理图片尺寸时出错: {str(e)}")
-                                            continue
-                            except Exception as e:
-                                print(f"处理XObject时出错: {str(e)}")
-                                continue
+            # 按实际显示尺寸对图片重新采样和编码
+            skipped = 0
+            if image_dpi is not None:
+                _, _, skipped = PDFOptimizer.downsample_images(pdf, image_dpi, quality, progress)
+            
+            # 合并重复的图片和字体
+            if deduplicate:
+                progress.start("合并重复对象")
+                PDFOptimizer.deduplicate_objects(pdf)
             
             # 根据质量设置压缩参数
             if quality == 'low':
@@ -343,45 +442,71 @@ class PDFEditor:
                         compress_streams=True,
                         preserve_pdfa=False,
                         object_stream_mode=pikepdf.ObjectStreamMode.generate,
-                        stream_decode_level=pikepdf.StreamDecodeLevel.none)
+                        stream_decode_level=pikepdf.StreamDecodeLevel.none,
+                        progress=progress.saving())
             elif quality == 'medium':
                 # 平衡压缩
                 pdf.save(output_path,
                         compress_streams=True,
                         preserve_pdfa=True,
                         object_stream_mode=pikepdf.ObjectStreamMode.generate,
-                        stream_decode_level=pikepdf.StreamDecodeLevel.generalized)
+                        stream_decode_level=pikepdf.StreamDecodeLevel.generalized,
+                        progress=progress.saving())
             else:  # high
                 # 最小压缩
                 pdf.save(output_path,
                         compress_streams=True,
                         preserve_pdfa=True,
                         object_stream_mode=pikepdf.ObjectStreamMode.preserve,
-                        stream_decode_level=pikepdf.StreamDecodeLevel.specialized)
+                        stream_decode_level=pikepdf.StreamDecodeLevel.specialized,
+                        progress=progress.saving())
+            progress.saved(output_path)
             
             # 计算压缩比例
             original_size = os.path.getsize(input_path)
             compressed_size = os.path.getsize(output_path)
             compression_ratio = ((original_size - compressed_size) / original_size) * 100
             
+            # 无法处理的图片保持原样，在结果中说明
+            note = f"（{skipped}张图片无法处理，已保持原样）" if skipped else ""
             if compression_ratio <= 0:
-                return True, "文件已经是最优大小无需进一步压缩"
+                return True, f"文件已经是最优大小无需进一步压缩{note}"
             
-            return True, f"压缩成功！压缩率：{compression_ratio:.1f}%"
+            return True, f"压缩成功！压缩率：{compression_ratio:.1f}%{note}"
             
         except Exception as e:
             return False, f"压缩失败: {str(e)}" 
     
     @staticmethod
-    def pdf_to_images(input_path, output_dir, image_format='png', dpi=300):
+    def plan_render_shards(total_pages, workers, shards_per_worker=4):
+        """
+        将页码范围划分为渲染分片
+        分片数量多于并发数，空闲的渲染进程会领取下一个分片，从而平衡复杂页面和简单页面的耗时
+        :param total_pages: 总页数
+        :param workers: 并发渲染进程数
+        :param shards_per_worker: 每个渲染进程平均分到的分片数
+        :return: 分片列表 [(起始页码, 结束页码), ...]，页码从1开始
+        """
+        if total_pages <= 0:
+            return []
+        shard_count = max(1, min(total_pages, workers * shards_per_worker))
+        shard_size = -(-total_pages // shard_count)
+        return [(first, min(first + shard_size - 1, total_pages))
+                for first in range(1, total_pages + 1, shard_size)]
+    
+    @staticmethod
+    def pdf_to_images(input_path, output_dir, image_format='png', dpi=300, workers=None, progress=None):
         """
         将PDF转换为图片
         :param input_path: 输入PDF文件路径
         :param output_dir: 输出目录路径
         :param image_format: 图片格式 ('png', 'jpeg', 'tiff')
         :param dpi: 图片DPI
+        :param workers: 并发的poppler渲染进程数，None表示使用CPU核心数
+        :param progress: Progress，每渲染完一个分片报告一次，取消后不再开始新的分片
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
             # 检查输入文件是否存在
             if not os.path.exists(input_path):
@@ -393,82 +518,102 @@ class PDFEditor:
             
             # 使用pdf2image进行转换
             from pdf2image import convert_from_path
-            
-            # 转换PDF为图片
-            images = convert_from_path(
-                input_path,
-                dpi=dpi,
-                fmt=image_format,
-                output_folder=output_dir,
-                output_file=os.path.splitext(os.path.basename(input_path))[0],
-                paths_only=True,
-                poppler_path=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'poppler', 'bin')
-            )
+            from concurrent.futures import ThreadPoolExecutor, as_completed
+            
+            poppler_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'poppler', 'bin')
+            output_file = os.path.splitext(os.path.basename(input_path))[0]
+            workers = max(1, workers or os.cpu_count() or 1)
+            total_pages = PDFEditor.get_pdf_page_count(input_path)
+            shards = PDFEditor.plan_render_shards(total_pages, workers)
+            
+            def render_shard(shard):
+                # pdftoppm按文档总页数补齐页码位数，分片输出的文件名与整体转换完全一致
+                first_page, last_page = shard
+                convert_from_path(
+                    input_path,
+                    dpi=dpi,
+                    fmt=image_format,
+                    output_folder=output_dir,
+                    output_file=output_file,
+                    first_page=first_page,
+                    last_page=last_page,
+                    paths_only=True,
+                    poppler_path=poppler_path
+                )
+                return last_page - first_page + 1
+            
+            # 多个poppler进程并发渲染各个分片
+            progress.start("渲染页面", total_pages)
+            count = 0
+            with ThreadPoolExecutor(max_workers=min(workers, len(shards) or 1)) as executor:
+                futures = [executor.submit(render_shard, shard) for shard in shards]
+                try:
+                    for future in as_completed(futures):
+                        pages = future.result()
+                        count += pages
+                        progress.advance(pages)
+                except BaseException:
+                    # 出错或取消时丢弃尚未开始的分片，只等待正在渲染的分片结束
+                    # （shutdown 的 cancel_futures 参数需要 Python 3.9）
+                    for pending in futures:
+                        pending.cancel()
+                    raise
             
             # 返回成功信息
-            return True, f"转换完成，生成{len(images)}张图片"
+            return True, f"转换完成，生成{count}张图片"
             
         except Exception as e:
             return False, f"转换失败: {str(e)}" 
 
     @staticmethod
-    def images_to_pdf(input_paths, output_path, page_size='A4', margin=10):
+    def images_to_pdf(input_paths, output_path, page_size='A4', margin=10, progress=None,
+                      workers=None, max_image_size=None):
         """
         将图片转换为PDF
         :param input_paths: 输入图片文件路径列表
         :param output_path: 输出PDF文件路径
         :param page_size: 页面大小 ('A4', 'Letter', '自动')
         :param margin: 页边距（毫米）
+        :param progress: Progress，报告逐张图片的进度并支持取消
+        :param workers: 并行处理图片的进程数，None表示使用CPU核心数
+        :param max_image_size: 图片最长边的像素上限，超过时缩小，None表示保持原始尺寸
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
-            from PIL import Image
             from reportlab.lib.pagesizes import A4, letter
             from reportlab.lib.units import mm
             
-            # 创建PDF写入器
-            writer = PdfWriter()
+            margin_pt = margin * mm
             
-            # 处理每个图片
-            for img_path in input_paths:
-                # 打开图片
-                img = Image.open(img_path)
-                
-                # 转换为RGB模式（如果是RGBA，去除透明通道）
-                if img.mode == 'RGBA':
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[3])
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # 确定页面大小
-                if page_size == 'A4':
-                    page_width, page_height = A4
-                elif page_size == 'Letter':
-                    page_width, page_height = letter
-                else:  # 自动
-                    # 根据图片尺寸和DPI计算页面大小
-                    img_width_mm = img.width * 25.4 / img.info.get('dpi', (72, 72))[0]
-                    img_height_mm = img.height * 25.4 / img.info.get('dpi', (72, 72))[1]
-                    page_width = img_width_mm * mm + 2 * margin * mm
-                    page_height = img_height_mm * mm + 2 * margin * mm
-                
-                # 创建临时的PDF文件
-                img_temp = io.BytesIO()
-                img.save(img_temp, format='PDF', resolution=72.0)
-                img_temp.seek(0)
-                
-                # 读取临时PDF并添加到写入器
-                reader = PdfReader(img_temp)
-                if reader.pages:
-                    writer.add_page(reader.pages[0])
+            # 每张图片直接作为图像对象写入输出文件，写完一页即释放
+            with ImagePDFWriter(output_path) as writer:
+                progress.start("转换图片", len(input_paths))
+                # 进程池并行解码图片，这里按原顺序逐页写入
+                for image, error in prepare_images(input_paths, workers, max_image_size):
+                    if error is not None:
+                        raise error
+                    image_width, image_height = image.display_size
+                    
+                    # 确定页面大小
+                    if page_size == 'A4':
+                        page_width, page_height = A4
+                    elif page_size == 'Letter':
+                        page_width, page_height = letter
+                    else:  # 自动
+                        # 根据图片尺寸和DPI计算页面大小
+                        dpi_x, dpi_y = image.dpi or (72, 72)
+                        if image_width != image.width:
+                            dpi_x, dpi_y = dpi_y, dpi_x
+                        page_width = image_width * 72.0 / dpi_x + 2 * margin_pt
+                        page_height = image_height * 72.0 / dpi_y + 2 * margin_pt
+                    
+                    box = fit_image(image_width, image_height, page_width, page_height, margin_pt)
+                    writer.add_page(image, page_width, page_height, box)
+                    progress.advance()
                 
-                img_temp.close()
-            
-            # 保存最终的PDF
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
+                progress.start("保存文件")
+            progress.saved(output_path)
                 
             return True, f"转换成功，处理{len(input_paths)}张图片"
             
@@ -478,38 +623,27 @@ class PDFEditor:
     @staticmethod
     def get_pdf_page_count(input_path):
         """
-        获取PDF文件的总页数
+        获取PDF文件的总页数，只读取页面树根节点，不解析整个文件
         :param input_path: 输入PDF文件路径
         :return: 总页数
         """
-        try:
-            # 先尝试使用 pikepdf 打开
-            try:
-                with pikepdf.Pdf.open(input_path, allow_overwriting_input=True) as pdf:
-                    return len(pdf.pages)
-            except pikepdf.PasswordError:
-                # 如果文件有密码保护，尝试使用 PyPDF2
-                with open(input_path, 'rb') as file:
-                    reader = PdfReader(file)
-                    if reader.is_encrypted:
-                        # 如果是加密的PDF，尝试使用空密码
-                        try:
-                            reader.decrypt('')
-                        except:
-                            raise Exception("PDF文件受密码保护")
-                    return len(reader.pages)
-        except Exception as e:
-            raise Exception(f"获取页数失败: {str(e)}")
+        success, result = PDFProbe.get_page_count(input_path)
+        if not success:
+            raise Exception(f"获取页数失败: {result}")
+        return result
     
     @staticmethod
-    def split_pdf(input_path, output_dir, page_groups=None):
+    def split_pdf(input_path, output_dir, page_groups=None, progress=None, workers=None):
         """
         分割PDF文件
         :param input_path: 输入PDF文件路径
         :param output_dir: 输出目录
         :param page_groups: 页面组列表，每个元素可以是页码范围字符串，如 "1-3,5,7-9"
+        :param progress: Progress，每写出一个文件报告一次并支持取消
+        :param workers: 并行写出文件的进程数，None表示使用CPU核心数
         :return: (success, message)
         """
+        progress = ensure_progress(progress)
         try:
             # 检查输入文件是否存在
             if not os.path.exists(input_path):
@@ -519,45 +653,39 @@ class PDFEditor:
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir)
             
-            # 打开PDF文件
-            with pikepdf.Pdf.open(input_path) as pdf:
-                total_pages = len(pdf.pages)
-                
-                if page_groups is None:
-                    # 单页拆分模式
-                    for i in range(total_pages):
-                        with pikepdf.Pdf.new() as new_pdf:
-                            new_pdf.pages.append(pdf.pages[i])
-                            output_path = os.path.join(output_dir, f"page_{i+1}.pdf")
-                            new_pdf.save(output_path)
-                    return True, f"已将PDF分割��{total_pages}个单页文件"
-                
-                # 处理页面组
-                for i, group in enumerate(page_groups):
-                    pages_to_extract = []
-                    # 处理页码范围字符串
-                    ranges = group.split(',')
-                    for r in ranges:
-                        r = r.strip()
-                        if '-' in r:
-                            start, end = map(int, r.split('-'))
-                            if start < 1 or end > total_pages:
-                                return False, f"页码范围 {r} 超出有效范围 (1-{total_pages})"
-                            pages_to_extract.extend(range(start-1, end))
-                        else:
-                            page = int(r)
-                            if page < 1 or page > total_pages:
-                                return False, f"页码 {page} 超出有效范围 (1-{total_pages})"
-                            pages_to_extract.append(page-1)
-                    
-                    # 创建新的PDF文件
-                    with pikepdf.Pdf.new() as new_pdf:
-                        for page_num in pages_to_extract:
-                            new_pdf.pages.append(pdf.pages[page_num])
-                        output_path = os.path.join(output_dir, f"group_{i+1}.pdf")
-                        new_pdf.save(output_path)
-                
-                return True, f"已成功分割为{len(page_groups)}个文件"
+            # 页数只读取页面树根节点（并被缓存），源文件只在分割引擎中解析一次
+            success, total_pages = PDFProbe.get_page_count(input_path)
+            if not success:
+                return False, f"分割失败：{total_pages}"
+            
+            if page_groups is None:
+                # 单页拆分模式
+                outputs = [(os.path.join(output_dir, f"page_{i+1}.pdf"), [i]) for i in range(total_pages)]
+                SplitEngine(workers).split(input_path, outputs, progress)
+                return True, f"已将PDF分割为{total_pages}个单页文件"
+            
+            # 处理页面组，先检查所有页码，再一次性写出
+            outputs = []
+            for i, group in enumerate(page_groups):
+                pages_to_extract = []
+                # 处理页码范围字符串
+                ranges = group.split(',')
+                for r in ranges:
+                    r = r.strip()
+                    if '-' in r:
+                        start, end = map(int, r.split('-'))
+                        if start < 1 or end > total_pages:
+                            return False, f"页码范围 {r} 超出有效范围 (1-{total_pages})"
+                        pages_to_extract.extend(range(start-1, end))
+                    else:
+                        page = int(r)
+                        if page < 1 or page > total_pages:
+                            return False, f"页码 {page} 超出有效范围 (1-{total_pages})"
+                        pages_to_extract.append(page-1)
+                outputs.append((os.path.join(output_dir, f"group_{i+1}.pdf"), pages_to_extract))
+            
+            SplitEngine(workers).split(input_path, outputs, progress)
+            return True, f"已成功分割为{len(page_groups)}个文件"
                 
         except ValueError as ve:
             return False, f"页码格式错误：{str(ve)}"
@@ -565,13 +693,17 @@ class PDFEditor:
             return False, f"分割失败：{str(e)}" 
 
     @staticmethod
-    def merge_pdfs(input_paths, output_path):
+    def merge_pdfs(input_paths, output_path, progress=None, max_open_files=None, workers=None):
         """
-        合并多个PDF文件
+        合并多个PDF文件，各文件的书签一并保留
         :param input_paths: 输入PDF文件路径列表
         :param output_path: 输出PDF文件路径
+        :param progress: Progress，报告逐个文件的进度和保存进度并支持取消
+        :param max_open_files: 每个进程同时打开的输入文件数上限，None表示使用 MergeEngine.MAX_OPEN_FILES
+        :param workers: 并行合并的进程数，None表示使用CPU核心数
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
             # 检查输入文件是否都存在
             for path in input_paths:
@@ -583,40 +715,36 @@ class PDFEditor:
             if output_dir and not os.path.exists(output_dir):
                 os.makedirs(output_dir)
             
-            # 创建新的PDF文件
-            output = pikepdf.Pdf.new()
-            
-            # 逐个处理输入文件
-            for input_path in input_paths:
-                try:
-                    # 打开PDF文件
-                    with pikepdf.Pdf.open(input_path) as pdf:
-                        # 复制所有页面
-                        for page in pdf.pages:
-                            output.pages.append(page)
-                except Exception as e:
-                    return False, f"处理文件 {input_path} 时出错: {str(e)}"
-            
-            # 保存合并后的文件
-            output.save(output_path,
-                    compress_streams=True,
-                    preserve_pdfa=True,
-                    object_stream_mode=pikepdf.ObjectStreamMode.generate)
+            def deduplicate(output):
+                # 合并各文件中重复的图片和字体
+                progress.start("合并重复对象")
+                PDFOptimizer.deduplicate_objects(output)
+
+            # 输入文件较多时分组并行合并，同时打开的文件数有上限
+            MergeEngine(max_open_files, max_workers=workers).merge(
+                input_paths, output_path, progress, finish=deduplicate,
+                save_options=dict(compress_streams=True,
+                                  preserve_pdfa=True,
+                                  object_stream_mode=pikepdf.ObjectStreamMode.generate))
             
             return True, f"合并完成，共处理{len(input_paths)}个文件"
             
+        except MergeInputError as e:
+            return False, str(e)
         except Exception as e:
             return False, f"合并失败: {str(e)}" 
 
     @staticmethod
-    def reorder_pages(input_path, output_path, page_order):
+    def reorder_pages(input_path, output_path, page_order, progress=None):
         """
         重新排序PDF页面
         :param input_path: 输入PDF文件路径
         :param output_path: 输出PDF文件路径
         :param page_order: 页面顺序，格式如"3,1,2,4"或"1-2,4,3"
+        :param progress: Progress，报告逐页进度和保存进度并支持取消
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
             # 检查输入文件是否存在
             if not os.path.exists(input_path):
@@ -648,15 +776,21 @@ class PDFEditor:
                 # 创建新的PDF文件
                 output = pikepdf.Pdf.new()
                 
-                # 按指定顺序复制页面
+                # 按指定顺序复制页面，复制前裁剪页面未使用的资源
+                progress.start("复制页面", len(page_numbers))
+                prune_state = PruneState()
                 for page_num in page_numbers:
+                    prune_state.prune(pdf, page_num - 1)
                     output.pages.append(pdf.pages[page_num - 1])
+                    progress.advance()
                 
                 # 保��文件
                 output.save(output_path,
                         compress_streams=True,
                         preserve_pdfa=True,
-                        object_stream_mode=pikepdf.ObjectStreamMode.generate)
+                        object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                        progress=progress.saving())
+                progress.saved(output_path)
                 
                 return True, f"重排序完成，共处理{len(page_numbers)}页"
             
@@ -666,85 +800,150 @@ class PDFEditor:
     @staticmethod
     def load_pdf(input_path):
         """
-        加载PDF文件
+        加载PDF文件，qpdf 无法解析时改用 PyPDF2
         :param input_path: 输入PDF文件路径
-        :return: PDF对象
+        :return: pikepdf.Pdf，后备时为 PyPDF2.PdfReader
         """
         try:
-            # 先尝试使用 pikepdf 打开
-            try:
-                return pikepdf.Pdf.open(input_path, allow_overwriting_input=True)
-            except pikepdf.PasswordError:
-                # 如果文件有密码保护，尝试使用 PyPDF2
-                pdf_file = open(input_path, 'rb')
-                reader = PdfReader(pdf_file)
-                if reader.is_encrypted:
-                    # 如果是加密的PDF，尝试使用空密码
-                    try:
-                        reader.decrypt('')
-                    except:
-                        pdf_file.close()
-                        raise Exception("PDF文件受密码保护")
-                return reader
+            return backend.call('open', input_path, writable=True)
+        except pikepdf.PasswordError:
+            # 只设置了所有者密码的文件 qpdf 可以直接打开，这里一定需要用户密码
+            raise Exception("加载PDF失败: PDF文件受密码保护")
         except Exception as e:
             raise Exception(f"加载PDF失败: {str(e)}") 
 
+    # 页码位置：(水平对齐, 垂直位置)
+    PAGE_NUMBER_POSITIONS = {
+        'bottom': ('center', 'bottom'),
+        'top': ('center', 'top'),
+        'bottom-left': ('left', 'bottom'),
+        'bottom-right': ('right', 'bottom'),
+        'top-left': ('left', 'top'),
+        'top-right': ('right', 'top'),
+    }
+
     @staticmethod
-    def add_page_numbers(input_path, output_path, start_number=1, position='bottom'):
+    def _page_number_font(pdf, cjk):
         """
-        为PDF添加页码
+        创建页码使用的字体资源，所有页面共用同一个字体对象。
+        西文页码使用标准的 Helvetica 字体，中文页码使用 STSong-Light CID 字体，
+        两者都无需嵌入字形
+        :param pdf: pikepdf.Pdf对象
+        :param cjk: 页码文字是否包含中文等非西文字符
+        :return: (字体对象, reportlab字体名)
+        """
+        if not cjk:
+            font = pdf.make_indirect(pikepdf.Dictionary(
+                Type=pikepdf.Name.Font,
+                Subtype=pikepdf.Name.Type1,
+                BaseFont=pikepdf.Name.Helvetica,
+                Encoding=pikepdf.Name.WinAnsiEncoding
+            ))
+            return font, 'Helvetica'
+        
+        from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+        if 'STSong-Light' not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(UnicodeCIDFont('STSong-Light'))
+        descriptor = pdf.make_indirect(pikepdf.Dictionary(
+            Type=pikepdf.Name.FontDescriptor,
+            FontName=pikepdf.Name('/STSong-Light'),
+            Flags=6,
+            FontBBox=[-25, -254, 1000, 880],
+            ItalicAngle=0,
+            Ascent=880,
+            Descent=-120,
+            CapHeight=880,
+            StemV=93
+        ))
+        descendant = pikepdf.Dictionary(
+            Type=pikepdf.Name.Font,
+            Subtype=pikepdf.Name.CIDFontType0,
+            BaseFont=pikepdf.Name('/STSong-Light'),
+            CIDSystemInfo=pikepdf.Dictionary(
+                Registry=pikepdf.String('Adobe'),
+                Ordering=pikepdf.String('GB1'),
+                Supplement=2
+            ),
+            FontDescriptor=descriptor,
+            DW=1000
+        )
+        font = pdf.make_indirect(pikepdf.Dictionary(
+            Type=pikepdf.Name.Font,
+            Subtype=pikepdf.Name.Type0,
+            BaseFont=pikepdf.Name('/STSong-Light-UniGB-UCS2-H'),
+            Encoding=pikepdf.Name('/UniGB-UCS2-H'),
+            DescendantFonts=[descendant]
+        ))
+        return font, 'STSong-Light'
+
+    @staticmethod
+    def add_page_numbers(input_path, output_path, start_number=1, position='bottom',
+                         number_format='{page}', font_size=10, margin=20, progress=None):
+        """
+        为PDF添加页码。
+        页码直接写入每页末尾一条很短的内容流，所有页面共用一个字体资源，
+        不再为每页生成并合并单独的PDF
         :param input_path: 输入PDF文件路径
         :param output_path: 输出PDF文件路径
         :param start_number: 起始页码
-        :param position: 页码位置 ('top' 或 'bottom')
+        :param position: 页码位置 ('bottom', 'top', 'bottom-left', 'bottom-right', 'top-left', 'top-right')
+        :param number_format: 页码格式，{page} 为页码，{total} 为最后一页的页码，如 '第 {page} 页'、'{page} / {total}'
+        :param font_size: 字号
+        :param margin: 页码到页面边缘的距离（点）
+        :param progress: Progress，报告逐页进度和保存进度并支持取消
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
-            # 读取原始PDF
-            reader = PdfReader(input_path)
-            writer = PdfWriter()
-            
-            # 获取页面尺寸（使用第一页的尺寸）
-            if not reader.pages:
-                return False, "PDF文件没有页面"
-            
-            first_page = reader.pages[0]
-            mediabox = first_page.mediabox
-            page_width = float(mediabox.width)
-            page_height = float(mediabox.height)
-            
-            # 为每一页添加页码
-            for i, page in enumerate(reader.pages):
-                # 创建页码水印
-                packet = io.BytesIO()
-                c = canvas.Canvas(packet, pagesize=(page_width, page_height))
-                c.setFont(PDFEditor.DEFAULT_FONT, 10)  # 使用10号字体
+            if position not in PDFEditor.PAGE_NUMBER_POSITIONS:
+                return False, f"不支持的页码位置: {position}"
+            align, vertical = PDFEditor.PAGE_NUMBER_POSITIONS[position]
+            
+            with pikepdf.Pdf.open(input_path) as pdf:
+                if len(pdf.pages) == 0:
+                    return False, "PDF文件没有页面"
+                
+                total = start_number + len(pdf.pages) - 1
+                # 格式中的固定文字决定使用哪种字体，数字本身总能用西文字体显示
+                try:
+                    number_format.format(page=0, total=0).encode('cp1252')
+                    cjk = False
+                except UnicodeEncodeError:
+                    cjk = True
+                font, font_name = PDFEditor._page_number_font(pdf, cjk)
                 
-                # 计算页码位置
-                page_number = str(start_number + i)
-                if position == 'bottom':
-                    y = 20  # 距底部20点
-                else:
-                    y = page_height - 20  # 距顶部20点
+                prefix = pdf.make_stream(b'q\n')
                 
-                # 绘制页码
-                c.drawCentredString(page_width/2, y, page_number)
-                c.save()
+                progress.start("添加页码", len(pdf.pages))
+                for i, page in enumerate(pdf.pages):
+                    text = number_format.format(page=start_number + i, total=total)
+                    if cjk:
+                        encoded = b'<' + text.encode('utf-16-be').hex().encode() + b'>'
+                    else:
+                        encoded = b'(' + text.encode('cp1252').replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+                    
+                    # 计算页码位置
+                    x0, y0, x1, y1 = [float(v) for v in page.mediabox]
+                    width = pdfmetrics.stringWidth(text, font_name, font_size)
+                    if align == 'left':
+                        x = x0 + margin
+                    elif align == 'right':
+                        x = x1 - margin - width
+                    else:
+                        x = (x0 + x1 - width) / 2
+                    y = y0 + margin if vertical == 'bottom' else y1 - margin - font_size * 0.7
+                    
+                    name = PDFEditor._add_page_resource(page, '/Font', font, 'PgNum')
+                    page.contents_add(prefix, prepend=True)
+                    page.contents_add(pdf.make_stream(
+                        f"Q q BT {name} {font_size:g} Tf {x:.2f} {y:.2f} Td ".encode() + encoded + b" Tj ET Q\n"
+                    ))
+                    progress.advance()
                 
-                # 创建页码水印页
-                packet.seek(0)
-                number_pdf = PdfReader(packet)
-                watermark_page = number_pdf.pages[0]
+                pdf.save(output_path, progress=progress.saving())
+            progress.saved(output_path)
                 
-                # 合并页码到原页面
-                page.merge_page(watermark_page)
-                writer.add_page(page)
-            
-            # 保存结果
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
-            
-            return True, f"已成功添加页码，共处理{len(reader.pages)}页"
+            return True, f"已成功添加页码，共处理{total - start_number + 1}页"
             
         except Exception as e:
-            return False, f"添加页码失败: {str(e)}" 
\ No newline at end of file
+            return False, f"添加页码失败: {str(e)}" 
@@ -0,0 +1,368 @@
+"""图片直接写入PDF
+
+不经过reportlab、临时文件或中间PDF，把图片作为图像XObject逐页写入输出文件：
+JPEG文件原样嵌入（DCTDecode，不解码也不重新压缩），其他图片解码后
+以Flate压缩原始像素。每写完一页，该页的数据就不再保留在内存中。
+
+图片的解码、方向校正和缩小在进程池中并行完成（见 prepare_images），
+写入仍在调用方的线程中按原顺序进行。
+"""
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from PIL import Image, ImageOps
+
+# 原样嵌入时支持的JPEG颜色模式
+_JPEG_COLOR_SPACES = {
+    'L': '/DeviceGray',
+    'RGB': '/DeviceRGB',
+    'CMYK': '/DeviceCMYK',
+}
+
+
+class EncodedImage:
+    """
+    可以直接写入PDF的图像数据
+    width/height - 像素尺寸，color_space - 颜色空间名称，filter - 压缩方式，
+    data - 压缩后的数据，decode - CMYK反相等解码参数，dpi - 图片记录的分辨率，
+    orientation - EXIF方向（1-8），原样嵌入的JPEG在写入页面时通过变换矩阵校正
+    """
+
+    def __init__(self, width, height, color_space, filter, data, decode=None, dpi=None,
+                 orientation=1):
+        self.width = width
+        self.height = height
+        self.color_space = color_space
+        self.filter = filter
+        self.data = data
+        self.decode = decode
+        self.dpi = dpi
+        self.orientation = orientation
+
+    @property
+    def display_size(self):
+        """校正方向后显示的 (宽, 高)"""
+        if self.orientation in (5, 6, 7, 8):
+            return self.height, self.width
+        return self.width, self.height
+
+
+def _image_dpi(img):
+    """读取图片记录的分辨率，没有记录时返回 None"""
+    dpi = img.info.get('dpi')
+    try:
+        if dpi and dpi[0] > 0 and dpi[1] > 0:
+            return float(dpi[0]), float(dpi[1])
+    except (TypeError, IndexError):
+        pass
+    return None
+
+
+def _exif_orientation(img):
+    """读取EXIF方向，没有记录或无效时返回1"""
+    try:
+        orientation = img.getexif().get(0x0112, 1)
+    except Exception:
+        return 1
+    return orientation if orientation in range(1, 9) else 1
+
+
+def encode_jpeg(path, img=None):
+    """
+    原样嵌入JPEG文件
+    :param path: JPEG文件路径
+    :param img: 已打开的PIL图像（只读取文件头），None时自动打开
+    :return: EncodedImage|None - 颜色模式不支持原样嵌入时返回 None
+    """
+    if img is None:
+        with Image.open(path) as opened:
+            return encode_jpeg(path, opened)
+    if img.format != 'JPEG' or img.mode not in _JPEG_COLOR_SPACES:
+        return None
+    decode = None
+    # Adobe软件保存的CMYK JPEG是反相存储的
+    if img.mode == 'CMYK' and 'adobe' in img.info:
+        decode = [1, 0] * 4
+    with open(path, 'rb') as f:
+        data = f.read()
+    return EncodedImage(img.width, img.height, _JPEG_COLOR_SPACES[img.mode], '/DCTDecode',
+                        data, decode, _image_dpi(img), _exif_orientation(img))
+
+
+def encode_pixels(img, compress_level=6):
+    """
+    解码后以Flate压缩像素数据，透明部分与白色背景合成
+    :param img: PIL图像
+    :param compress_level: zlib压缩级别
+    :return: EncodedImage
+    """
+    dpi = _image_dpi(img)
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        img = background
+    elif img.mode in ('1', 'I;16', 'I', 'F'):
+        img = img.convert('L')
+    elif img.mode not in ('L', 'RGB', 'CMYK'):
+        img = img.convert('RGB')
+    data = zlib.compress(img.tobytes(), compress_level)
+    return EncodedImage(img.width, img.height, _JPEG_COLOR_SPACES[img.mode], '/FlateDecode',
+                        data, None, dpi)
+
+
+def encode_image(source, max_size=None):
+    """
+    将图片编码为可以写入PDF的数据，JPEG文件原样嵌入。
+    解码的图片按EXIF方向旋转像素，原样嵌入的JPEG只记录方向
+    :param source: 图片文件路径或PIL图像
+    :param max_size: 图片最长边的像素上限，超过时缩小（JPEG也会因此重新压缩），None表示不缩小
+    :return: EncodedImage
+    """
+    if isinstance(source, Image.Image):
+        return encode_pixels(_downsample(ImageOps.exif_transpose(source), max_size))
+    with Image.open(source) as img:
+        if not max_size or max(img.size) <= max_size:
+            encoded = encode_jpeg(source, img)
+            if encoded is not None:
+                return encoded
+        return encode_pixels(_downsample(ImageOps.exif_transpose(img), max_size))
+
+
+def _downsample(img, max_size):
+    """按最长边缩小图片，保留分辨率信息"""
+    if not max_size or max(img.size) <= max_size:
+        return img
+    scale = max_size / max(img.size)
+    resized = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                         Image.Resampling.LANCZOS)
+    dpi = _image_dpi(img)
+    if dpi:
+        resized.info['dpi'] = (dpi[0] * scale, dpi[1] * scale)
+    return resized
+
+
+# 图片数量少于该值时直接在当前进程中处理，不启动进程池
+PARALLEL_MIN_IMAGES = 4
+
+
+def prepare_images(sources, workers=None, max_size=None, window=None):
+    """
+    在进程池中并行解码、校正方向、转换颜色和缩小图片，按输入顺序逐个返回。
+    同时处理中的图片数量不超过 window，已编码但尚未写入的数据因此有上限
+    :param sources: 图片文件路径或PIL图像列表
+    :param workers: 工作进程数，None表示使用CPU核心数，1表示在当前进程中处理
+    :param max_size: 图片最长边的像素上限，None表示不缩小
+    :param window: 同时处理的最大图片数，默认为工作进程数的2倍
+    :return: 生成器，按输入顺序产生 (EncodedImage, None) 或 (None, 异常)
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    if workers == 1 or len(sources) < PARALLEL_MIN_IMAGES:
+        for source in sources:
+            try:
+                yield encode_image(source, max_size), None
+            except Exception as e:
+                yield None, e
+        return
+
+    window = max(1, window or workers * 2)
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(sources)),
+                                   mp_context=multiprocessing.get_context('spawn'))
+    pending = deque()
+    remaining = iter(sources)
+    try:
+        for source in remaining:
+            pending.append(executor.submit(encode_image, source, max_size))
+            if len(pending) >= window:
+                break
+        while pending:
+            future = pending.popleft()
+            # 取出一个结果后再提交一个，保持窗口大小
+            for source in remaining:
+                pending.append(executor.submit(encode_image, source, max_size))
+                break
+            try:
+                yield future.result(), None
+            except Exception as e:
+                yield None, e
+    finally:
+        # 调用方提前结束（出错或取消）时不再等待剩余的图片
+        # （shutdown 的 cancel_futures 参数需要 Python 3.9）
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=not pending)
+
+
+def fit_image(image_width, image_height, page_width, page_height, margin=0):
+    """
+    计算图片在页面可用区域内等比缩放并居中后的位置
+    :param image_width: 图片宽度
+    :param image_height: 图片高度
+    :param page_width: 页面宽度（点）
+    :param page_height: 页面高度（点）
+    :param margin: 页边距（点）
+    :return: (x, y, 宽, 高) - 单位为点
+    """
+    available_width = max(1.0, page_width - 2 * margin)
+    available_height = max(1.0, page_height - 2 * margin)
+    scale = min(available_width / image_width, available_height / image_height)
+    width = image_width * scale
+    height = image_height * scale
+    x = margin + (available_width - width) / 2
+    y = margin + (available_height - height) / 2
+    return x, y, width, height
+
+
+def orientation_matrix(orientation, box):
+    """
+    计算把图像单位正方形放到页面 box 中并按EXIF方向校正的变换矩阵
+    :param orientation: EXIF方向（1-8）
+    :param box: 校正方向后图片在页面上的 (x, y, 宽, 高)
+    :return: (a, b, c, d, e, f) - cm 操作符的参数
+    """
+    x, y, w, h = box
+    return {
+        1: (w, 0, 0, h, x, y),
+        2: (-w, 0, 0, h, x + w, y),
+        3: (-w, 0, 0, -h, x + w, y + h),
+        4: (w, 0, 0, -h, x, y + h),
+        5: (0, -h, -w, 0, x + w, y + h),
+        6: (0, -h, w, 0, x, y + h),
+        7: (0, h, w, 0, x, y),
+        8: (0, h, -w, 0, x + w, y),
+    }.get(orientation, (w, 0, 0, h, x, y))
+
+
+def _number(value):
+    """格式化PDF中的数字"""
+    text = f"{value:.4f}".rstrip('0').rstrip('.')
+    return text if text not in ('', '-0') else '0'
+
+
+class ImagePDFWriter:
+    """
+    逐页写入由图片组成的PDF文件
+
+    对象按顺序直接写入文件，只在内存中保留每个对象的偏移量和页面对象编号，
+    页面树和交叉引用表在 close 时写入。用法：
+
+        with ImagePDFWriter(output_path) as writer:
+            writer.add_page(encode_image(path), 595, 842, (x, y, w, h))
+    """
+
+    # 对象1为目录，对象2为页面树根节点，在 close 时写入
+    _CATALOG = 1
+    _PAGES = 2
+
+    def __init__(self, output_path):
+        """
+        :param output_path: 输出PDF文件路径
+        """
+        self.output_path = output_path
+        self._file = open(output_path, 'wb')
+        self._offsets = {}
+        self._next_id = 3
+        self._kids = []
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def page_count(self):
+        """已写入的页数"""
+        return len(self._kids)
+
+    @property
+    def bytes_written(self):
+        """已写入的字节数"""
+        return self._file.tell()
+
+    def _write(self, data):
+        self._file.write(data)
+
+    def _allocate(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id, body, stream=None):
+        self._offsets[obj_id] = self._file.tell()
+        self._write(f"{obj_id} 0 obj\n".encode('ascii'))
+        self._write(body.encode('ascii'))
+        if stream is not None:
+            self._write(b"\nstream\n")
+            self._write(stream)
+            self._write(b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def add_page(self, image, page_width, page_height, box=None):
+        """
+        写入一页，页面上只有一张图片
+        :param image: EncodedImage
+        :param page_width: 页面宽度（点）
+        :param page_height: 页面高度（点）
+        :param box: 图片（校正方向后）在页面上的 (x, y, 宽, 高)，None表示铺满整页
+        """
+        matrix = orientation_matrix(image.orientation, box or (0, 0, page_width, page_height))
+        image_id = self._allocate()
+        content_id = self._allocate()
+        page_id = self._allocate()
+
+        entries = [
+            "/Type /XObject", "/Subtype /Image",
+            f"/Width {image.width}", f"/Height {image.height}",
+            f"/ColorSpace {image.color_space}", "/BitsPerComponent 8",
+            f"/Filter {image.filter}", f"/Length {len(image.data)}",
+        ]
+        if image.decode:
+            entries.append("/Decode [" + " ".join(str(v) for v in image.decode) + "]")
+        self._write_object(image_id, "<< " + " ".join(entries) + " >>", image.data)
+
+        content = ("q " + " ".join(_number(v) for v in matrix) + " cm /Im0 Do Q").encode('ascii')
+        self._write_object(content_id, f"<< /Length {len(content)} >>", content)
+
+        self._write_object(
+            page_id,
+            f"<< /Type /Page /Parent {self._PAGES} 0 R"
+            f" /MediaBox [0 0 {_number(page_width)} {_number(page_height)}]"
+            f" /Resources << /XObject << /Im0 {image_id} 0 R >> >>"
+            f" /Contents {content_id} 0 R >>"
+        )
+        self._kids.append(page_id)
+
+    def close(self):
+        """写入页面树、目录和交叉引用表，关闭文件"""
+        if self._file.closed:
+            return
+        kids = " ".join(f"{kid} 0 R" for kid in self._kids)
+        self._write_object(self._PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._kids)} >>")
+        self._write_object(self._CATALOG, f"<< /Type /Catalog /Pages {self._PAGES} 0 R >>")
+
+        xref_offset = self._file.tell()
+        size = self._next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            lines.append(f"{self._offsets[obj_id]:010d} 00000 n \n")
+        self._write("".join(lines).encode('ascii'))
+        self._write(f"trailer\n<< /Size {size} /Root {self._CATALOG} 0 R >>\n"
+                    f"startxref\n{xref_offset}\n%%EOF\n".encode('ascii'))
+        self._file.close()
+
+    def abort(self):
+        """放弃写入，删除不完整的输出文件"""
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,255 @@
+"""PDF合并引擎
+
+同时打开的输入文件数有上限：输入文件较多时先把每组输入合并成一个临时文件，
+再合并这些临时文件，必要时逐层重复（合并树），最后一层写出目标文件。
+每组合并完成后立即保存并关闭其中的输入文件，复制的对象随之写入磁盘，
+内存和文件句柄的占用只取决于每组的大小，不随输入文件总数增长。
+
+除最后一层外，同一层的各组互不依赖，交给进程池并行合并（每个工作进程同样
+遵守打开文件数的上限）。输入文件足够多时，第一层按工作进程数切分，保证每个进程都有任务。
+临时文件按组的顺序合并，页面和书签的顺序与输入顺序一致。
+
+各输入文件的书签会被复制到合并结果中，指向合并后对应的页面。
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pikepdf
+
+from src.core.progress import ensure_progress
+
+
+class MergeInputError(Exception):
+    """某个输入文件无法打开或复制"""
+
+    def __init__(self, path, error):
+        super().__init__(f"处理文件 {path} 时出错: {error}")
+        self.path = path
+        self.error = error
+
+    def __reduce__(self):
+        # 在工作进程中抛出时需要传回主进程，原始异常不一定能序列化
+        return MergeInputError, (self.path, str(self.error))
+
+
+def _resolve_destination(pdf, dest):
+    """
+    把书签的目标解析为显式的目标数组 [页面, /XYZ, ...]
+    :param dest: 目标数组、命名目标（Name 或 String）或 GoTo 动作中的 /D
+    :return: pikepdf.Array|None - 无法解析时返回 None
+    """
+    if isinstance(dest, (pikepdf.Name, pikepdf.String)):
+        target = None
+        if isinstance(dest, pikepdf.Name):
+            dests = pdf.Root.get('/Dests')
+            if isinstance(dests, pikepdf.Dictionary):
+                target = dests.get(dest)
+        else:
+            names = pdf.Root.get('/Names')
+            if isinstance(names, pikepdf.Dictionary) and '/Dests' in names:
+                target = pikepdf.NameTree(names.Dests).get(str(dest))
+        dest = target
+    if isinstance(dest, pikepdf.Dictionary):
+        dest = dest.get('/D')
+    if isinstance(dest, pikepdf.Array) and len(dest) > 0:
+        return dest
+    return None
+
+
+def read_outline(pdf):
+    """
+    读取文档的书签树，目标页面转换为页码
+    :param pdf: pikepdf.Pdf
+    :return: [(标题, 页面下标|None, 目标位置参数列表, 子书签列表), ...]
+    """
+    if '/Outlines' not in pdf.Root:
+        return []
+    index = {page.obj.objgen: i for i, page in enumerate(pdf.pages)}
+
+    def convert(item):
+        dest = item.destination
+        if dest is None and item.action is not None and item.action.get('/S') == pikepdf.Name.GoTo:
+            dest = item.action.get('/D')
+        page, view = None, []
+        dest = _resolve_destination(pdf, dest) if dest is not None else None
+        if dest is not None and isinstance(dest[0], pikepdf.Dictionary):
+            page = index.get(dest[0].objgen)
+            if page is not None:
+                view = list(dest[1:])
+        return str(item.title), page, view, [convert(child) for child in item.children]
+
+    with pdf.open_outline() as outline:
+        return [convert(item) for item in outline.root]
+
+
+def _build_outline(output, entries, offset):
+    """按 read_outline 的结果生成书签，页码加上该文件在合并结果中的起始页"""
+    items = []
+    for title, page, view, children in entries:
+        destination = None
+        if page is not None:
+            destination = pikepdf.Array([output.pages[offset + page].obj] + view)
+        item = pikepdf.OutlineItem(title, destination)
+        item.children.extend(_build_outline(output, children, offset))
+        items.append(item)
+    return items
+
+
+def _merge_chunk(input_paths, output_path, keep_outlines):
+    """工作进程：合并一组文件到临时文件"""
+    engine = MergeEngine(len(input_paths), keep_outlines, max_workers=1)
+    return engine._merge_group(input_paths, output_path, ensure_progress(None))
+
+
+class MergeEngine:
+    """合并引擎，限制同时打开的输入文件数"""
+
+    # 同时打开的输入文件数上限（每组合并的文件数）
+    MAX_OPEN_FILES = 64
+    # 一层的文件数少于该值时不启动进程池（启动进程的开销超过合并小文件的时间）
+    PARALLEL_MIN_INPUTS = 256
+    # 等待结果时检查取消标记的间隔（秒）
+    POLL_INTERVAL = 0.2
+
+    def __init__(self, max_open_files=None, keep_outlines=True, max_workers=None):
+        """
+        :param max_open_files: 每个进程同时打开的输入文件数上限，None表示使用 MAX_OPEN_FILES
+        :param keep_outlines: 是否复制各输入文件的书签
+        :param max_workers: 工作进程数，None表示使用CPU核心数，1表示在当前进程中合并
+        """
+        self.max_open_files = max(2, max_open_files or self.MAX_OPEN_FILES)
+        self.keep_outlines = keep_outlines
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+
+    def group_size(self, count):
+        """
+        一层中每组的文件数
+        :param count: 该层的文件数
+        :return: int - 不小于 count 时表示这一层就是最后一层
+        """
+        if self.max_workers > 1 and count >= self.PARALLEL_MIN_INPUTS:
+            # 按进程数切分，每个进程至少分到一组
+            return max(2, min(self.max_open_files, -(-count // self.max_workers)))
+        return self.max_open_files
+
+    def plan(self, count):
+        """
+        计算合并树每一层的文件组数
+        :param count: 输入文件数
+        :return: list - 每层合并的组数，最后一层为1
+        """
+        levels = []
+        while True:
+            size = self.group_size(count)
+            if size >= count:
+                levels.append(1)
+                return levels
+            count = -(-count // size)
+            levels.append(count)
+
+    def merge(self, input_paths, output_path, progress=None, finish=None, save_options=None):
+        """
+        合并多个PDF文件
+        :param input_paths: 输入PDF文件路径列表
+        :param output_path: 输出PDF文件路径
+        :param progress: Progress，每合并一个文件（包括中间文件）报告一次，保存时报告写出进度
+        :param finish: 保存最终结果前调用 finish(pdf)，如合并重复对象
+        :param save_options: 保存最终结果时传给 pikepdf.Pdf.save 的参数
+        :return: int - 合并结果的页数
+        :raises MergeInputError: 输入文件无法打开或复制
+        """
+        progress = ensure_progress(progress)
+        levels = self.plan(len(input_paths))
+        # 每层打开的文件数：第一层为所有输入，之后为上一层的临时文件
+        progress.start("合并文件", len(input_paths) + sum(levels[:-1]))
+        if len(levels) == 1:
+            return self._merge_group(input_paths, output_path, progress, True, finish, save_options)
+
+        workdir = tempfile.mkdtemp(prefix='pdf-merge-',
+                                   dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            paths = input_paths
+            for level in range(len(levels) - 1):
+                size = self.group_size(len(paths))
+                groups = [paths[i:i + size] for i in range(0, len(paths), size)]
+                merged = [os.path.join(workdir, f"{level}_{i}.pdf") for i in range(len(groups))]
+                self._merge_level(groups, merged, progress)
+                # 上一层的临时文件已合并，及时删除以减少磁盘占用
+                if level > 0:
+                    for path in paths:
+                        os.remove(path)
+                paths = merged
+            return self._merge_group(paths, output_path, progress, True, finish, save_options)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _merge_level(self, groups, output_paths, progress):
+        """合并同一层的各组文件，文件数达到 PARALLEL_MIN_INPUTS 时交给进程池并行处理"""
+        workers = min(self.max_workers, len(groups))
+        if workers == 1 or sum(len(group) for group in groups) < self.PARALLEL_MIN_INPUTS:
+            for group, output_path in zip(groups, output_paths):
+                self._merge_group(group, output_path, progress)
+            return
+
+        executor = ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=multiprocessing.get_context('spawn'))
+        pending = {}
+        try:
+            pending = {executor.submit(_merge_chunk, group, output_path, self.keep_outlines): len(group)
+                       for group, output_path in zip(groups, output_paths)}
+            while pending:
+                done, _ = wait(pending, self.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                progress.check()
+                for future in done:
+                    future.result()
+                    progress.advance(pending.pop(future))
+        finally:
+            # 出错或取消时不再开始剩余的组；正在合并的组很快结束，等待它们是为了能删除临时目录
+            # （shutdown 的 cancel_futures 参数需要 Python 3.9）
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _merge_group(self, input_paths, output_path, progress, final=False, finish=None, save_options=None):
+        """
+        合并一组文件并保存。复制的页面在保存时才从输入文件中读取数据，
+        因此输入文件在保存完成后才关闭
+        :param final: 是否为最后一层；中间文件只做最快的保存，不报告保存进度
+        """
+        sources = []
+        try:
+            with pikepdf.Pdf.new() as output:
+                outline = []
+                for input_path in input_paths:
+                    progress.check()
+                    try:
+                        source = pikepdf.Pdf.open(input_path)
+                    except Exception as e:
+                        raise MergeInputError(input_path, e)
+                    sources.append(source)
+                    try:
+                        offset = len(output.pages)
+                        output.pages.extend(source.pages)
+                        if self.keep_outlines:
+                            outline.extend(_build_outline(output, read_outline(source), offset))
+                    except Exception as e:
+                        raise MergeInputError(input_path, e)
+                    progress.advance()
+
+                if outline:
+                    with output.open_outline() as output_outline:
+                        output_outline.root.extend(outline)
+                if not final:
+                    output.save(output_path)
+                    return len(output.pages)
+                if finish is not None:
+                    finish(output)
+                output.save(output_path, progress=progress.saving(), **(save_options or {}))
+                progress.saved(output_path)
+                return len(output.pages)
+        finally:
+            for source in sources:
+                source.close()
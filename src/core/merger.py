@@ -1,32 +1,32 @@
-from PyPDF2 import PdfMerger
 import os
+from src.core.merge_engine import MergeEngine, MergeInputError
+from src.core.progress import ensure_progress
 
 class PDFMerger:
     @staticmethod
-    def merge_pdfs(pdf_files, output_path):
+    def merge_pdfs(pdf_files, output_path, progress=None, max_open_files=None, workers=None):
         """
-        合并多个PDF文件
+        合并多个PDF文件，各文件的书签一并保留
         :param pdf_files: PDF文件路径列表
         :param output_path: 输出文件路径
+        :param progress: Progress，报告逐个文件的进度并支持取消
+        :param max_open_files: 每个进程同时打开的输入文件数上限，None表示使用 MergeEngine.MAX_OPEN_FILES
+        :param workers: 并行合并的进程数，None表示使用CPU核心数
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
-            merger = PdfMerger()
-            
             # 检查所有文件是否存在
             for pdf_file in pdf_files:
                 if not os.path.exists(pdf_file):
                     return False, f"文件不存在: {pdf_file}"
             
-            # 添加所有PDF文件
-            for pdf_file in pdf_files:
-                merger.append(pdf_file)
-            
-            # 保存合并后的文件
-            merger.write(output_path)
-            merger.close()
+            # 输入文件较多时分组并行合并，同时打开的文件数有上限
+            MergeEngine(max_open_files, max_workers=workers).merge(pdf_files, output_path, progress)
             
             return True, "合并成功"
             
+        except MergeInputError as e:
+            return False, f"合并失败: {e}"
         except Exception as e:
             return False, f"合并失败: {str(e)}" 
\ No newline at end of file
@@ -1,7 +1,9 @@
-from PyPDF2 import PdfReader, PdfWriter
 import datetime
 import os
 import subprocess
+from src.core import backend
+from src.core.probe import PDFProbe
+from src.core.progress import ensure_progress
 
 class PDFMetadata:
     @staticmethod
@@ -12,13 +14,16 @@ class PDFMetadata:
         :return: (bool, dict|str) - (是否成功, 元数据字典|错误信息)
         """
         try:
-            reader = PdfReader(input_path)
+            # 只读取 trailer 和文档信息字典，不解析整个文件
+            success, info = PDFProbe.probe(input_path)
+            if not success:
+                return False, f"获取元数据失败: {info}"
             metadata = {}
             
             # 检查是否加密
-            if reader.is_encrypted:
+            if info['Encrypted']:
                 metadata['Encrypted'] = True
-                metadata['FileSize'] = os.path.getsize(input_path)
+                metadata['FileSize'] = info['FileSize']
                 # 转换为合适的单位
                 size_bytes = metadata['FileSize']
                 for unit in ['B', 'KB', 'MB', 'GB']:
@@ -29,17 +34,16 @@ class PDFMetadata:
                 return True, metadata
             
             # 获取基本元数据
-            if reader.metadata:
-                for key, value in reader.metadata.items():
-                    # 移除/前缀
-                    clean_key = key[1:] if key.startswith('/') else key
-                    metadata[clean_key] = value
+            for key, value in info['Info'].items():
+                # 移除/前缀
+                clean_key = key[1:] if key.startswith('/') else key
+                metadata[clean_key] = value
             
             # 获取页数
-            metadata['Pages'] = len(reader.pages)
+            metadata['Pages'] = info['Pages']
             
             # 获取文件大小
-            size_bytes = os.path.getsize(input_path)
+            size_bytes = info['FileSize']
             # 转换为合适的单位
             for unit in ['B', 'KB', 'MB', 'GB']:
                 if size_bytes < 1024:
@@ -53,28 +57,20 @@ class PDFMetadata:
             return False, f"获取元数据失败: {str(e)}"
     
     @staticmethod
-    def set_metadata(input_path, output_path, metadata):
+    def set_metadata(input_path, output_path, metadata, progress=None):
         """
         设置PDF文件的元数据
         :param input_path: 输入PDF文件路径
         :param output_path: 输出PDF文件路径
         :param metadata: 元数据字典
+        :param progress: Progress，报告逐页进度并支持取消
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
-            reader = PdfReader(input_path)
-            writer = PdfWriter()
-            
-            # 复制所有页面
-            for page in reader.pages:
-                writer.add_page(page)
-            
-            # 添加元数据
-            writer.add_metadata(metadata)
-            
-            # 保存文件
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
+            # 只修改文档信息字典，页面不需要逐个复制
+            backend.call('rewrite', input_path, output_path, metadata=metadata, progress=progress)
+            progress.saved(output_path)
             
             return True, "元数据修改成功"
             
@@ -83,7 +79,7 @@ class PDFMetadata:
     
     @staticmethod
     def add_encryption(input_path, output_path, user_password=None, owner_password=None, 
-                      permissions=None):
+                      permissions=None, progress=None):
         """
         为PDF添加密码保护
         :param input_path: 输入PDF文件路径
@@ -91,48 +87,15 @@ class PDFMetadata:
         :param user_password: 用户密码（打开文档密码）
         :param owner_password: 所有者密码（编辑文档密码）
         :param permissions: 权限设置字典
+        :param progress: Progress，报告逐页进度并支持取消
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
-            reader = PdfReader(input_path)
-            writer = PdfWriter()
-            
-            # 复制所有页面
-            for page in reader.pages:
-                writer.add_page(page)
-            
-            # 设置默认权限
-            if permissions is None:
-                permissions = {
-                    "print": True,           # 允许打印
-                    "modify": False,         # 禁止修改
-                    "copy": True,            # 允许复制内容
-                    "annotate": False,       # 禁止添加注释
-                }
-            
-            # 计算权限掩码
-            # 使用标准PDF权限掩码值
-            permission_mask = 0
-            if permissions.get("print", True):
-                permission_mask |= 4  # 打印文档
-            if permissions.get("modify", False):
-                permission_mask |= 8  # 修改内容
-            if permissions.get("copy", True):
-                permission_mask |= 16  # 复制内容
-            if permissions.get("annotate", False):
-                permission_mask |= 32  # 添加注释
-            
-            # 加密PDF
-            writer.encrypt(
-                user_password=user_password if user_password else "",
-                owner_password=owner_password if owner_password else (user_password if user_password else ""),
-                use_128bit=True,
-                permissions_flag=permission_mask
-            )
-            
-            # 保存文件
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
+            # 未设置的权限使用默认值：允许打印和复制，禁止修改和添加注释
+            encryption = backend.encryption_options(user_password, owner_password, permissions)
+            backend.call('rewrite', input_path, output_path, encryption=encryption, progress=progress)
+            progress.saved(output_path)
             
             return True, "加密设置成功"
             
@@ -140,14 +103,16 @@ class PDFMetadata:
             return False, f"加密设置失败: {str(e)}"
     
     @staticmethod
-    def crack_password(input_path, password_file=None, common_passwords=None):
+    def crack_password(input_path, password_file=None, common_passwords=None, progress=None):
         """
         尝试破解PDF密码
         :param input_path: 输入PDF文件路径
         :param password_file: 密码字典文件路径
         :param common_passwords: 常用密码列表
+        :param progress: Progress，报告已尝试的密码数量并支持取消
         :return: (bool, str) - (是否成功, 成功则返回密码，失败则返回错误信息)
         """
+        progress = ensure_progress(progress)
         try:
             # 创建一个密码列表
             passwords = []
@@ -169,21 +134,16 @@ class PDFMetadata:
                     "888888", "password123", "1234", "12345", "000000", "abc123456"
                 ]
             
-            # 尝试打开PDF文件
-            reader = PdfReader(input_path)
-            
             # 如果PDF没有加密，返回提示
-            if not reader.is_encrypted:
+            if not backend.call('is_encrypted', input_path):
                 return False, "此PDF文件没有加密"
             
             # 尝试每个密码
+            progress.start("尝试密码", len(passwords))
             for password in passwords:
-                try:
-                    # 尝试解密
-                    if reader.decrypt(password) > 0:
-                        return True, password
-                except:
-                    continue
+                progress.advance()
+                if backend.call('check_password', input_path, password):
+                    return True, password
             
             return False, "未能找到正确的密码"
             
@@ -191,23 +151,19 @@ class PDFMetadata:
             return False, f"破解过程出错: {str(e)}"
     
     @staticmethod
-    def extract_content(input_path, output_path):
+    def extract_content(input_path, output_path, progress=None):
         """
         提取加密PDF的内容并创建新的PDF
         :param input_path: 输入PDF文件路径
         :param output_path: 输出PDF文件路径
+        :param progress: Progress，报告当前尝试的密码组合并支持取消
         :return: (bool, str) - (是否成功, 成功/错误信息)
         """
+        progress = ensure_progress(progress)
         try:
-            reader = PdfReader(input_path)
-            writer = PdfWriter()
-            
             # 如果文件没有加密，直接复制
-            if not reader.is_encrypted:
-                for page in reader.pages:
-                    writer.add_page(page)
-                with open(output_path, 'wb') as output_file:
-                    writer.write(output_file)
+            if not backend.call('is_encrypted', input_path):
+                backend.call('rewrite', input_path, output_path)
                 return True, "内容提取成功"
             
             # 常用密码组合方式
@@ -225,26 +181,25 @@ class PDFMetadata:
             }
             
             def try_password(pwd):
+                # 在 try 之外检查，避免取消被下面的 except 吞掉
+                progress.check()
                 try:
-                    reader = PdfReader(input_path)
-                    if reader.decrypt(pwd) > 0:
-                        # 密码正确，复制所有页面
-                        writer = PdfWriter()
-                        for page in reader.pages:
-                            writer.add_page(page)
-                        with open(output_path, 'wb') as output_file:
-                            writer.write(output_file)
+                    if backend.call('check_password', input_path, pwd):
+                        # 密码正确，另存为不加密的文件
+                        backend.call('rewrite', input_path, output_path, password=pwd)
                         return True
                 except:
                     return False
                 return False
             
             # 1. 首先尝试常用密码
+            progress.start("尝试常用密码")
             for pwd in common_elements['common_passwords']:
                 if try_password(pwd):
                     return True, f"破解成功，密码为: {pwd if pwd else '空密码'}"
             
             # 2. 尝试年份组合
+            progress.start("尝试年份组合")
             for year in common_elements['years']:
                 # 单独年份
                 if try_password(year):
@@ -255,6 +210,7 @@ class PDFMetadata:
                         return True, f"破解成功，密码为: {year + special}"
             
             # 3. 尝试常用词+数字组合
+            progress.start("尝试常用词组合")
             for word in common_elements['common_words']:
                 if try_password(word):
                     return True, f"破解成功，密码为: {word}"
@@ -266,6 +222,7 @@ class PDFMetadata:
                         return True, f"破解成功，密码为: {pwd}"
             
             # 4. 尝试4-8位纯数字组合
+            progress.start("尝试数字组合")
             for length in range(4, 9):
                 for num in range(10 ** (length - 1), min(10 ** length, 100000)):  # 限制尝试次数
                     pwd = str(num)
@@ -0,0 +1,340 @@
+import hashlib
+import io
+import math
+import zlib
+import pikepdf
+from pikepdf import Name
+from PIL import Image
+from src.core.progress import ensure_progress
+
+
+def _multiply(m1, m2):
+    """矩阵乘法 m1 × m2，矩阵以PDF的六元组 (a, b, c, d, e, f) 表示"""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (
+        a1 * a2 + b1 * c2,
+        a1 * b2 + b1 * d2,
+        c1 * a2 + d1 * c2,
+        c1 * b2 + d1 * d2,
+        e1 * a2 + f1 * c2 + e2,
+        e1 * b2 + f1 * d2 + f2,
+    )
+
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+class PDFOptimizer:
+    # 各压缩质量对应的JPEG质量
+    JPEG_QUALITY = {'low': 50, 'medium': 75, 'high': 90}
+    # 缩放比例高于此值时不重新采样，避免为很小的收益损失画质
+    MIN_DOWNSAMPLE_SCALE = 0.9
+    # 去重的最大轮数，每轮合并后引用它们的表单和字体字典可能在下一轮变得相同
+    MAX_DEDUP_PASSES = 3
+
+    @staticmethod
+    def collect_image_placements(pdf):
+        """
+        扫描所有页面（包括嵌套的Form XObject）的内容流，计算每个图片XObject的最大显示尺寸
+        :param pdf: pikepdf.Pdf对象
+        :return: {objgen: (最大显示宽度, 最大显示高度)}，单位为点
+        """
+        placements = {}
+        for page in pdf.pages:
+            try:
+                PDFOptimizer._scan_placements(page, page.obj.get('/Resources'), IDENTITY, placements, set())
+            except Exception:
+                continue
+        return placements
+
+    @staticmethod
+    def _scan_placements(content_owner, resources, ctm, placements, active_forms):
+        """跟踪内容流中的变换矩阵，记录每次 Do 绘制图片时的显示尺寸"""
+        xobjects = resources.get('/XObject') if resources is not None else None
+        stack = []
+        for operands, operator in pikepdf.parse_content_stream(content_owner, 'q Q cm Do'):
+            op = str(operator)
+            if op == 'q':
+                stack.append(ctm)
+            elif op == 'Q':
+                if stack:
+                    ctm = stack.pop()
+            elif op == 'cm':
+                ctm = _multiply(tuple(float(v) for v in operands), ctm)
+            elif op == 'Do' and xobjects is not None:
+                xobject = xobjects.get(operands[0])
+                if not isinstance(xobject, pikepdf.Stream) or not xobject.is_indirect:
+                    continue
+                subtype = xobject.get('/Subtype')
+                if subtype == Name.Image:
+                    # 图片在用户空间中是单位正方形，变换后的两个边长即显示尺寸
+                    width = math.hypot(ctm[0], ctm[1])
+                    height = math.hypot(ctm[2], ctm[3])
+                    old_width, old_height = placements.get(xobject.objgen, (0.0, 0.0))
+                    placements[xobject.objgen] = (max(old_width, width), max(old_height, height))
+                elif subtype == Name.Form and xobject.objgen not in active_forms:
+                    matrix = tuple(float(v) for v in xobject.get('/Matrix', [1, 0, 0, 1, 0, 0]))
+                    active_forms.add(xobject.objgen)
+                    try:
+                        PDFOptimizer._scan_placements(
+                            xobject,
+                            xobject.get('/Resources', resources),
+                            _multiply(matrix, ctm),
+                            placements,
+                            active_forms
+                        )
+                    finally:
+                        active_forms.discard(xobject.objgen)
+
+    @staticmethod
+    def downsample_images(pdf, target_dpi, quality='medium', progress=None):
+        """
+        按实际显示尺寸对超过目标DPI的图片重新采样并重新编码
+        :param pdf: pikepdf.Pdf对象
+        :param target_dpi: 目标DPI
+        :param quality: 压缩质量 ('low', 'medium', 'high')
+        :param progress: Progress，报告逐张图片的进度并支持取消
+        :return: (处理的图片数量, 节省的字节数, 因出错跳过的图片数量)
+        """
+        progress = ensure_progress(progress)
+        jpeg_quality = PDFOptimizer.JPEG_QUALITY.get(quality, PDFOptimizer.JPEG_QUALITY['medium'])
+        count = 0
+        saved = 0
+        skipped = 0
+        placements = PDFOptimizer.collect_image_placements(pdf)
+        progress.start("处理图片", len(placements))
+        for objgen, (display_width, display_height) in placements.items():
+            progress.advance()
+            try:
+                image = pdf.get_object(objgen)
+                result = PDFOptimizer._downsample_image(
+                    image, display_width, display_height, target_dpi, quality, jpeg_quality
+                )
+            except Exception:
+                # 无法解码或编码的图片保持原样
+                skipped += 1
+                continue
+            if result:
+                count += 1
+                saved += result
+        return count, saved, skipped
+
+    @staticmethod
+    def _target_size(width, height, display_width, display_height, target_dpi):
+        """计算目标像素尺寸，不需要缩小时返回None"""
+        if display_width <= 0 or display_height <= 0:
+            return None
+        # 两个方向都不低于目标DPI
+        scale = max(
+            target_dpi * display_width / 72.0 / width,
+            target_dpi * display_height / 72.0 / height
+        )
+        if scale >= PDFOptimizer.MIN_DOWNSAMPLE_SCALE:
+            return None
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    @staticmethod
+    def _downsample_image(image, display_width, display_height, target_dpi, quality, jpeg_quality):
+        """
+        重新采样单个图片XObject
+        :return: 节省的字节数，未处理时返回0
+        """
+        width = int(image.get('/Width', 0))
+        height = int(image.get('/Height', 0))
+        if width <= 0 or height <= 0:
+            return 0
+        size = PDFOptimizer._target_size(width, height, display_width, display_height, target_dpi)
+        if size is None:
+            return 0
+
+        # 颜色键遮罩和非默认解码数组按像素语义保存，重新采样会破坏它们
+        if '/Mask' in image or ('/Decode' in image and not image.get('/ImageMask', False)):
+            return 0
+
+        old_size = len(image.read_raw_bytes())
+        smask = image.get('/SMask')
+        if isinstance(smask, pikepdf.Stream):
+            old_size += len(smask.read_raw_bytes())
+
+        bits = int(image.get('/BitsPerComponent', 1 if image.get('/ImageMask', False) else 8))
+        if bits == 1:
+            encoded = PDFOptimizer._encode_bilevel(image, width, height, size)
+            if encoded is None or len(encoded) >= old_size:
+                return 0
+            image.write(encoded, filter=Name.FlateDecode)
+            image.Width, image.Height = size
+            return old_size - len(encoded)
+
+        if bits != 8 or not PDFOptimizer._is_supported_colorspace(image.get('/ColorSpace')):
+            return 0
+
+        pil_image = pikepdf.PdfImage(image).as_pil_image()
+        if pil_image.mode not in ('RGB', 'L'):
+            return 0
+        pil_image = pil_image.resize(size, Image.Resampling.LANCZOS)
+
+        # 原图为JPEG或选择了最大压缩时使用JPEG，否则保持无损编码
+        use_jpeg = PDFOptimizer._last_filter(image) == Name.DCTDecode or quality == 'low'
+        if use_jpeg:
+            buffer = io.BytesIO()
+            pil_image.save(buffer, format='JPEG', quality=jpeg_quality, optimize=True)
+            data, image_filter = buffer.getvalue(), Name.DCTDecode
+        else:
+            data, image_filter = zlib.compress(pil_image.tobytes()), Name.FlateDecode
+
+        smask_data = None
+        if isinstance(smask, pikepdf.Stream):
+            mask_image = pikepdf.PdfImage(smask).as_pil_image().convert('L')
+            smask_data = zlib.compress(mask_image.resize(size, Image.Resampling.LANCZOS).tobytes())
+
+        new_size = len(data) + (len(smask_data) if smask_data is not None else 0)
+        if new_size >= old_size:
+            return 0
+
+        image.write(data, filter=image_filter)
+        image.Width, image.Height = size
+        image.BitsPerComponent = 8
+        if smask_data is not None:
+            smask.write(smask_data, filter=Name.FlateDecode)
+            smask.Width, smask.Height = size
+            smask.BitsPerComponent = 8
+            if '/Matte' in smask:
+                del smask['/Matte']
+        return old_size - new_size
+
+    @staticmethod
+    def _last_filter(stream):
+        """获取流的最后一个（即最内层的）编码过滤器"""
+        filters = stream.get('/Filter')
+        if isinstance(filters, pikepdf.Array):
+            return filters[-1] if len(filters) else None
+        return filters
+
+    @staticmethod
+    def _is_supported_colorspace(colorspace):
+        """仅处理灰度和RGB颜色空间（包括对应通道数的ICC颜色空间）"""
+        if colorspace in (Name.DeviceRGB, Name.DeviceGray):
+            return True
+        if isinstance(colorspace, pikepdf.Array) and len(colorspace) == 2 and colorspace[0] == Name.ICCBased:
+            return int(colorspace[1].get('/N', 0)) in (1, 3)
+        return False
+
+    @staticmethod
+    def _encode_bilevel(image, width, height, size):
+        """
+        对1位黑白图片（包括图片遮罩）重新采样，保持原有的位语义并使用Flate编码
+        :return: 编码后的数据，无法解码时返回None
+        """
+        colorspace = image.get('/ColorSpace')
+        if not image.get('/ImageMask', False) and colorspace != Name.DeviceGray:
+            return None
+        try:
+            raw = image.read_bytes()
+        except Exception:
+            # CCITT、JBIG2等无法解码的格式保持原样
+            return None
+        if len(raw) < ((width + 7) // 8) * height:
+            return None
+        bilevel = Image.frombytes('1', (width, height), raw)
+        # 先在灰度下平滑缩放再按阈值二值化，避免细线条断裂
+        resized = bilevel.convert('L').resize(size, Image.Resampling.LANCZOS)
+        resized = resized.point(lambda v: 255 if v >= 128 else 0).convert('1', dither=Image.Dither.NONE)
+        return zlib.compress(resized.tobytes())
+
+    @staticmethod
+    def deduplicate_objects(pdf):
+        """
+        合并内容相同的图片、表单XObject、嵌入字体文件和字体字典，所有引用都指向同一个共享对象
+        :param pdf: pikepdf.Pdf对象
+        :return: 被合并的重复对象数量
+        """
+        total = 0
+        for _ in range(PDFOptimizer.MAX_DEDUP_PASSES):
+            replacements = PDFOptimizer._find_duplicates(pdf)
+            if not replacements:
+                break
+            for obj in pdf.objects:
+                PDFOptimizer._rewire_references(obj, replacements)
+            PDFOptimizer._rewire_references(pdf.trailer, replacements)
+            total += len(replacements)
+        return total
+
+    @staticmethod
+    def _find_duplicates(pdf):
+        """
+        按内容哈希查找重复对象
+        :return: {重复对象的objgen: 保留的对象}
+        """
+        candidates = []
+        font_files = set()
+        for obj in pdf.objects:
+            if isinstance(obj, pikepdf.Stream):
+                if obj.get('/Subtype') in (Name.Image, Name.Form):
+                    candidates.append(obj)
+            elif isinstance(obj, pikepdf.Dictionary):
+                obj_type = obj.get('/Type')
+                if obj_type in (Name.Font, Name.FontDescriptor):
+                    candidates.append(obj)
+                if obj_type == Name.FontDescriptor:
+                    for key in ('/FontFile', '/FontFile2', '/FontFile3'):
+                        font_file = obj.get(key)
+                        if isinstance(font_file, pikepdf.Stream) and font_file.is_indirect:
+                            font_files.add(font_file.objgen)
+        candidates.extend(pdf.get_object(objgen) for objgen in sorted(font_files))
+
+        seen = {}
+        replacements = {}
+        for obj in candidates:
+            if obj.objgen in replacements:
+                continue
+            try:
+                digest = PDFOptimizer._content_digest(obj)
+            except Exception:
+                continue
+            original = seen.setdefault(digest, obj)
+            if original.objgen != obj.objgen:
+                replacements[obj.objgen] = original
+        return replacements
+
+    @staticmethod
+    def _content_digest(obj):
+        """计算对象内容的哈希：流使用解码后的数据加字典，无法解码的流使用原始数据加完整字典"""
+        skip = {'/Length'}
+        hasher = hashlib.sha256()
+        if isinstance(obj, pikepdf.Stream):
+            try:
+                data = obj.read_bytes()
+                # 数据已解码，编码方式不影响内容是否相同
+                skip.update(('/Filter', '/DecodeParms'))
+            except pikepdf.PdfError:
+                data = obj.read_raw_bytes()
+            hasher.update(b'stream')
+            hasher.update(hashlib.sha256(data).digest())
+        else:
+            hasher.update(b'dict')
+        for key in sorted(obj.keys()):
+            if key in skip:
+                continue
+            value = obj.get(key)
+            hasher.update(key.encode())
+            hasher.update(value.unparse() if isinstance(value, pikepdf.Object) else repr(value).encode())
+        return hasher.digest()
+
+    @staticmethod
+    def _rewire_references(obj, replacements):
+        """将对象（及其直接嵌套的字典和数组）中指向重复对象的引用替换为保留的对象"""
+        if isinstance(obj, (pikepdf.Dictionary, pikepdf.Stream)):
+            items = [(key, obj.get(key)) for key in obj.keys()]
+        elif isinstance(obj, pikepdf.Array):
+            items = list(enumerate(obj))
+        else:
+            return
+        for key, value in items:
+            if not isinstance(value, pikepdf.Object):
+                continue
+            if value.is_indirect:
+                if value.objgen in replacements:
+                    obj[key] = replacements[value.objgen]
+            elif isinstance(value, (pikepdf.Dictionary, pikepdf.Array)):
+                PDFOptimizer._rewire_references(value, replacements)
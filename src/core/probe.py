@@ -0,0 +1,748 @@
+"""PDF文件轻量探测
+
+只读取文件尾部的 trailer、交叉引用表以及页面树根节点，不解析页面内容，
+用于在文件选择和批量任务规划时快速获取页数、页面尺寸、加密状态和文档信息。
+文件通过 mmap 按需访问，即使是GB级的文件也只会读取用到的少量字节。
+遇到轻量解析无法处理的结构（如加密的对象流、损坏的交叉引用表）时回退到 pikepdf 完整解析。
+探测结果保存在持久缓存中（见 src/core/cache.py），文件未修改时不会再次解析。
+"""
+import hashlib
+import mmap
+import os
+import re
+import sqlite3
+import zlib
+from collections import namedtuple
+from itertools import accumulate
+from src.core.cache import ProbeCache, get_cache_dir
+
+
+_SKIP_RE = re.compile(rb'(?:[\x00\t\n\f\r ]+|%[^\r\n]*)*')
+_REGULAR_RE = re.compile(rb'[^\x00\t\n\f\r ()<>\[\]{}/%]+')
+_INT_RE = re.compile(rb'[+-]?\d+$')
+_REAL_RE = re.compile(rb'[+-]?(?:\d+\.\d*|\.\d+)$')
+_REF_TAIL_RE = re.compile(rb'[\x00\t\n\f\r ]+(\d+)[\x00\t\n\f\r ]+R(?![^\x00\t\n\f\r ()<>\[\]{}/%])')
+_OBJ_HEADER_RE = re.compile(rb'[\x00\t\n\f\r ]*(\d+)[\x00\t\n\f\r ]+(\d+)[\x00\t\n\f\r ]+obj')
+# 只包含间接引用的数组（如页面树的 /Kids），可以整体匹配后一次性提取
+_REF_ARRAY_RE = re.compile(rb'\[(?:[\x00\t\n\f\r ]*\d+[\x00\t\n\f\r ]+\d+[\x00\t\n\f\r ]+R)*[\x00\t\n\f\r ]*\]')
+_REF_PAIR_RE = re.compile(rb'(\d+)[\x00\t\n\f\r ]+(\d+)[\x00\t\n\f\r ]+R')
+_SUBSECTION_RE = re.compile(rb'(\d+)[ \t]+(\d+)[ \t]*(?:\r\n|\r|\n)')
+_NAME_ESCAPE_RE = re.compile(rb'#([0-9A-Fa-f]{2})')
+_LITERAL_SPECIAL_RE = re.compile(rb'[()\\]')
+_OCTAL_RE = re.compile(rb'[0-7]{1,3}')
+
+_LITERAL_ESCAPES = {
+    b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f',
+    b'(': b'(', b')': b')', b'\\': b'\\',
+}
+
+# 间接引用
+_Ref = namedtuple('_Ref', 'num gen')
+# 流对象：字典和数据在文件中的起始位置
+_Stream = namedtuple('_Stream', 'dict start')
+
+
+class _Name(str):
+    """PDF名称对象，以 '/' 开头"""
+
+
+class _RefArray:
+    """只包含间接引用的数组，用到时才解析，读取第一个元素不需要解析整个数组"""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._items = None
+
+    def _load(self):
+        if self._items is None:
+            self._items = [_Ref(int(num), int(gen)) for num, gen in _REF_PAIR_RE.findall(self._raw)]
+        return self._items
+
+    def __bool__(self):
+        return self._items is not None and bool(self._items) or _REF_PAIR_RE.search(self._raw) is not None
+
+    def __len__(self):
+        return len(self._load())
+
+    def __getitem__(self, index):
+        if index == 0 and self._items is None:
+            m = _REF_PAIR_RE.search(self._raw)
+            if m is None:
+                raise IndexError(index)
+            return _Ref(int(m.group(1)), int(m.group(2)))
+        return self._load()[index]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __reversed__(self):
+        return reversed(self._load())
+
+
+class _ProbeError(Exception):
+    """文件结构无法被轻量解析"""
+
+
+def _skip(data, pos):
+    """跳过空白和注释"""
+    return _SKIP_RE.match(data, pos).end()
+
+
+def _parse_literal(data, pos):
+    """解析 (...) 字符串，pos 指向左括号"""
+    out = bytearray()
+    depth = 1
+    i = pos + 1
+    while True:
+        m = _LITERAL_SPECIAL_RE.search(data, i)
+        if m is None:
+            raise _ProbeError("字符串没有结束")
+        j = m.start()
+        out += data[i:j]
+        ch = data[j:j + 1]
+        if ch == b'(':
+            depth += 1
+            out += ch
+            i = j + 1
+        elif ch == b')':
+            depth -= 1
+            if depth == 0:
+                return bytes(out), j + 1
+            out += ch
+            i = j + 1
+        else:
+            nxt = data[j + 1:j + 2]
+            if nxt in _LITERAL_ESCAPES:
+                out += _LITERAL_ESCAPES[nxt]
+                i = j + 2
+            elif nxt == b'\r':
+                # 续行
+                i = j + 3 if data[j + 2:j + 3] == b'\n' else j + 2
+            elif nxt == b'\n':
+                i = j + 2
+            else:
+                octal = _OCTAL_RE.match(data, j + 1)
+                if octal:
+                    out.append(int(octal.group(), 8) & 0xFF)
+                    i = octal.end()
+                else:
+                    i = j + 1
+
+
+def _parse(data, pos):
+    """
+    解析一个PDF对象
+    :return: (对象, 结束位置)
+    """
+    pos = _skip(data, pos)
+    c = data[pos:pos + 1]
+    if c == b'/':
+        m = _REGULAR_RE.match(data, pos + 1)
+        end = m.end() if m else pos + 1
+        raw = _NAME_ESCAPE_RE.sub(lambda e: bytes([int(e.group(1), 16)]), data[pos + 1:end])
+        return _Name('/' + raw.decode('latin-1')), end
+    if c == b'<':
+        if data[pos + 1:pos + 2] == b'<':
+            result = {}
+            pos += 2
+            while True:
+                pos = _skip(data, pos)
+                if data[pos:pos + 2] == b'>>':
+                    return result, pos + 2
+                key, pos = _parse(data, pos)
+                if not isinstance(key, _Name):
+                    raise _ProbeError("字典的键不是名称")
+                result[key], pos = _parse(data, pos)
+        end = data.find(b'>', pos)
+        if end < 0:
+            raise _ProbeError("十六进制字符串没有结束")
+        digits = re.sub(rb'[^0-9A-Fa-f]', b'', data[pos + 1:end])
+        if len(digits) % 2:
+            digits += b'0'
+        return bytes.fromhex(digits.decode()), end + 1
+    if c == b'[':
+        refs = _REF_ARRAY_RE.match(data, pos)
+        if refs:
+            return _RefArray(refs.group()), refs.end()
+        result = []
+        pos += 1
+        while True:
+            pos = _skip(data, pos)
+            if data[pos:pos + 1] == b']':
+                return result, pos + 1
+            value, pos = _parse(data, pos)
+            result.append(value)
+    if c == b'(':
+        return _parse_literal(data, pos)
+
+    m = _REGULAR_RE.match(data, pos)
+    if m is None:
+        raise _ProbeError(f"无法识别的对象 (位置 {pos})")
+    token = m.group()
+    end = m.end()
+    if _INT_RE.match(token):
+        ref = _REF_TAIL_RE.match(data, end)
+        if ref:
+            return _Ref(int(token), int(ref.group(1))), ref.end()
+        return int(token), end
+    if _REAL_RE.match(token):
+        return float(token), end
+    if token == b'true':
+        return True, end
+    if token == b'false':
+        return False, end
+    if token == b'null':
+        return None, end
+    raise _ProbeError(f"无法识别的对象 {token[:20]!r}")
+
+
+def _png_unpredict(data, columns):
+    """还原PNG预测器编码的数据"""
+    stride = columns + 1
+    if len(data) % stride:
+        raise _ProbeError("预测器数据长度不正确")
+    # 交叉引用流几乎总是全部使用 Up 预测，按列累加即可，避免逐字节循环
+    if data[0::stride] == b'\x02' * (len(data) // stride):
+        out = bytearray(len(data) // stride * columns)
+        for col in range(columns):
+            out[col::columns] = bytes(map((255).__and__, accumulate(data[col + 1::stride])))
+        return bytes(out)
+
+    out = bytearray()
+    prev = bytearray(columns)
+    for start in range(0, len(data), stride):
+        kind = data[start]
+        row = bytearray(data[start + 1:start + stride])
+        if kind == 1:
+            for i in range(1, columns):
+                row[i] = (row[i] + row[i - 1]) & 0xFF
+        elif kind == 2:
+            for i in range(columns):
+                row[i] = (row[i] + prev[i]) & 0xFF
+        elif kind == 3:
+            for i in range(columns):
+                left = row[i - 1] if i else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(columns):
+                a = row[i - 1] if i else 0
+                b = prev[i]
+                c = prev[i - 1] if i else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                predictor = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+                row[i] = (row[i] + predictor) & 0xFF
+        elif kind != 0:
+            raise _ProbeError(f"不支持的PNG预测类型 {kind}")
+        out += row
+        prev = row
+    return bytes(out)
+
+
+def _decode_text(value):
+    """将PDF文本字符串解码为 str"""
+    if value[:2] == b'\xfe\xff':
+        return value[2:].decode('utf-16-be', errors='replace')
+    if value[:3] == b'\xef\xbb\xbf':
+        return value[3:].decode('utf-8', errors='replace')
+    return value.decode('latin-1')
+
+
+class _LightReader:
+    """只按需读取交叉引用表和少量对象的PDF读取器"""
+
+    def __init__(self, data):
+        self.data = data
+        self.size = len(data)
+        self._objects = {}
+        self._object_streams = {}
+        # 交叉引用段，从新到旧排列
+        self._sections = []
+        self.trailer = {}
+        self._load_xref_chain()
+
+    def _load_xref_chain(self):
+        tail_start = max(0, self.size - 2048)
+        idx = self.data.rfind(b'startxref', tail_start)
+        if idx < 0:
+            raise _ProbeError("找不到 startxref")
+        offset, _ = _parse(self.data, idx + 9)
+        if not isinstance(offset, int):
+            raise _ProbeError("startxref 不是整数")
+
+        visited = set()
+        pending = [offset]
+        while pending:
+            offset = pending.pop(0)
+            if offset in visited or not 0 <= offset < self.size:
+                continue
+            visited.add(offset)
+            pos = _skip(self.data, offset)
+            if self.data[pos:pos + 4] == b'xref':
+                trailer = self._read_xref_table(pos + 4)
+                # 混合交叉引用文件中，XRefStm 的条目排在本段之后、/Prev 之前
+                if isinstance(trailer.get('/XRefStm'), int):
+                    pending.insert(0, trailer['/XRefStm'])
+            else:
+                trailer = self._read_xref_stream(pos)
+            for key, value in trailer.items():
+                self.trailer.setdefault(key, value)
+            if isinstance(trailer.get('/Prev'), int):
+                pending.append(trailer['/Prev'])
+
+        if '/Root' not in self.trailer:
+            raise _ProbeError("trailer 中没有 /Root")
+
+    def _read_xref_table(self, pos):
+        """读取传统交叉引用表，只记录各子段的位置，条目在查找时按偏移直接读取"""
+        while True:
+            pos = _skip(self.data, pos)
+            if self.data[pos:pos + 7] == b'trailer':
+                trailer, _ = _parse(self.data, pos + 7)
+                if not isinstance(trailer, dict):
+                    raise _ProbeError("trailer 不是字典")
+                return trailer
+            m = _SUBSECTION_RE.match(self.data, pos)
+            if m is None:
+                raise _ProbeError("交叉引用表格式错误")
+            start, count = int(m.group(1)), int(m.group(2))
+            entries = m.end()
+            if count and self.data[entries + 18:entries + 20] not in (b' \n', b' \r', b'\r\n'):
+                raise _ProbeError("交叉引用条目长度不是20字节")
+            self._sections.append(('table', start, count, entries))
+            pos = entries + count * 20
+
+    def _read_xref_stream(self, pos):
+        """读取交叉引用流"""
+        value = self._read_indirect(pos)
+        if not isinstance(value, _Stream) or value.dict.get('/Type') != '/XRef':
+            raise _ProbeError("startxref 没有指向交叉引用表")
+        stream_dict = value.dict
+        widths = stream_dict.get('/W')
+        if not isinstance(widths, list) or len(widths) != 3:
+            raise _ProbeError("交叉引用流缺少 /W")
+        index = stream_dict.get('/Index', [0, stream_dict.get('/Size', 0)])
+        ranges = list(zip(index[0::2], index[1::2]))
+        self._sections.append(('stream', ranges, widths, self._decode_stream(value)))
+        return stream_dict
+
+    def _lookup(self, num):
+        """
+        在交叉引用段中查找对象
+        :return: ('n', 偏移) / ('c', 对象流编号, 序号) / None（对象不存在）
+        """
+        for section in self._sections:
+            if section[0] == 'table':
+                _, start, count, entries = section
+                if not start <= num < start + count:
+                    continue
+                entry = self.data[entries + (num - start) * 20:entries + (num - start) * 20 + 18]
+                if entry[17:18] != b'n':
+                    return None
+                return 'n', int(entry[0:10])
+
+            _, ranges, widths, data = section
+            row = 0
+            for start, count in ranges:
+                if start <= num < start + count:
+                    row += num - start
+                    break
+                row += count
+            else:
+                continue
+            w1, w2, w3 = widths
+            offset = row * (w1 + w2 + w3)
+            fields = data[offset:offset + w1 + w2 + w3]
+            kind = int.from_bytes(fields[:w1], 'big') if w1 else 1
+            field2 = int.from_bytes(fields[w1:w1 + w2], 'big')
+            field3 = int.from_bytes(fields[w1 + w2:], 'big')
+            if kind == 1:
+                return 'n', field2
+            if kind == 2:
+                return 'c', field2, field3
+            return None
+        return None
+
+    def _read_indirect(self, offset):
+        """读取 'n g obj' 开头的对象，流对象返回 _Stream"""
+        m = _OBJ_HEADER_RE.match(self.data, offset)
+        if m is None:
+            raise _ProbeError(f"偏移 {offset} 处不是对象")
+        value, pos = _parse(self.data, m.end())
+        if isinstance(value, dict):
+            pos = _skip(self.data, pos)
+            if self.data[pos:pos + 6] == b'stream':
+                pos += 6
+                if self.data[pos:pos + 2] == b'\r\n':
+                    pos += 2
+                elif self.data[pos:pos + 1] in (b'\n', b'\r'):
+                    pos += 1
+                return _Stream(value, pos)
+        return value
+
+    def _decode_stream(self, stream):
+        """解码流数据，只支持 FlateDecode 及其预测器"""
+        length = self.resolve(stream.dict.get('/Length'))
+        if not isinstance(length, int):
+            raise _ProbeError("流长度无效")
+        data = self.data[stream.start:stream.start + length]
+
+        filters = stream.dict.get('/Filter', [])
+        parms = stream.dict.get('/DecodeParms', [])
+        if not isinstance(filters, list):
+            filters = [filters]
+        if not isinstance(parms, list):
+            parms = [parms]
+        for i, name in enumerate(filters):
+            if name != '/FlateDecode':
+                raise _ProbeError(f"不支持的流编码 {name}")
+            data = zlib.decompress(data)
+            parm = self.resolve(parms[i]) if i < len(parms) else None
+            if isinstance(parm, dict) and parm.get('/Predictor', 1) >= 10:
+                columns = parm.get('/Columns', 1) * parm.get('/Colors', 1) * parm.get('/BitsPerComponent', 8) // 8
+                data = _png_unpredict(data, columns)
+            elif isinstance(parm, dict) and parm.get('/Predictor', 1) != 1:
+                raise _ProbeError("不支持的TIFF预测器")
+        return data
+
+    def _read_from_object_stream(self, stream_num, index):
+        if stream_num not in self._object_streams:
+            if '/Encrypt' in self.trailer:
+                raise _ProbeError("加密文件的对象流需要完整解析")
+            stream = self.get(stream_num)
+            if not isinstance(stream, _Stream):
+                raise _ProbeError("对象流无效")
+            data = self._decode_stream(stream)
+            first = stream.dict.get('/First', 0)
+            numbers = [int(n) for n in data[:first].split()]
+            offsets = [first + off for off in numbers[1::2]]
+            self._object_streams[stream_num] = (data, offsets)
+        data, offsets = self._object_streams[stream_num]
+        if index >= len(offsets):
+            raise _ProbeError("对象流序号越界")
+        return _parse(data, offsets[index])[0]
+
+    def get(self, num):
+        """按对象编号读取对象"""
+        if num not in self._objects:
+            location = self._lookup(num)
+            if location is None:
+                value = None
+            elif location[0] == 'n':
+                value = self._read_indirect(location[1])
+            else:
+                value = self._read_from_object_stream(location[1], location[2])
+            self._objects[num] = value
+        return self._objects[num]
+
+    def resolve(self, value):
+        """解析间接引用"""
+        depth = 0
+        while isinstance(value, _Ref):
+            value = self.get(value.num)
+            depth += 1
+            if depth > 32:
+                raise _ProbeError("间接引用循环")
+        return value
+
+
+class PDFProbe:
+    # 链接化字典必须出现在文件开头的这个范围内
+    LINEARIZATION_WINDOW = 1024
+
+    # 计算文件指纹时每次哈希的字节数
+    FINGERPRINT_CHUNK = 1024 * 1024
+    # 探测结果的格式或含义变化时递增，旧版本的缓存文件不再使用
+    CACHE_VERSION = 4
+    # 各缓存目录对应的持久缓存
+    _caches = {}
+
+    @staticmethod
+    def get_cache():
+        """
+        获取探测结果的持久缓存，设置环境变量 PDF_TOOLBOX_PROBE_CACHE=0 可禁用
+        :return: ProbeCache|None - 缓存不可用时返回 None
+        """
+        if os.environ.get('PDF_TOOLBOX_PROBE_CACHE') == '0':
+            return None
+        try:
+            cache_dir = get_cache_dir()
+            if cache_dir not in PDFProbe._caches:
+                PDFProbe._caches[cache_dir] = ProbeCache(
+                    os.path.join(cache_dir, f'probe.v{PDFProbe.CACHE_VERSION}.sqlite3'))
+            return PDFProbe._caches[cache_dir]
+        except (sqlite3.Error, OSError):
+            return None
+
+    @staticmethod
+    def probe(pdf_path, page_sizes=False, use_cache=True):
+        """
+        快速获取PDF文件的基本信息
+        :param pdf_path: PDF文件路径
+        :param page_sizes: 是否返回每一页的尺寸（需要遍历整个页面树），默认只返回第一页的尺寸
+        :param use_cache: 是否使用持久缓存，文件未修改时直接返回上次的结果
+        :return: (bool, dict|str) - (是否成功, 信息字典|错误信息)
+                 信息字典包含 Version、Pages、PageSize、Encrypted、Linearized、Info、FileSize，
+                 page_sizes 为 True 时还包含 PageSizes。
+                 页面尺寸为 MediaBox 的 (宽, 高)，单位为点；需要密码才能打开的文件 Pages 为 None
+        """
+        try:
+            if not os.path.exists(pdf_path):
+                return False, "文件不存在"
+            
+            cache = PDFProbe.get_cache() if use_cache else None
+            if cache is not None:
+                try:
+                    info = cache.get(pdf_path, page_sizes)
+                    if info is not None:
+                        return True, info
+                except (sqlite3.Error, OSError, ValueError):
+                    cache = None
+            
+            try:
+                info = PDFProbe._probe_light(pdf_path, page_sizes)
+            except (_ProbeError, ValueError, TypeError, KeyError, IndexError, AttributeError, zlib.error):
+                # 结构不符合预期（如应为字典的对象是其他类型）时交给 pikepdf
+                info = PDFProbe._probe_full(pdf_path, page_sizes)
+            
+            if cache is not None:
+                try:
+                    cache.put(pdf_path, info)
+                except (sqlite3.Error, OSError, ValueError):
+                    pass
+            return True, info
+        except Exception as e:
+            return False, f"读取PDF信息失败: {str(e)}"
+
+    @staticmethod
+    def get_fingerprint(pdf_path, use_cache=True):
+        """
+        获取文件指纹，文件未修改时使用缓存的结果。
+        计算指纹需要读取整个文件，大文件较慢，不要在界面线程中调用
+        :param pdf_path: PDF文件路径
+        :param use_cache: 是否使用持久缓存
+        :return: str - 十六进制指纹
+        """
+        cache = PDFProbe.get_cache() if use_cache else None
+        if cache is not None:
+            try:
+                fingerprint = cache.get_fingerprint(pdf_path)
+                if fingerprint is not None:
+                    return fingerprint
+            except (sqlite3.Error, OSError):
+                cache = None
+
+        fingerprint = PDFProbe.fingerprint(pdf_path)
+        if cache is not None:
+            try:
+                cache.put_fingerprint(pdf_path, fingerprint)
+            except (sqlite3.Error, OSError):
+                pass
+        return fingerprint
+
+    @staticmethod
+    def fingerprint(pdf_path):
+        """
+        计算文件指纹：整个文件内容的SHA-256，用于识别内容相同的文件（如缩略图缓存的键）。
+        通常应使用带缓存的 get_fingerprint
+        :param pdf_path: PDF文件路径
+        :return: str - 十六进制指纹
+        """
+        digest = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return digest.hexdigest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # 分块哈希，避免把整个文件复制到内存
+                for start in range(0, len(data), PDFProbe.FINGERPRINT_CHUNK):
+                    digest.update(data[start:start + PDFProbe.FINGERPRINT_CHUNK])
+        return digest.hexdigest()
+
+    @staticmethod
+    def get_page_count(pdf_path):
+        """
+        快速获取PDF文件的总页数
+        :param pdf_path: PDF文件路径
+        :return: (bool, int|str) - (是否成功, 页数|错误信息)
+        """
+        success, result = PDFProbe.probe(pdf_path)
+        if not success:
+            return False, result
+        if result['Pages'] is None:
+            return False, "PDF文件受密码保护"
+        return True, result['Pages']
+
+    @staticmethod
+    def _probe_light(pdf_path, page_sizes):
+        """只读取 trailer、交叉引用表和页面树根节点"""
+        file_size = os.path.getsize(pdf_path)
+        with open(pdf_path, 'rb') as f:
+            if file_size == 0:
+                raise _ProbeError("文件为空")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                header = data.find(b'%PDF-', 0, PDFProbe.LINEARIZATION_WINDOW)
+                if header < 0:
+                    raise _ProbeError("不是PDF文件")
+                version = data[header + 5:header + 8].decode('latin-1')
+
+                reader = _LightReader(data)
+                if '/Encrypt' in reader.trailer:
+                    # 是否需要用户密码只能通过尝试空密码判断，交给完整解析
+                    raise _ProbeError("文件已加密")
+
+                # 链接化文件的第一个对象直接给出页数和第一页的对象编号，
+                # /L 与文件长度一致说明文件之后没有被增量修改过
+                linearized = PDFProbe._read_linearization(data, header)
+                if linearized is not None and linearized.get('/L') == file_size:
+                    page_count = linearized.get('/N')
+                    first_page = reader.get(linearized['/O']) if isinstance(linearized.get('/O'), int) else None
+                else:
+                    linearized = None
+                    page_count = None
+                    first_page = None
+
+                root = reader.resolve(reader.trailer['/Root'])
+                if not isinstance(page_count, int) or not isinstance(first_page, dict):
+                    pages = reader.resolve(root['/Pages'])
+                    page_count = reader.resolve(pages['/Count'])
+                    first_page = PDFProbe._first_page(reader, pages)
+
+                result = {
+                    'Version': version,
+                    'Pages': page_count,
+                    'PageSize': PDFProbe._page_size(reader, first_page),
+                    'Encrypted': False,
+                    'Linearized': linearized is not None,
+                    'Info': PDFProbe._read_info(reader),
+                    'FileSize': file_size,
+                }
+                if page_sizes:
+                    result['PageSizes'] = PDFProbe._all_page_sizes(reader, reader.resolve(root['/Pages']))
+                return result
+
+    @staticmethod
+    def _read_linearization(data, header):
+        """读取文件开头的链接化字典，没有时返回 None"""
+        m = _OBJ_HEADER_RE.search(data, header, header + PDFProbe.LINEARIZATION_WINDOW)
+        if m is None:
+            return None
+        value, _ = _parse(data, m.end())
+        if isinstance(value, dict) and '/Linearized' in value:
+            return value
+        return None
+
+    @staticmethod
+    def _first_page(reader, pages):
+        """沿页面树的第一个分支找到第一页"""
+        node = pages
+        for _ in range(64):
+            if reader.resolve(node.get('/Type')) == '/Page' or '/Kids' not in node:
+                return node
+            kids = reader.resolve(node['/Kids'])
+            if not kids:
+                return None
+            node = reader.resolve(kids[0])
+        raise _ProbeError("页面树层级过深")
+
+    @staticmethod
+    def _inherited(reader, node, key):
+        """读取页面属性，沿 /Parent 查找继承值"""
+        for _ in range(64):
+            if not isinstance(node, dict):
+                return None
+            if key in node:
+                return reader.resolve(node[key])
+            node = reader.resolve(node.get('/Parent'))
+        return None
+
+    @staticmethod
+    def _box_size(reader, box):
+        if not isinstance(box, list) or len(box) != 4:
+            return None
+        x0, y0, x1, y1 = [float(reader.resolve(v)) for v in box]
+        return abs(x1 - x0), abs(y1 - y0)
+
+    @staticmethod
+    def _page_size(reader, page):
+        if page is None:
+            return None
+        return PDFProbe._box_size(reader, PDFProbe._inherited(reader, page, '/MediaBox'))
+
+    @staticmethod
+    def _all_page_sizes(reader, pages):
+        """遍历页面树，返回每一页的尺寸"""
+        sizes = []
+        visited = set()
+        stack = [(pages, PDFProbe._inherited(reader, pages, '/MediaBox'))]
+        while stack:
+            node, box = stack.pop()
+            box = reader.resolve(node.get('/MediaBox', box))
+            if reader.resolve(node.get('/Type')) == '/Page' or '/Kids' not in node:
+                sizes.append(PDFProbe._box_size(reader, box))
+                continue
+            for kid in reversed(reader.resolve(node['/Kids'])):
+                if isinstance(kid, _Ref):
+                    if kid.num in visited:
+                        raise _ProbeError("页面树存在循环")
+                    visited.add(kid.num)
+                stack.append((reader.resolve(kid), box))
+        return sizes
+
+    @staticmethod
+    def _read_info(reader):
+        """读取未加密文件的文档信息字典"""
+        info = reader.resolve(reader.trailer.get('/Info'))
+        if not isinstance(info, dict):
+            return {}
+        result = {}
+        for key, value in info.items():
+            value = reader.resolve(value)
+            if isinstance(value, bytes):
+                value = _decode_text(value)
+            elif isinstance(value, (dict, list, _RefArray, _Stream)) or value is None:
+                continue
+            result[str(key)] = value
+        return result
+
+    @staticmethod
+    def _probe_full(pdf_path, page_sizes):
+        """使用 pikepdf 完整解析"""
+        # 只在轻量解析失败时才需要 pikepdf，延迟导入以加快文件选择等场景的启动
+        import pikepdf
+
+        file_size = os.path.getsize(pdf_path)
+        try:
+            pdf = pikepdf.Pdf.open(pdf_path)
+        except pikepdf.PasswordError:
+            return {
+                'Version': None,
+                'Pages': None,
+                'PageSize': None,
+                'Encrypted': True,
+                'Linearized': False,
+                'Info': {},
+                'FileSize': file_size,
+            }
+        with pdf:
+            def size(page):
+                x0, y0, x1, y1 = [float(v) for v in page.mediabox]
+                return abs(x1 - x0), abs(y1 - y0)
+
+            info = {}
+            if not pdf.is_encrypted:
+                for key, value in pdf.docinfo.items():
+                    if isinstance(value, (pikepdf.Dictionary, pikepdf.Array)):
+                        continue
+                    info[str(key)] = str(value)
+            result = {
+                'Version': pdf.pdf_version,
+                'Pages': len(pdf.pages),
+                'PageSize': size(pdf.pages[0]) if len(pdf.pages) else None,
+                'Encrypted': pdf.is_encrypted,
+                'Linearized': pdf.is_linearized,
+                'Info': info,
+                'FileSize': file_size,
+            }
+            if page_sizes:
+                result['PageSizes'] = [size(page) for page in pdf.pages]
+            return result
@@ -0,0 +1,123 @@
+"""进度报告和取消
+
+耗时操作接收一个 Progress 对象，在页面循环和保存步骤中报告进度。
+每次报告时都会检查取消标记，被取消时抛出 OperationCancelled，
+操作因此可以在处理到一半时停止，而不必等到整个文件处理完。
+"""
+import os
+import threading
+
+
+class OperationCancelled(Exception):
+    """操作被取消"""
+
+    def __init__(self, message="操作已取消"):
+        super().__init__(message)
+
+
+class CancelToken:
+    """取消标记，可以在任意线程中调用 cancel"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """请求取消"""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        """是否已请求取消"""
+        return self._event.is_set()
+
+    def check(self):
+        """已请求取消时抛出 OperationCancelled"""
+        if self._event.is_set():
+            raise OperationCancelled()
+
+
+class Progress:
+    """
+    进度报告对象
+    phase - 当前阶段名称，done/total - 当前阶段已完成的数量和总数（页数、文件数等），
+    bytes_written - 已写入的字节数。每次更新后调用 callback(progress)
+    """
+
+    def __init__(self, callback=None, token=None):
+        """
+        :param callback: 进度回调 callback(progress)，在执行操作的线程中调用
+        :param token: CancelToken，默认创建新的标记
+        """
+        self.callback = callback
+        self.token = token or CancelToken()
+        self.phase = ''
+        self.done = 0
+        self.total = 0
+        self.bytes_written = 0
+
+    def start(self, phase, total=0):
+        """
+        开始新的阶段
+        :param phase: 阶段名称
+        :param total: 阶段的总数量，0表示未知
+        """
+        self.phase = phase
+        self.done = 0
+        self.total = total
+        self._notify()
+
+    def advance(self, count=1):
+        """当前阶段完成 count 个单位"""
+        self.done += count
+        self._notify()
+
+    def wrote(self, nbytes):
+        """记录写入的字节数"""
+        self.bytes_written += nbytes
+        self._notify()
+
+    def saving(self, phase="保存文件"):
+        """
+        开始保存阶段
+        :param phase: 阶段名称
+        :return: 传给 pikepdf.Pdf.save(progress=...) 的回调，参数为保存的百分比
+        """
+        self.start(phase, 100)
+
+        def callback(percent):
+            self.done = percent
+            self._notify()
+        return callback
+
+    def saved(self, output):
+        """
+        保存完成后记录输出文件的大小
+        :param output: 输出文件路径，文件对象等其他输出会被忽略
+        """
+        if isinstance(output, (str, os.PathLike)) and os.path.isfile(output):
+            self.wrote(os.path.getsize(output))
+
+    def check(self):
+        """只检查是否已取消，不更新进度"""
+        self.token.check()
+
+    @property
+    def fraction(self):
+        """当前阶段的完成比例，总数未知时为 None"""
+        if not self.total:
+            return None
+        return min(1.0, self.done / self.total)
+
+    def _notify(self):
+        self.token.check()
+        if self.callback is not None:
+            self.callback(self)
+
+
+def ensure_progress(progress):
+    """
+    核心方法的 progress 参数可以省略，此时使用一个不报告、也不会被取消的 Progress
+    :param progress: Progress|None
+    :return: Progress
+    """
+    return progress if progress is not None else Progress()
@@ -0,0 +1,194 @@
+import re
+import pikepdf
+from pikepdf import Name
+
+
+# 可以按名称引用的资源类别，其他条目（如 /ProcSet）原样保留
+RESOURCE_CATEGORIES = ('/Font', '/XObject', '/ExtGState', '/ColorSpace', '/Pattern', '/Shading', '/Properties')
+
+# 内容流中的名称对象，如 /F1、/Im0
+_NAME_TOKEN = re.compile(rb'/([^\x00\t\n\x0c\r ()<>\[\]{}/%]*)')
+_NAME_ESCAPE = re.compile(rb'#([0-9A-Fa-f]{2})')
+
+
+def _stream_list(contents):
+    """页面或对象的 /Contents 可以是单个流、流数组或不存在"""
+    if contents is None:
+        return []
+    if isinstance(contents, pikepdf.Stream):
+        return [contents]
+    if isinstance(contents, pikepdf.Array):
+        return [item for item in contents if isinstance(item, pikepdf.Stream)]
+    return []
+
+
+def _inherited(page_obj, key):
+    """读取页面属性，页面本身没有时沿页面树向上查找继承值"""
+    node = page_obj
+    while node is not None:
+        if key in node:
+            return node[key]
+        node = node.get('/Parent')
+    return None
+
+
+class ResourcePruner:
+    """
+    按内容流实际引用的名称裁剪页面资源
+
+    页面的 /Resources 经常继承自页面树或在整个文档中共享，分割、重排、提取页面时
+    每个输出文件会因此带上所有字体和图片。裁剪时为页面生成只包含用到条目的新资源字典，
+    被引用的字体、图片等对象本身不变，未被任何页面引用的对象在保存时自然不会写出。
+
+    名称的收集是保守的：内容流中出现的任何名称都视为被引用（包括字符串中形似名称的内容），
+    只会多保留，不会误删。
+    """
+
+    @staticmethod
+    def content_names(streams):
+        """
+        收集内容流中出现的所有名称
+        :param streams: pikepdf.Stream 列表
+        :return: set - 名称集合，如 {'/F1', '/Im0'}
+        """
+        names = set()
+        for stream in streams:
+            try:
+                data = stream.read_bytes()
+            except pikepdf.PdfError:
+                # 无法解码的流无法判断引用了什么，由调用方保留全部资源
+                return None
+            for raw in _NAME_TOKEN.findall(data):
+                if b'#' in raw:
+                    raw = _NAME_ESCAPE.sub(lambda m: bytes([int(m.group(1), 16)]), raw)
+                names.add('/' + raw.decode('latin-1'))
+        return names
+
+    @staticmethod
+    def used_names(resources, streams):
+        """
+        计算内容流使用到的资源名称。没有自己的资源字典的表单XObject、
+        图案和Type3字体使用页面资源，它们的内容流中的名称也计入其中
+        :param resources: 页面资源字典
+        :param streams: 页面内容流列表
+        :return: set|None - 名称集合，内容流无法读取时返回 None
+        """
+        names = ResourcePruner.content_names(streams)
+        if names is None:
+            return None
+        checked = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            for category in ('/XObject', '/Pattern', '/Font'):
+                group = resources.get(category)
+                if not isinstance(group, pikepdf.Dictionary) or name not in group:
+                    continue
+                obj = group[name]
+                key = obj.objgen if obj.is_indirect else id(obj)
+                if key in checked or '/Resources' in obj:
+                    continue
+                checked.add(key)
+                if category == '/Font':
+                    if obj.get('/Subtype') != Name.Type3:
+                        continue
+                    procs = obj.get('/CharProcs')
+                    if not isinstance(procs, pikepdf.Dictionary):
+                        continue
+                    inner = [proc for proc in procs.values() if isinstance(proc, pikepdf.Stream)]
+                elif category == '/XObject':
+                    # 图片的数据不是内容流，只检查表单
+                    if not isinstance(obj, pikepdf.Stream) or obj.get('/Subtype') != Name.Form:
+                        continue
+                    inner = [obj]
+                else:
+                    # 只有平铺图案（PatternType 1）带有内容流
+                    if not isinstance(obj, pikepdf.Stream) or obj.get('/PatternType') != 1:
+                        continue
+                    inner = [obj]
+                found = ResourcePruner.content_names(inner)
+                if found is None:
+                    return None
+                for inner_name in found - names:
+                    names.add(inner_name)
+                    pending.append(inner_name)
+        return names
+
+    @staticmethod
+    def prune_resources(resources, streams):
+        """
+        生成只包含内容流用到的条目的新资源字典
+        :param resources: 原资源字典（不会被修改）
+        :param streams: 使用该资源字典的内容流列表
+        :return: (pikepdf.Dictionary|None, int) - (新资源字典, 删除的条目数)，无需裁剪时返回 (None, 0)
+        """
+        names = ResourcePruner.used_names(resources, streams)
+        if names is None:
+            return None, 0
+        pruned = pikepdf.Dictionary()
+        removed = 0
+        for key in resources.keys():
+            value = resources[key]
+            if key in RESOURCE_CATEGORIES and isinstance(value, pikepdf.Dictionary):
+                kept = pikepdf.Dictionary()
+                for name in value.keys():
+                    if name in names:
+                        kept[name] = value.get(name)
+                    else:
+                        removed += 1
+                if len(kept.keys()):
+                    pruned[key] = kept
+            else:
+                pruned[key] = value
+        if removed == 0:
+            return None, 0
+        return pruned, removed
+
+    @staticmethod
+    def prune_forms(resources, visited):
+        """
+        裁剪资源中表单XObject自己的资源字典（直接修改表单对象）。
+        裁剪结果只取决于表单自己的内容流，因此被多个页面共享的表单也可以安全修改
+        :param resources: 页面或上层表单的资源字典
+        :param visited: 已处理的表单对象编号集合，避免重复处理和循环引用
+        :return: int - 删除的条目数
+        """
+        xobjects = resources.get('/XObject')
+        if not isinstance(xobjects, pikepdf.Dictionary):
+            return 0
+        removed = 0
+        for name in xobjects.keys():
+            form = xobjects.get(name)
+            if not isinstance(form, pikepdf.Stream) or form.get('/Subtype') != Name.Form:
+                continue
+            if form.is_indirect:
+                if form.objgen in visited:
+                    continue
+                visited.add(form.objgen)
+            inner = form.get('/Resources')
+            if not isinstance(inner, pikepdf.Dictionary):
+                continue
+            pruned, count = ResourcePruner.prune_resources(inner, [form])
+            if pruned is not None:
+                form.Resources = pruned
+                inner = pruned
+                removed += count
+            removed += ResourcePruner.prune_forms(inner, visited)
+        return removed
+
+    @staticmethod
+    def prune_page(page, visited=None):
+        """
+        裁剪页面资源：页面改为使用自己的（直接）资源字典，不再修改共享或继承的字典
+        :param page: pikepdf.Page 对象
+        :param visited: 已处理的表单对象编号集合，同一文档的多个页面之间共用
+        :return: int - 删除的条目数
+        """
+        resources = _inherited(page.obj, '/Resources')
+        if not isinstance(resources, pikepdf.Dictionary):
+            return 0
+        pruned, removed = ResourcePruner.prune_resources(resources, _stream_list(page.obj.get('/Contents')))
+        if pruned is not None:
+            page.obj.Resources = pruned
+            resources = pruned
+        return removed + ResourcePruner.prune_forms(resources, set() if visited is None else visited)
@@ -0,0 +1,138 @@
+"""PDF分割引擎
+
+源文件在每个进程中只打开一次，所有输出文件都从这一个只读的源文档中复制页面：
+qpdf 只复制每个输出文件中页面实际引用到的对象（字体、图片等），
+不需要为每个输出重新解析源文件。输出文件较多时分批交给进程池并行写入，
+每个工作进程各自打开一次源文件，依靠系统的文件缓存共享读取。
+
+复制页面之前先裁剪页面资源（见 ResourcePruner），继承或共享的资源字典中
+未被页面使用的字体和图片不会被复制到输出文件中。源文档只在内存中被修改，不会保存。
+"""
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pikepdf
+
+from src.core.progress import ensure_progress
+from src.core.resources import ResourcePruner
+
+
+class PruneState:
+    """记录源文档中已经裁剪过的页面和表单，同一个源文档的多个批次之间共用"""
+
+    def __init__(self):
+        self.pages = set()
+        self.forms = set()
+
+    def prune(self, source, index):
+        """裁剪源文档中的一页，已裁剪过的页面直接跳过"""
+        if index not in self.pages:
+            ResourcePruner.prune_page(source.pages[index], self.forms)
+            self.pages.add(index)
+
+
+def write_outputs(source, outputs, on_written=None, prune_state=None):
+    """
+    从已打开的源文档中写出多个文件
+    :param source: pikepdf.Pdf - 源文档，裁剪资源时会在内存中被修改
+    :param outputs: [(输出文件路径, [页面下标(从0开始), ...]), ...]
+    :param on_written: 每写完一个文件调用 on_written(输出文件路径, 文件大小)
+    :param prune_state: PruneState，None表示不裁剪资源
+    :return: int - 写入的总字节数
+    """
+    total = 0
+    for output_path, pages in outputs:
+        with pikepdf.Pdf.new() as new_pdf:
+            for index in pages:
+                if prune_state is not None:
+                    prune_state.prune(source, index)
+                new_pdf.pages.append(source.pages[index])
+            new_pdf.save(output_path)
+        size = os.path.getsize(output_path)
+        total += size
+        if on_written:
+            on_written(output_path, size)
+    return total
+
+
+# 工作进程中打开的源文档及其裁剪状态
+_source = None
+_prune_state = None
+
+
+def _open_source(input_path, password, prune_resources):
+    """工作进程初始化：打开源文件，之后的所有任务共用"""
+    global _source, _prune_state
+    _source = pikepdf.Pdf.open(input_path, password=password)
+    _prune_state = PruneState() if prune_resources else None
+
+
+def _write_batch(outputs):
+    return len(outputs), write_outputs(_source, outputs, prune_state=_prune_state)
+
+
+class SplitEngine:
+    """分割引擎，一次打开源文件写出所有输出文件"""
+
+    # 输出文件数少于该值时直接在当前进程中写出，不启动进程池
+    PARALLEL_MIN_OUTPUTS = 16
+    # 每批输出文件数的上限
+    MAX_BATCH_SIZE = 256
+    # 等待结果时检查取消标记的间隔（秒）
+    POLL_INTERVAL = 0.2
+
+    def __init__(self, max_workers=None, prune_resources=True):
+        """
+        :param max_workers: 工作进程数，None表示使用CPU核心数，1表示在当前进程中写出
+        :param prune_resources: 是否裁剪页面未使用的资源
+        """
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.prune_resources = prune_resources
+
+    def split(self, input_path, outputs, progress=None, password=''):
+        """
+        按页面组写出多个PDF文件
+        :param input_path: 源PDF文件路径
+        :param outputs: [(输出文件路径, [页面下标(从0开始), ...]), ...]
+        :param progress: Progress，每写完一个文件报告一次；取消时抛出 OperationCancelled
+        :param password: 源文件的密码
+        :return: int - 写入的总字节数
+        """
+        progress = ensure_progress(progress)
+        progress.start("写出文件", len(outputs))
+        if self.max_workers == 1 or len(outputs) < self.PARALLEL_MIN_OUTPUTS:
+            with pikepdf.Pdf.open(input_path, password=password) as source:
+                return write_outputs(source, outputs,
+                                     lambda path, size: (progress.wrote(size), progress.advance()),
+                                     PruneState() if self.prune_resources else None)
+
+        workers = min(self.max_workers, len(outputs))
+        # 每个进程约分到4批，进度更新均匀，也不会因为批次太多而增加调度开销
+        batch_size = max(1, min(self.MAX_BATCH_SIZE, len(outputs) // (workers * 4)))
+        batches = [outputs[i:i + batch_size] for i in range(0, len(outputs), batch_size)]
+
+        executor = ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_open_source,
+                                       initargs=(input_path, password, self.prune_resources))
+        total = 0
+        pending = set()
+        try:
+            pending = {executor.submit(_write_batch, batch) for batch in batches}
+            while pending:
+                done, pending = wait(pending, self.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                progress.check()
+                for future in done:
+                    count, nbytes = future.result()
+                    total += nbytes
+                    progress.wrote(nbytes)
+                    progress.advance(count)
+        except BaseException:
+            # 出错或取消时不再等待剩余的批次（shutdown 的 cancel_futures 参数需要 Python 3.9）
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+            raise
+        executor.shutdown()
+        return total
@@ -1,17 +1,22 @@
-from PyPDF2 import PdfReader, PdfWriter
 import os
+from src.core.probe import PDFProbe
+from src.core.progress import ensure_progress
+from src.core.split_engine import SplitEngine
 
 class PDFSplitter:
     @staticmethod
-    def split_pdf(input_path, output_dir, page_groups, separate_files=False):
+    def split_pdf(input_path, output_dir, page_groups, separate_files=False, progress=None, workers=None):
         """
         从PDF文件中提取指定页面
         :param input_path: 输入PDF文件路径
         :param output_dir: 输出目录路径
         :param page_groups: 页面组列表，每组是一个页码列表 [[1,2,3], [5,6,7]]
         :param separate_files: 是否将每页保存为单独的文件
+        :param progress: Progress，每写出一个文件报告一次并支持取消
+        :param workers: 并行写出文件的进程数，None表示使用CPU核心数
         :return: (bool, str) - (是否成功, 错误信息)
         """
+        progress = ensure_progress(progress)
         try:
             if not os.path.exists(input_path):
                 return False, "输入文件不存在"
@@ -19,37 +24,34 @@ class PDFSplitter:
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir)
                 
-            reader = PdfReader(input_path)
+            # 页数只读取页面树根节点（并被缓存），源文件只在分割引擎中解析一次
+            success, max_page = PDFProbe.get_page_count(input_path)
+            if not success:
+                return False, f"页面提取失败: {max_page}"
             base_name = os.path.splitext(os.path.basename(input_path))[0]
             
             # 检查页码是否有效
-            max_page = len(reader.pages)
             for group in page_groups:
                 for page_num in group:
                     if page_num < 1 or page_num > max_page:
                         return False, f"页码 {page_num} 超出范围 (1-{max_page})"
             
+            outputs = []
             if separate_files:
                 # 每页保存为单独的文件
                 for group in page_groups:
                     for page_num in group:
-                        writer = PdfWriter()
-                        writer.add_page(reader.pages[page_num - 1])
                         output_path = os.path.join(output_dir, f"{base_name}_第{page_num}页.pdf")
-                        with open(output_path, 'wb') as output_file:
-                            writer.write(output_file)
+                        outputs.append((output_path, [page_num - 1]))
             else:
-                # 每组页面保存为一个文件
-                for i, group in enumerate(page_groups):
-                    writer = PdfWriter()
-                    for page_num in group:
-                        writer.add_page(reader.pages[page_num - 1])
-                    # 生成描述性文件名
+                # 每组页面保存为一个文件，生成描述性文件名
+                for group in page_groups:
                     page_range = f"{min(group)}-{max(group)}"
                     output_path = os.path.join(output_dir, f"{base_name}_第{page_range}页.pdf")
-                    with open(output_path, 'wb') as output_file:
-                        writer.write(output_file)
+                    outputs.append((output_path, [page_num - 1 for page_num in group]))
             
+            # 源文件只打开一次，所有输出文件由分割引擎写出
+            SplitEngine(workers).split(input_path, outputs, progress)
             return True, "页面提取成功"
             
         except Exception as e:
@@ -58,7 +60,7 @@ class PDFSplitter:
     @staticmethod
     def get_pdf_page_count(pdf_path):
         """
-        获取PDF文件的总页数
+        获取PDF文件的总页数，只读取页面树根节点，不解析整个文件
         :param pdf_path: PDF文件路径
         :return: (bool, int|str) - (是否成功, 页数|错误信息)
         """
@@ -66,8 +68,10 @@ class PDFSplitter:
             if not os.path.exists(pdf_path):
                 return False, "文件不存在"
                 
-            reader = PdfReader(pdf_path)
-            return True, len(reader.pages)
+            success, result = PDFProbe.get_page_count(pdf_path)
+            if not success:
+                return False, f"获取页数失败: {result}"
+            return True, result
             
         except Exception as e:
             return False, f"获取页数失败: {str(e)}" 
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""后台任务
+
+界面中的所有耗时操作都包装为 Job 交给 JobScheduler 在线程池中执行，
+通过信号报告进度和结果，界面线程不会被阻塞，并且可以随时取消。
+"""
+import os
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtWidgets import QMessageBox, QProgressDialog
+
+from src.core.progress import CancelToken, OperationCancelled, Progress
+
+
+class JobSignals(QObject):
+    """任务信号，在界面线程中接收"""
+    # (阶段名称, 已完成数量, 总数量)
+    progress = pyqtSignal(str, int, int)
+    # 任务函数的返回值
+    finished = pyqtSignal(object)
+    # 错误信息
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Job(QRunnable):
+    """
+    一个后台任务。任务函数接收 Progress 对象作为唯一参数，
+    在页面循环中调用 progress.start/advance 报告进度，取消时由 Progress 抛出 OperationCancelled
+    """
+
+    def __init__(self, fn, name=''):
+        """
+        :param fn: 任务函数 fn(progress)，返回值通过 finished 信号发出
+        :param name: 任务名称
+        """
+        super().__init__()
+        # 由 JobScheduler 持有引用，避免运行中被回收
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.name = name
+        self.token = CancelToken()
+        self.signals = JobSignals()
+        self.progress = Progress(self._report, self.token)
+        self._last_report = None
+
+    def _report(self, progress):
+        # 只在阶段或百分比变化时发送信号，逐页报告时避免信号堆积
+        if progress.total:
+            step = progress.done * 100 // progress.total
+        else:
+            step = progress.done
+        report = (progress.phase, step)
+        if report == self._last_report:
+            return
+        self._last_report = report
+        self.signals.progress.emit(progress.phase, progress.done, progress.total)
+
+    def cancel(self):
+        """请求取消任务，任务会在下一次报告进度时停止"""
+        self.token.cancel()
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def run(self):
+        try:
+            self.token.check()
+            result = self.fn(self.progress)
+        except OperationCancelled:
+            self.signals.cancelled.emit()
+            return
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        # 核心方法会捕获异常并返回 (False, 错误信息)，此时以取消标记为准
+        if self.token.cancelled:
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(result)
+
+
+class JobScheduler(QObject):
+    """任务调度器，管理线程池和正在运行的任务"""
+    # 活动任务数变化
+    activeChanged = pyqtSignal(int)
+
+    def __init__(self, max_threads=None, parent=None):
+        """
+        :param max_threads: 同时运行的任务数，默认为CPU核心数（最多4个）
+        :param parent: 父对象
+        """
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads or min(4, os.cpu_count() or 1))
+        self._jobs = []
+
+    def submit(self, job):
+        """
+        提交任务
+        :param job: Job
+        :return: Job
+        """
+        self._jobs.append(job)
+        for signal in (job.signals.finished, job.signals.failed, job.signals.cancelled):
+            signal.connect(lambda *args, job=job: self._on_done(job))
+        self._pool.start(job)
+        self.activeChanged.emit(len(self._jobs))
+        return job
+
+    def _on_done(self, job):
+        if job in self._jobs:
+            self._jobs.remove(job)
+            self.activeChanged.emit(len(self._jobs))
+
+    @property
+    def active_jobs(self):
+        """尚未结束的任务"""
+        return list(self._jobs)
+
+    def cancel_all(self):
+        """取消所有任务，尚未开始的任务直接从队列中移除"""
+        for job in list(self._jobs):
+            job.cancel()
+            if self._pool.tryTake(job):
+                job.signals.cancelled.emit()
+
+    def shutdown(self):
+        """取消所有任务并等待正在运行的任务结束"""
+        self.cancel_all()
+        self._pool.waitForDone()
+
+
+_default_scheduler = None
+
+
+def default_scheduler():
+    """
+    获取全局共享的任务调度器，主窗口和各个功能控件共用同一个线程池
+    :return: JobScheduler
+    """
+    global _default_scheduler
+    if _default_scheduler is None:
+        _default_scheduler = JobScheduler()
+    return _default_scheduler
+
+
+def run_with_dialog(parent, fn, label, on_success=None, scheduler=None):
+    """
+    在后台执行返回 (bool, str) 的操作，期间显示带取消按钮的进度对话框，
+    完成后弹出结果提示。供没有进度条的功能控件使用
+    :param parent: 父控件
+    :param fn: 任务函数 fn(progress)，返回 (是否成功, 消息)
+    :param label: 对话框中显示的文字
+    :param on_success: 成功后的额外处理 on_success(message)
+    :param scheduler: JobScheduler，默认为全局调度器
+    :return: Job
+    """
+    dialog = QProgressDialog(label, "取消", 0, 0, parent)
+    dialog.setWindowTitle("请稍候")
+    dialog.setWindowModality(Qt.WindowModality.WindowModal)
+    # 很快完成的操作不显示对话框
+    dialog.setMinimumDuration(500)
+    dialog.setAutoReset(False)
+    dialog.setAutoClose(False)
+
+    job = Job(fn, label)
+    dialog.canceled.connect(job.cancel)
+
+    def close_dialog():
+        # hide 不会触发 canceled 信号
+        dialog.hide()
+        dialog.deleteLater()
+
+    def on_progress(phase, done, total):
+        dialog.setLabelText(f"{label}\n{phase}" if phase else label)
+        dialog.setMaximum(total)
+        dialog.setValue(min(done, total) if total else 0)
+
+    def on_finished(result):
+        close_dialog()
+        success, message = result
+        if success:
+            QMessageBox.information(parent, "成功", message)
+            if on_success:
+                on_success(message)
+        else:
+            QMessageBox.critical(parent, "错误", message)
+
+    def on_failed(message):
+        close_dialog()
+        QMessageBox.critical(parent, "错误", message)
+
+    job.signals.progress.connect(on_progress)
+    job.signals.finished.connect(on_finished)
+    job.signals.failed.connect(on_failed)
+    job.signals.cancelled.connect(close_dialog)
+    return (scheduler or default_scheduler()).submit(job)
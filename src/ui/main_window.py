@@ -2,8 +2,9 @@ from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                                QPushButton, QLabel, QFileDialog, QMessageBox, QTabWidget,
                                QProgressBar, QSpacerItem, QSizePolicy, QLineEdit,
                                QDoubleSpinBox, QSpinBox, QGroupBox, QFormLayout, QComboBox, QDialog, QStackedWidget, QMenu, QCheckBox, QScrollArea, QApplication)
-from PyQt6.QtCore import Qt, QSize, QMimeData, QPoint
+from PyQt6.QtCore import Qt, QSize, QMimeData, QPoint, QTimer
 from PyQt6.QtGui import QIcon, QAction, QDrag, QPixmap, QImage
+from PyQt6 import sip
 import os
 import sys
 import io
@@ -18,6 +19,12 @@ if project_root not in sys.path:
 
 from src.core.editor import PDFEditor
 from src.core.metadata import PDFMetadata
+from src.ui.jobs import Job, default_scheduler
+from src.ui.thumbnail_service import ThumbnailService, visible_range
+
+# 缩略图按钮尺寸和布局间距，用于计算滚动区域中可见的页面
+THUMBNAIL_SIZE = (120, 160)
+THUMBNAIL_SPACING = 10
 
 class ThumbnailListWidget(QWidget):
     """缩略图列表控件"""
@@ -99,6 +106,11 @@ class DraggableThumbnailButton(QPushButton):
         self.setAcceptDrops(True)
         self.drag_start_position = None
 
+    def set_pixmap(self, pixmap):
+        """缩略图渲染完成后更新按钮图标"""
+        self.original_pixmap = pixmap
+        self.setIcon(QIcon(pixmap))
+
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             self.drag_start_position = event.pos()
@@ -186,7 +198,99 @@ class DraggableThumbnailButton(QPushButton):
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        # 分割和排序页面各用一个缩略图服务，切换文件时互不影响
+        self.split_thumbnail_service = ThumbnailService(THUMBNAIL_SIZE, parent=self)
+        self.split_thumbnail_service.thumbnailReady.connect(self.on_split_thumbnail_ready)
+        self.reorder_thumbnail_service = ThumbnailService(THUMBNAIL_SIZE, parent=self)
+        self.reorder_thumbnail_service.thumbnailReady.connect(self.on_reorder_thumbnail_ready)
+        for service in (self.split_thumbnail_service, self.reorder_thumbnail_service):
+            service.failed.connect(lambda pdf_path, message: self.statusBar().showMessage(f'生成缩略图失败：{message}'))
+        self.thumbnail_buttons = []
+        # 所有耗时操作都在后台线程池中执行
+        self.job_scheduler = default_scheduler()
         self.initUI()
+
+    def closeEvent(self, event):
+        """关闭窗口前取消后台任务并停止缩略图渲染"""
+        self.job_scheduler.shutdown()
+        self.split_thumbnail_service.shutdown()
+        self.reorder_thumbnail_service.shutdown()
+        super().closeEvent(event)
+    
+    def run_job(self, fn, progress_bar, running_message, success_message, failure_message, on_success=None):
+        """
+        在后台执行操作，期间显示进度，可以通过状态栏的取消按钮中止
+        :param fn: 任务函数 fn(progress)，返回 (是否成功, 消息)
+        :param progress_bar: 显示进度的进度条
+        :param running_message: 执行期间的状态栏消息
+        :param success_message: 成功后的状态栏消息
+        :param failure_message: 失败后的状态栏消息
+        :param on_success: 成功后的回调 on_success(message)，默认弹出提示框
+        :return: Job
+        """
+        job = Job(fn, running_message)
+        job.signals.progress.connect(
+            lambda phase, done, total: self.on_job_progress(progress_bar, running_message, phase, done, total))
+        job.signals.finished.connect(
+            lambda result: self.on_job_finished(progress_bar, result, success_message, failure_message, on_success))
+        job.signals.failed.connect(lambda message: self.on_job_failed(progress_bar, message))
+        job.signals.cancelled.connect(lambda: self.on_job_cancelled(progress_bar))
+        
+        # 进度未知前显示忙碌状态
+        progress_bar.setRange(0, 0)
+        progress_bar.setVisible(True)
+        self.statusBar().showMessage(running_message)
+        return self.job_scheduler.submit(job)
+    
+    def on_job_progress(self, progress_bar, running_message, phase, done, total):
+        """后台任务报告进度"""
+        if not sip.isdeleted(progress_bar):
+            if total:
+                progress_bar.setRange(0, 100)
+                progress_bar.setValue(done * 100 // total)
+            else:
+                progress_bar.setRange(0, 0)
+        detail = f'{phase} {done}/{total}' if total else phase
+        self.statusBar().showMessage(f'{running_message} {detail}' if detail else running_message)
+    
+    def hide_job_progress(self, progress_bar):
+        """隐藏任务的进度条，切换页面后进度条可能已被删除"""
+        if not sip.isdeleted(progress_bar):
+            progress_bar.setRange(0, 100)
+            progress_bar.setVisible(False)
+    
+    def on_job_finished(self, progress_bar, result, success_message, failure_message, on_success=None):
+        """后台任务完成"""
+        self.hide_job_progress(progress_bar)
+        success, message = result
+        if success:
+            try:
+                if on_success:
+                    on_success(message)
+                else:
+                    QMessageBox.information(self, '成功', message)
+            except RuntimeError:
+                # 任务执行期间切换了页面，相关控件已被删除
+                pass
+            self.statusBar().showMessage(success_message)
+        else:
+            QMessageBox.warning(self, '失败', message)
+            self.statusBar().showMessage(failure_message)
+    
+    def on_job_failed(self, progress_bar, message):
+        """后台任务抛出异常"""
+        self.hide_job_progress(progress_bar)
+        QMessageBox.critical(self, '错误', f'发生错误：{message}')
+        self.statusBar().showMessage('发生错误')
+    
+    def on_job_cancelled(self, progress_bar):
+        """后台任务已取消"""
+        self.hide_job_progress(progress_bar)
+        self.statusBar().showMessage('操作已取消')
+    
+    def on_active_jobs_changed(self, count):
+        """有任务运行时显示取消按钮"""
+        self.cancel_job_button.setVisible(count > 0)
         
     def initUI(self):
         """初始化用户界面"""
@@ -236,6 +340,13 @@ class MainWindow(QMainWindow):
         # 创建状态栏
         self.statusBar().showMessage('就绪')
         
+        # 取消按钮，有后台任务运行时显示
+        self.cancel_job_button = QPushButton('取消')
+        self.cancel_job_button.setVisible(False)
+        self.cancel_job_button.clicked.connect(self.job_scheduler.cancel_all)
+        self.statusBar().addPermanentWidget(self.cancel_job_button)
+        self.job_scheduler.activeChanged.connect(self.on_active_jobs_changed)
+        
     def show_function_widget(self, widget):
         """显示功能界面"""
         # 清除当前显示的widget
@@ -433,7 +544,7 @@ class MainWindow(QMainWindow):
         self.enhanced_settings.setVisible(index == 1)  # 1 表示增强模式
         
     def add_watermark(self):
-        """���加水印"""
+        """添加水印"""
         # 检查输入
         if self.watermark_input_path.text() == '未选择文件':
             QMessageBox.warning(self, '警告', '请先选择输入PDF文件')
@@ -447,39 +558,16 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, '警告', '请输入水印文字！')
             return
         
-        try:
-            # 显示进度条
-            self.watermark_progress.setVisible(True)
-            self.watermark_progress.setValue(0)
-            self.statusBar().showMessage('正在添加水印...')
-            
-            # 添加水印
-            success, message = PDFEditor.add_watermark(
-                self.watermark_input_path.text(),
-                self.watermark_output_path.text(),
-                self.watermark_text.text(),
-                self.watermark_opacity.value(),
-                self.watermark_angle.value()
-            )
-            
-            # 更新进度条
-            self.watermark_progress.setValue(100)
-            
-            # 显示结果
-            if success:
-                QMessageBox.information(self, '成功', message)
-                self.statusBar().showMessage('添加水印成功')
-            else:
-                QMessageBox.warning(self, '失败', message)
-                self.statusBar().showMessage('添加水印失败')
-            
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'发生错误：{str(e)}')
-            self.statusBar().showMessage('发生错误')
-        
-        finally:
-            # 隐藏进度条
-            self.watermark_progress.setVisible(False)
+        # 在后台添加水印
+        input_path = self.watermark_input_path.text()
+        output_path = self.watermark_output_path.text()
+        text = self.watermark_text.text()
+        opacity = self.watermark_opacity.value()
+        angle = self.watermark_angle.value()
+        self.run_job(
+            lambda progress: PDFEditor.add_watermark(input_path, output_path, text, opacity, angle, progress=progress),
+            self.watermark_progress, '正在添加水印...', '添加水印成功', '添加水印失败'
+        )
     
     def remove_watermark(self):
         """移除水印"""
@@ -492,49 +580,22 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, '警告', '请选择输出文件位置！')
             return
         
-        try:
-            # 显示进度条
-            self.watermark_progress.setVisible(True)
-            self.watermark_progress.setValue(0)
-            self.statusBar().showMessage('正在移除水印...')
-            
-            # 根据模式选择移除方法
-            if self.remove_mode.currentIndex() == 0:  # 标准模式
-                success, message = PDFEditor.remove_watermark(
-                    self.watermark_input_path.text(),
-                    self.watermark_output_path.text()
-                )
-            else:  # 增强模式
-                settings = {
-                    'process_transparent': self.process_transparent.isChecked(),
-                    'process_layers': self.process_layers.isChecked(),
-                    'process_annotations': self.process_annotations.isChecked(),
-                    'process_metadata': self.process_metadata.isChecked()
-                }
-                success, message = PDFEditor.remove_watermark_enhanced(
-                    self.watermark_input_path.text(),
-                    self.watermark_output_path.text(),
-                    settings
-                )
-            
-            # 更新进度条
-            self.watermark_progress.setValue(100)
-            
-            # 显示结果
-            if success:
-                QMessageBox.information(self, '成功', message)
-                self.statusBar().showMessage('移除水印成功')
-            else:
-                QMessageBox.warning(self, '失败', message)
-                self.statusBar().showMessage('移除水印失败')
-            
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'发生错误：{str(e)}')
-            self.statusBar().showMessage('发生错误')
+        input_path = self.watermark_input_path.text()
+        output_path = self.watermark_output_path.text()
+        
+        # 根据模式选择移除方法
+        if self.remove_mode.currentIndex() == 0:  # 标准模式
+            task = lambda progress: PDFEditor.remove_watermark(input_path, output_path, progress=progress)
+        else:  # 增强模式
+            settings = {
+                'process_transparent': self.process_transparent.isChecked(),
+                'process_layers': self.process_layers.isChecked(),
+                'process_annotations': self.process_annotations.isChecked(),
+                'process_metadata': self.process_metadata.isChecked()
+            }
+            task = lambda progress: PDFEditor.remove_watermark_enhanced(input_path, output_path, settings)
         
-        finally:
-            # 隐藏进度条
-            self.watermark_progress.setVisible(False)
+        self.run_job(task, self.watermark_progress, '正在移除水印...', '移除水印成功', '移除水印失败')
     
     def compress_pdf(self):
         """压缩PDF"""
@@ -547,42 +608,18 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, '警告', '请选择输出文件位置！')
             return
         
-        try:
-            # 显示进度条
-            self.compress_progress.setVisible(True)
-            self.compress_progress.setValue(0)
-            self.statusBar().showMessage('正在压缩...')
-            
-            # 获取压缩质量设置
-            quality_map = {1: 'low', 2: 'medium', 3: 'high'}
-            quality = quality_map[self.compress_quality.value()]
-            
-            # 压缩PDF
-            success, message = PDFEditor.compress_pdf(
-                self.compress_input_path.text(),
-                self.compress_output_path.text(),
-                quality=quality,
-                image_dpi=self.compress_dpi.value()
-            )
-            
-            # 更新进度条
-            self.compress_progress.setValue(100)
-            
-            # 显示结果
-            if success:
-                QMessageBox.information(self, '成功', message)
-                self.statusBar().showMessage('压缩成功')
-            else:
-                QMessageBox.warning(self, '失败', message)
-                self.statusBar().showMessage('压缩失败')
-            
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'发生错误：{str(e)}')
-            self.statusBar().showMessage('发生错误')
-        
-        finally:
-            # 隐藏进度条
-            self.compress_progress.setVisible(False)
+        # 获取压缩质量设置
+        quality_map = {1: 'low', 2: 'medium', 3: 'high'}
+        quality = quality_map[self.compress_quality.value()]
+        
+        input_path = self.compress_input_path.text()
+        output_path = self.compress_output_path.text()
+        image_dpi = self.compress_dpi.value()
+        self.run_job(
+            lambda progress: PDFEditor.compress_pdf(input_path, output_path, quality=quality, image_dpi=image_dpi,
+                                                    progress=progress),
+            self.compress_progress, '正在压缩...', '压缩成功', '压缩失败'
+        )
     
     def select_directory(self, label):
         """选择目录"""
@@ -623,44 +660,16 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, '警告', '请选择输出目录！')
             return
         
-        try:
-            # 显示进度条
-            self.convert_progress.setVisible(True)
-            self.convert_progress.setValue(0)
-            self.statusBar().showMessage('正在转换...')
-            
-            # 获取转换参数
-            input_path = self.convert_pdf_input.text()
-            output_dir = self.convert_image_output.text()
-            image_format = self.image_format.currentText().lower()
-            dpi = self.convert_dpi.value()
-            
-            # 调用转换方法
-            success, message = PDFEditor.pdf_to_images(
-                input_path,
-                output_dir,
-                image_format,
-                dpi
-            )
-            
-            # 更新进度条
-            self.convert_progress.setValue(100)
-            
-            # 显示结果
-            if success:
-                QMessageBox.information(self, '成功', message)
-                self.statusBar().showMessage('转换成功')
-            else:
-                QMessageBox.warning(self, '失败', message)
-                self.statusBar().showMessage('转换失败')
-            
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'发生错误：{str(e)}')
-            self.statusBar().showMessage('发生错误')
+        # 获取转换参数
+        input_path = self.convert_pdf_input.text()
+        output_dir = self.convert_image_output.text()
+        image_format = self.image_format.currentText().lower()
+        dpi = self.convert_dpi.value()
         
-        finally:
-            # 隐藏进度条
-            self.convert_progress.setVisible(False)
+        self.run_job(
+            lambda progress: PDFEditor.pdf_to_images(input_path, output_dir, image_format, dpi, progress=progress),
+            self.convert_progress, '正在转换...', '转换成功', '转换失败'
+        )
     
     def convert_images_to_pdf(self):
         """将图片转换为PDF"""
@@ -673,44 +682,16 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, '警告', '请选择输出PDF文件位置！')
             return
         
-        try:
-            # 显示进度条
-            self.convert_progress.setVisible(True)
-            self.convert_progress.setValue(0)
-            self.statusBar().showMessage('正在转换...')
-            
-            # 获取转换参数
-            input_paths = self.selected_image_files
-            output_path = self.convert_pdf_output.text()
-            page_size = self.page_size.currentText()
-            margin = self.page_margin.value()
-            
-            # 调用转换方法
-            success, message = PDFEditor.images_to_pdf(
-                input_paths,
-                output_path,
-                page_size,
-                margin
-            )
-            
-            # 更新进度条
-            self.convert_progress.setValue(100)
-            
-            # 显示结果
-            if success:
-                QMessageBox.information(self, '成功', message)
-                self.statusBar().showMessage('转换成功')
-            else:
-                QMessageBox.warning(self, '失败', message)
-                self.statusBar().showMessage('转换失败')
-            
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'发生错误：{str(e)}')
-            self.statusBar().showMessage('发生错误')
+        # 获取转换参数
+        input_paths = list(self.selected_image_files)
+        output_path = self.convert_pdf_output.text()
+        page_size = self.page_size.currentText()
+        margin = self.page_margin.value()
         
-        finally:
-            # 隐藏进度条
-            self.convert_progress.setVisible(False)
+        self.run_job(
+            lambda progress: PDFEditor.images_to_pdf(input_paths, output_path, page_size, margin, progress=progress),
+            self.convert_progress, '正在转换...', '转换成功', '转换失败'
+        )
     
     def on_split_mode_changed(self, index):
         """分割模式改变时的处理"""
@@ -757,11 +738,6 @@ class MainWindow(QMainWindow):
             return
         
         try:
-            # 显示进度条
-            self.split_progress.setVisible(True)
-            self.split_progress.setValue(0)
-            self.statusBar().showMessage('正在分割...')
-            
             # 获取分割参数
             input_path = self.split_input_path.text()
             output_dir = self.split_output_dir.text()
@@ -823,31 +799,16 @@ class MainWindow(QMainWindow):
                     if remaining_pages:
                         page_groups.append(','.join(map(str, remaining_pages)))
             
-            # 调用分割方法
-            success, message = PDFEditor.split_pdf(
-                input_path,
-                output_dir,
-                page_groups
-            )
-            
-            # 更新进度条
-            self.split_progress.setValue(100)
-            
-            # 显示结果
-            if success:
-                QMessageBox.information(self, '成功', message)
-                self.statusBar().showMessage('分割成功')
-            else:
-                QMessageBox.warning(self, '失败', message)
-                self.statusBar().showMessage('分割失败')
-            
         except Exception as e:
             QMessageBox.critical(self, '错误', f'发生错误：{str(e)}')
             self.statusBar().showMessage('发生错误')
+            return
         
-        finally:
-            # 隐藏进度条
-            self.split_progress.setVisible(False)
+        # 在后台分割
+        self.run_job(
+            lambda progress: PDFEditor.split_pdf(input_path, output_dir, page_groups, progress=progress),
+            self.split_progress, '正在分割...', '分割成功', '分割失败'
+        )
     
     def parse_page_ranges(self, page_ranges_str):
         """解析页面范围字符串，返回页码列表"""
@@ -873,36 +834,12 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, '警告', '请选择输出文件位置！')
             return
         
-        try:
-            # 显示进度条
-            self.merge_progress.setVisible(True)
-            self.merge_progress.setValue(0)
-            self.statusBar().showMessage('正在合并...')
-            
-            # 调用合并方法
-            success, message = PDFEditor.merge_pdfs(
-                self.selected_pdf_files,
-                self.merge_output_path.text()
-            )
-            
-            # 更新进度条
-            self.merge_progress.setValue(100)
-            
-            # 显示结果
-            if success:
-                QMessageBox.information(self, '成功', message)
-                self.statusBar().showMessage('合并成功')
-            else:
-                QMessageBox.warning(self, '失败', message)
-                self.statusBar().showMessage('合并失败')
-            
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'发生错误：{str(e)}')
-            self.statusBar().showMessage('发生错误')
-        
-        finally:
-            # 隐藏进度条
-            self.merge_progress.setVisible(False)
+        input_paths = list(self.selected_pdf_files)
+        output_path = self.merge_output_path.text()
+        self.run_job(
+            lambda progress: PDFEditor.merge_pdfs(input_paths, output_path, progress=progress),
+            self.merge_progress, '正在合并...', '合并成功', '合并失败'
+        )
     
     def on_reorder_file_selected(self):
         """当选择了要重排序的PDF文件时"""
@@ -914,49 +851,74 @@ class MainWindow(QMainWindow):
             self.load_reorder_thumbnails(self.reorder_input_path.text())
     
     def load_reorder_thumbnails(self, pdf_path):
-        """加载用于重排序的PDF缩略图"""
+        """加载用于重排序的PDF缩略图，先创建占位按钮，可见页面的缩略图在后台渲染"""
         try:
             # 清除现有缩略图
             for button in self.reorder_thumbnails.thumbnails:
                 button.deleteLater()
             self.reorder_thumbnails.thumbnails.clear()
+            self.clear_layout(self.reorder_thumbnails.layout)
             
-            # 使用pdf2image生成缩略图
-            from pdf2image import convert_from_path
-            try:
-                images = convert_from_path(
-                    pdf_path,
-                    dpi=72,
-                    size=(120, 160),
-                    poppler_path=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'poppler', 'bin'),
-                    userpw=None
-                )
-            except Exception as e:
-                if "Command Line Error: Incorrect password" in str(e):
-                    QMessageBox.warning(self, '警告', 'PDF文件受密码保护，无法显示预览')
-                    return
-                else:
-                    raise e
+            success, page_count = self.reorder_thumbnail_service.set_document(pdf_path)
+            if not success:
+                QMessageBox.warning(self, '警告', page_count)
+                return
             
-            # 创建缩略图按钮
-            for i, image in enumerate(images):
-                # 将PIL图像转换为QPixmap
-                img_byte_array = io.BytesIO()
-                image.save(img_byte_array, format='PNG', quality=85, optimize=True)
-                qimg = QImage.fromData(img_byte_array.getvalue())
-                pixmap = QPixmap.fromImage(qimg)
-                
-                # 创建可拖动的缩略图按钮
-                thumb_btn = DraggableThumbnailButton(pixmap, i+1, self.reorder_thumbnails)
+            # 创建可拖动的缩略图按钮
+            for i in range(page_count):
+                thumb_btn = DraggableThumbnailButton(QPixmap(), i+1, self.reorder_thumbnails)
                 self.reorder_thumbnails.layout.addWidget(thumb_btn)
                 self.reorder_thumbnails.thumbnails.append(thumb_btn)
             
             # 添加弹性空间
             self.reorder_thumbnails.layout.addStretch()
             
+            # 等布局完成后再计算可见页面
+            QTimer.singleShot(0, self.request_reorder_thumbnails)
+            
         except Exception as e:
             QMessageBox.warning(self, '警告', f'加载缩略图失败：{str(e)}')
     
+    def request_reorder_thumbnails(self, *args):
+        """请求排序页面中可见缩略图"""
+        # 按钮可能已被拖动，按布局中的顺序取原始页码
+        pages = []
+        for i in range(self.reorder_thumbnails.layout.count()):
+            widget = self.reorder_thumbnails.layout.itemAt(i).widget()
+            if isinstance(widget, DraggableThumbnailButton):
+                pages.append(widget.original_page_num)
+        self.request_visible_thumbnails(self.reorder_thumbnail_service, self.reorder_thumbnails_scroll, pages)
+    
+    def on_reorder_thumbnail_ready(self, pdf_path, page, image):
+        """排序页面的缩略图渲染完成"""
+        # thumbnails 按原始页码顺序保存，拖动只改变布局中的顺序
+        if 0 < page <= len(self.reorder_thumbnails.thumbnails):
+            self.reorder_thumbnails.thumbnails[page - 1].set_pixmap(QPixmap.fromImage(image))
+    
+    def request_visible_thumbnails(self, service, scroll, pages):
+        """
+        请求滚动区域中可见（以及下一屏）的缩略图
+        :param service: ThumbnailService
+        :param scroll: 缩略图所在的QScrollArea
+        :param pages: 按显示顺序排列的页码列表
+        """
+        indexes = visible_range(
+            scroll.horizontalScrollBar().value(),
+            scroll.viewport().width(),
+            len(pages),
+            THUMBNAIL_SIZE[0] + THUMBNAIL_SPACING
+        )
+        service.request([pages[i] for i in indexes])
+    
+    @staticmethod
+    def clear_layout(layout):
+        """移除布局中的所有控件和弹性空间"""
+        while layout.count():
+            item = layout.takeAt(0)
+            widget = item.widget()
+            if widget:
+                widget.setParent(None)
+    
     def handle_page_reorder(self, source_page, target_page):
         """处理页面重新排序"""
         # 获取源按钮和目标按钮
@@ -1006,48 +968,26 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, '警告', '请先选择输出PDF文件！')
             return
         
-        try:
-            # 显示进度条
-            self.reorder_progress.setVisible(True)
-            self.reorder_progress.setValue(0)
-            self.statusBar().showMessage('正在重排序...')
-            
-            # 获取新的页面顺序
-            page_order = []
-            for i in range(self.reorder_thumbnails.layout.count()):
-                widget = self.reorder_thumbnails.layout.itemAt(i).widget()
-                if isinstance(widget, DraggableThumbnailButton):
-                    # 使用original_page_num而不是page_num
-                    page_order.append(str(widget.original_page_num))
-            
-            if not page_order:
-                raise Exception("无法获取页面顺序")
-            
-            # 调用重排序方法
-            success, message = PDFEditor.reorder_pages(
-                self.reorder_input_path.text(),
-                self.reorder_output_path.text(),
-                ','.join(page_order)
-            )
-            
-            # 更新进度条
-            self.reorder_progress.setValue(100)
-            
-            # 显示结果
-            if success:
-                QMessageBox.information(self, '成功', message)
-                self.statusBar().showMessage('重排序成功')
-            else:
-                QMessageBox.warning(self, '失败', message)
-                self.statusBar().showMessage('重排序失败')
-            
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'发生错误：{str(e)}')
+        # 获取新的页面顺序
+        page_order = []
+        for i in range(self.reorder_thumbnails.layout.count()):
+            widget = self.reorder_thumbnails.layout.itemAt(i).widget()
+            if isinstance(widget, DraggableThumbnailButton):
+                # 使用original_page_num而不是page_num
+                page_order.append(str(widget.original_page_num))
+        
+        if not page_order:
+            QMessageBox.critical(self, '错误', '发生错误：无法获取页面顺序')
             self.statusBar().showMessage('发生错误')
+            return
         
-        finally:
-            # 隐藏进度条
-            self.reorder_progress.setVisible(False)
+        input_path = self.reorder_input_path.text()
+        output_path = self.reorder_output_path.text()
+        self.run_job(
+            lambda progress: PDFEditor.reorder_pages(input_path, output_path, ','.join(page_order),
+                                                     progress=progress),
+            self.reorder_progress, '正在重排序...', '重排序成功', '重排序失败'
+        )
     
     def create_menu_bar(self):
         """创建菜单栏"""
@@ -1149,46 +1089,21 @@ class MainWindow(QMainWindow):
             self.load_pdf_thumbnails(self.split_input_path.text())
     
     def load_pdf_thumbnails(self, pdf_path):
-        """加载PDF文件的缩略图"""
+        """加载PDF文件的缩略图，先创建占位按钮，可见页面的缩略图在后台渲染"""
         try:
             # 清除现有缩略图
-            for i in reversed(range(self.thumbnails_layout.count())): 
-                widget = self.thumbnails_layout.itemAt(i).widget()
-                if widget:
-                    widget.setParent(None)
+            self.clear_layout(self.thumbnails_layout)
+            self.thumbnail_buttons = []
             
-            # 使用pdf2image生成缩略图
-            from pdf2image import convert_from_path
-            try:
-                # 使用较低的DPI生成缩略图以加快加载速度
-                images = convert_from_path(
-                    pdf_path,
-                    dpi=72,  # 使用较低的DPI加快加载速度
-                    size=(120, 160),  # 直接指定缩略图大小
-                    poppler_path=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'poppler', 'bin'),
-                    userpw=None  # 尝试空密码
-                )
-            except Exception as e:
-                if "Command Line Error: Incorrect password" in str(e):
-                    # 如果是密码错误，提示用户
-                    QMessageBox.warning(self, '警告', 'PDF文件���密码保护，无法显示预览')
-                    return
-                else:
-                    raise e
+            success, page_count = self.split_thumbnail_service.set_document(pdf_path)
+            if not success:
+                QMessageBox.warning(self, '警告', page_count)
+                return
             
             # 创建缩略图按钮
-            self.thumbnail_buttons = []  # 储所有缩略图按钮引用
-            for i, image in enumerate(images):
-                # 将PIL图像转换为QPixmap
-                img_byte_array = io.BytesIO()
-                image.save(img_byte_array, format='PNG', quality=85, optimize=True)
-                qimg = QImage.fromData(img_byte_array.getvalue())
-                pixmap = QPixmap.fromImage(qimg)
-                
-                # 创建缩略图按钮
+            for i in range(page_count):
                 thumb_btn = QPushButton()
-                thumb_btn.setFixedSize(120, 160)
-                thumb_btn.setIcon(QIcon(pixmap))
+                thumb_btn.setFixedSize(*THUMBNAIL_SIZE)
                 thumb_btn.setIconSize(QSize(100, 140))
                 thumb_btn.setToolTip(f"第 {i+1} 页")
                 thumb_btn.setCheckable(True)
@@ -1216,9 +1131,22 @@ class MainWindow(QMainWindow):
             # 添加弹性空间
             self.thumbnails_layout.addStretch()
             
+            # 等布局完成后再计算可见页面
+            QTimer.singleShot(0, self.request_split_thumbnails)
+            
         except Exception as e:
             QMessageBox.warning(self, '警告', f'加载缩略图失败：{str(e)}')
     
+    def request_split_thumbnails(self, *args):
+        """请求分割页面中可见缩略图"""
+        pages = list(range(1, len(self.thumbnail_buttons) + 1))
+        self.request_visible_thumbnails(self.split_thumbnail_service, self.split_thumbnails_scroll, pages)
+    
+    def on_split_thumbnail_ready(self, pdf_path, page, image):
+        """分割页面的缩略图渲染完成"""
+        if 0 < page <= len(self.thumbnail_buttons):
+            self.thumbnail_buttons[page - 1].setIcon(QIcon(QPixmap.fromImage(image)))
+    
     def on_thumbnail_clicked(self, page):
         """当缩略图被点击时"""
         mode = self.split_mode.currentIndex()
@@ -1599,6 +1527,10 @@ class MainWindow(QMainWindow):
         self.thumbnails_layout.setContentsMargins(10, 10, 10, 10)
         thumbnails_scroll.setWidget(self.thumbnails_widget)
         thumbnails_layout.addWidget(thumbnails_scroll)
+        # 滚动时按需加载可见页面的缩略图
+        self.split_thumbnails_scroll = thumbnails_scroll
+        self.thumbnail_buttons = []
+        thumbnails_scroll.horizontalScrollBar().valueChanged.connect(self.request_split_thumbnails)
         
         thumbnails_group.setLayout(thumbnails_layout)
         layout.addWidget(thumbnails_group)
@@ -1851,6 +1783,9 @@ class MainWindow(QMainWindow):
         self.reorder_thumbnails = ThumbnailListWidget()
         thumbnails_scroll.setWidget(self.reorder_thumbnails)
         thumbnails_layout.addWidget(thumbnails_scroll)
+        # 滚动时按需加载可见页面的缩略图
+        self.reorder_thumbnails_scroll = thumbnails_scroll
+        thumbnails_scroll.horizontalScrollBar().valueChanged.connect(self.request_reorder_thumbnails)
         
         thumbnails_group.setLayout(thumbnails_layout)
         layout.addWidget(thumbnails_group)
@@ -2193,9 +2128,15 @@ class MainWindow(QMainWindow):
         
         # 页码位置
         self.page_position = QComboBox()
-        self.page_position.addItems(["底部", "顶部"])
+        self.page_position.addItems(["底部", "顶部", "底部左侧", "底部右侧", "顶部左侧", "顶部右侧"])
         settings_layout.addRow("页码位置：", self.page_position)
         
+        # 页码格式
+        self.page_number_format = QComboBox()
+        self.page_number_format.setEditable(True)
+        self.page_number_format.addItems(["{page}", "第 {page} 页", "{page} / {total}", "- {page} -"])
+        settings_layout.addRow("页码格式：", self.page_number_format)
+        
         settings_group.setLayout(settings_layout)
         layout.addWidget(settings_group)
         
@@ -2227,50 +2168,31 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, '警告', '请至少设置一个密码！')
             return
         
-        try:
-            # 显示进度条
-            self.encrypt_progress.setVisible(True)
-            self.encrypt_progress.setValue(0)
-            self.statusBar().showMessage('正在加密...')
-            
-            # 获取权限设置
-            permissions = {
-                'print': self.allow_print.isChecked(),
-                'modify': self.allow_modify.isChecked(),
-                'copy': self.allow_copy.isChecked(),
-                'annotate': self.allow_annotate.isChecked()
-            }
-            
-            # 调用加密方法
-            success, message = PDFMetadata.add_encryption(
-                self.encrypt_input_path.text(),
-                self.encrypt_output_path.text(),
-                self.user_password.text(),
-                self.owner_password.text(),
-                permissions
-            )
-            
-            # 更新进度条
-            self.encrypt_progress.setValue(100)
-            
-            # 显示结果
-            if success:
-                QMessageBox.information(self, '成功', message)
-                self.statusBar().showMessage('加密成功')
-                # 清空密码输入框
-                self.user_password.clear()
-                self.owner_password.clear()
-            else:
-                QMessageBox.warning(self, '失败', message)
-                self.statusBar().showMessage('加密失败')
-            
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'发生错误：{str(e)}')
-            self.statusBar().showMessage('发生错误')
-        
-        finally:
-            # 隐藏进度条
-            self.encrypt_progress.setVisible(False)
+        # 获取权限设置
+        permissions = {
+            'print': self.allow_print.isChecked(),
+            'modify': self.allow_modify.isChecked(),
+            'copy': self.allow_copy.isChecked(),
+            'annotate': self.allow_annotate.isChecked()
+        }
+        
+        input_path = self.encrypt_input_path.text()
+        output_path = self.encrypt_output_path.text()
+        user_password = self.user_password.text()
+        owner_password = self.owner_password.text()
+        
+        def on_success(message):
+            QMessageBox.information(self, '成功', message)
+            # 清空密码输入框
+            self.user_password.clear()
+            self.owner_password.clear()
+        
+        self.run_job(
+            lambda progress: PDFMetadata.add_encryption(
+                input_path, output_path, user_password, owner_password, permissions, progress=progress
+            ),
+            self.encrypt_progress, '正在加密...', '加密成功', '加密失败', on_success
+        )
     
     def decrypt_pdf(self):
         """解密PDF文件"""
@@ -2282,49 +2204,29 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, '警告', '请选择输出文件位置！')
             return
         
-        try:
-            # 显示进度条
-            self.decrypt_progress.setVisible(True)
-            self.decrypt_progress.setValue(0)
-            self.statusBar().showMessage('正在处理...')
-            
-            if self.try_crack.isChecked():
+        input_path = self.decrypt_input_path.text()
+        output_path = self.decrypt_output_path.text()
+        try_crack = self.try_crack.isChecked()
+        
+        def task(progress):
+            cracked = ''
+            if try_crack:
                 # 尝试破解密码
-                self.statusBar().showMessage('正在尝试破解密码...')
-                success, result = PDFMetadata.crack_password(self.decrypt_input_path.text())
-                if success:
-                    self.decrypt_password.setText(result)
-                    QMessageBox.information(self, '成功', f'密码破解成功：{result}')
-                else:
-                    QMessageBox.warning(self, '失败', result)
-                    return
+                success, result = PDFMetadata.crack_password(input_path, progress=progress)
+                if not success:
+                    return False, result
+                cracked = f'密码破解成功：{result}\n'
             
             # 提取PDF内容
-            success, message = PDFMetadata.extract_content(
-                self.decrypt_input_path.text(),
-                self.decrypt_output_path.text()
-            )
-            
-            # 更新进度条
-            self.decrypt_progress.setValue(100)
-            
-            # 显示结果
-            if success:
-                QMessageBox.information(self, '成功', message)
-                self.statusBar().showMessage('解密成功')
-                # 清空密码输入框
-                self.decrypt_password.clear()
-            else:
-                QMessageBox.warning(self, '失败', message)
-                self.statusBar().showMessage('解密失败')
-            
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'发生错误：{str(e)}')
-            self.statusBar().showMessage('发生错误')
+            success, message = PDFMetadata.extract_content(input_path, output_path, progress=progress)
+            return success, cracked + message
+        
+        def on_success(message):
+            QMessageBox.information(self, '成功', message)
+            # 清空密码输入框
+            self.decrypt_password.clear()
         
-        finally:
-            # 隐藏进度条
-            self.decrypt_progress.setVisible(False)
+        self.run_job(task, self.decrypt_progress, '正在处理...', '解密成功', '解密失败', on_success)
     
     def add_page_numbers(self):
         """添加页码"""
@@ -2336,38 +2238,22 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, '警告', '请选择输出文件位置！')
             return
         
-        try:
-            # 显示进度条
-            self.page_numbers_progress.setVisible(True)
-            self.page_numbers_progress.setValue(0)
-            self.statusBar().showMessage('正在添加页码...')
-            
-            # 获取页码位置
-            position = 'bottom' if self.page_position.currentText() == '底部' else 'top'
-            
-            # 调用添加页码方法
-            success, message = PDFEditor.add_page_numbers(
-                self.page_numbers_input_path.text(),
-                self.page_numbers_output_path.text(),
-                self.start_number.value(),
-                position
-            )
-            
-            # 更新进度条
-            self.page_numbers_progress.setValue(100)
-            
-            # 显示结果
-            if success:
-                QMessageBox.information(self, '成功', message)
-                self.statusBar().showMessage('页码添加成功')
-            else:
-                QMessageBox.warning(self, '失败', message)
-                self.statusBar().showMessage('页码添加失败')
-            
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'发生错误：{str(e)}')
-            self.statusBar().showMessage('发生错误')
-        
-        finally:
-            # 隐藏进度条
-            self.page_numbers_progress.setVisible(False)
\ No newline at end of file
+        # 获取页码位置
+        positions = {
+            '底部': 'bottom', '顶部': 'top',
+            '底部左侧': 'bottom-left', '底部右侧': 'bottom-right',
+            '顶部左侧': 'top-left', '顶部右侧': 'top-right',
+        }
+        position = positions[self.page_position.currentText()]
+        
+        input_path = self.page_numbers_input_path.text()
+        output_path = self.page_numbers_output_path.text()
+        start_number = self.start_number.value()
+        number_format = self.page_number_format.currentText() or '{page}'
+        self.run_job(
+            lambda progress: PDFEditor.add_page_numbers(
+                input_path, output_path, start_number, position, number_format=number_format,
+                progress=progress
+            ),
+            self.page_numbers_progress, '正在添加页码...', '页码添加成功', '页码添加失败'
+        )
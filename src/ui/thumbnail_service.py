@@ -0,0 +1,260 @@
+"""后台缩略图服务
+
+缩略图在线程池中按需渲染：界面只请求当前可见（以及即将滚动到）的页面，
+渲染结果同时保存在内存LRU和磁盘缓存中，再次打开同一文件时不需要重新渲染。
+内存缓存以文件的路径、大小和修改时间为键；磁盘缓存以文件内容的指纹为键，
+指纹需要读取整个文件，在渲染线程中第一次用到时才计算。
+"""
+import os
+import threading
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from src.core.cache import ProbeCache, ThumbnailCache
+from src.core.converter import PDFConverter
+from src.core.probe import PDFProbe
+
+
+class Thumbnail:
+    """
+    一张缩略图。QImage 直接引用 data 中的像素数据，没有额外的编码和复制，
+    因此两者必须一起保存
+    """
+
+    def __init__(self, image, data=None):
+        self.image = image
+        self.data = data
+
+
+def pil_to_thumbnail(image):
+    """
+    将PIL图像转换为 Thumbnail，QImage 直接使用PIL导出的像素缓冲区
+    :param image: PIL图像
+    :return: Thumbnail
+    """
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    data = image.tobytes('raw', 'RGB')
+    qimage = QImage(data, image.width, image.height, image.width * 3, QImage.Format.Format_RGB888)
+    return Thumbnail(qimage, data)
+
+
+def visible_range(scroll_value, viewport_extent, total, item_extent, margin=10, prefetch=1.0):
+    """
+    计算滚动区域中可见的项目范围
+    :param scroll_value: 滚动条当前值
+    :param viewport_extent: 可见区域的宽度（或高度）
+    :param total: 项目总数
+    :param item_extent: 每个项目占用的宽度（含间距）
+    :param margin: 布局的起始边距
+    :param prefetch: 额外预取的屏数
+    :return: range - 项目下标范围
+    """
+    if total <= 0:
+        return range(0)
+    start = max(0, (scroll_value - margin) // item_extent)
+    end = (scroll_value + viewport_extent * (1 + prefetch) - margin) // item_extent + 1
+    return range(int(start), int(min(total, end)))
+
+
+class _Document:
+    """当前文件，文件指纹在第一次需要时计算，各渲染线程共用"""
+
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+        self._fingerprint = None
+        self._lock = threading.Lock()
+
+    def fingerprint(self):
+        with self._lock:
+            if self._fingerprint is None:
+                self._fingerprint = PDFProbe.get_fingerprint(self.pdf_path)
+            return self._fingerprint
+
+
+class _RenderSignals(QObject):
+    rendered = pyqtSignal(int, str, int, object)
+    failed = pyqtSignal(int, str, object, str)
+
+
+class _RenderTask(QRunnable):
+    """渲染连续几页的缩略图，已在磁盘缓存中的页面直接读取"""
+
+    def __init__(self, signals, generation, document, pages, size, disk_cache):
+        super().__init__()
+        self.signals = signals
+        self.generation = generation
+        self.document = document
+        self.pdf_path = document.pdf_path
+        self.pages = pages
+        self.size = size
+        self.disk_cache = disk_cache
+
+    def run(self):
+        try:
+            fingerprint = self.document.fingerprint() if self.disk_cache else None
+            missing = []
+            for page in self.pages:
+                path = self.disk_cache.get(fingerprint, page, self.size) if self.disk_cache else None
+                image = QImage(path) if path else None
+                if image is not None and not image.isNull():
+                    self.signals.rendered.emit(self.generation, self.pdf_path, page, Thumbnail(image))
+                else:
+                    missing.append(page)
+            if not missing:
+                return
+
+            # 磁盘缓存中已有的页面把缺少的页面分隔成几个连续区间，逐个区间渲染
+            runs = []
+            for page in missing:
+                if runs and page == runs[-1][1] + 1:
+                    runs[-1][1] = page
+                else:
+                    runs.append([page, page])
+            for first_page, last_page in runs:
+                for page, image in PDFConverter.render_thumbnails(self.pdf_path, first_page, last_page, self.size):
+                    if self.disk_cache:
+                        try:
+                            self.disk_cache.put(fingerprint, page, self.size, image)
+                        except OSError:
+                            pass
+                    self.signals.rendered.emit(self.generation, self.pdf_path, page, pil_to_thumbnail(image))
+        except Exception as e:
+            self.signals.failed.emit(self.generation, self.pdf_path, self.pages, str(e))
+
+
+class ThumbnailService(QObject):
+    """
+    缩略图服务，每个预览区域使用一个实例。
+    调用 set_document 切换文件，再用 request 请求需要显示的页面，
+    渲染完成后通过 thumbnailReady 信号通知
+    """
+    # (文件路径, 页码, QImage)
+    thumbnailReady = pyqtSignal(str, int, QImage)
+    # (文件路径, 错误信息)
+    failed = pyqtSignal(str, str)
+
+    # 每个渲染任务最多包含的连续页数，减少启动poppler的次数
+    CHUNK_SIZE = 8
+    # 内存中保留的缩略图数量，所有实例共用
+    MEMORY_ITEMS = 1024
+    _memory = OrderedDict()
+
+    def __init__(self, size=(120, 160), max_threads=None, parent=None):
+        """
+        :param size: 缩略图的最大 (宽, 高)
+        :param max_threads: 同时渲染的线程数，默认为CPU核心数（最多4个）
+        :param parent: 父对象
+        """
+        super().__init__(parent)
+        self.size = tuple(size)
+        self.pdf_path = None
+        self._document = None
+        self._file_key = None
+        self._generation = 0
+        self._pending = set()
+        self._priority = 0
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads or min(4, os.cpu_count() or 1))
+        try:
+            self._disk_cache = ThumbnailCache()
+        except OSError:
+            self._disk_cache = None
+        self._signals = _RenderSignals(self)
+        self._signals.rendered.connect(self._on_rendered)
+        self._signals.failed.connect(self._on_failed)
+
+    def set_document(self, pdf_path):
+        """
+        切换当前文件，尚未开始的渲染任务会被取消
+        :param pdf_path: PDF文件路径
+        :return: (bool, int|str) - (是否成功, 页数|错误信息)
+        """
+        self._pool.clear()
+        self._generation += 1
+        self._pending.clear()
+        self.pdf_path = pdf_path
+        self._document = None
+
+        # 只读取文件结构，不计算指纹，在界面线程中调用也很快
+        success, info = PDFProbe.probe(pdf_path)
+        if not success:
+            return False, info
+        if info['Pages'] is None:
+            return False, "PDF文件受密码保护，无法显示预览"
+        try:
+            self._file_key = ProbeCache.file_key(pdf_path)
+        except OSError as e:
+            return False, str(e)
+        self._document = _Document(pdf_path)
+        return True, info['Pages']
+
+    def _key(self, page):
+        return self._file_key, page, self.size
+
+    def cached(self, page):
+        """
+        读取内存中的缩略图
+        :return: QImage|None
+        """
+        thumbnail = self._memory.get(self._key(page))
+        if thumbnail is None:
+            return None
+        self._memory.move_to_end(self._key(page))
+        return thumbnail.image
+
+    def request(self, pages):
+        """
+        请求渲染页面，内存中已有的页面立即发出 thumbnailReady，
+        其余页面按连续区间分组后交给线程池，越晚请求的越先渲染
+        :param pages: 页码列表（从1开始）
+        """
+        if self._document is None:
+            return
+        missing = []
+        for page in sorted(set(pages)):
+            image = self.cached(page)
+            if image is not None:
+                self.thumbnailReady.emit(self.pdf_path, page, image)
+            elif page not in self._pending:
+                missing.append(page)
+        if not missing:
+            return
+
+        self._priority += 1
+        chunk = [missing[0]]
+        for page in missing[1:] + [None]:
+            if page is not None and page == chunk[-1] + 1 and len(chunk) < self.CHUNK_SIZE:
+                chunk.append(page)
+                continue
+            self._pending.update(chunk)
+            task = _RenderTask(self._signals, self._generation, self._document,
+                               chunk, self.size, self._disk_cache)
+            self._pool.start(task, self._priority)
+            if page is not None:
+                chunk = [page]
+
+    def _on_rendered(self, generation, pdf_path, page, thumbnail):
+        # 切换文件之前提交的任务，结果直接丢弃
+        if generation != self._generation:
+            return
+        memory = ThumbnailService._memory
+        memory[self._key(page)] = thumbnail
+        memory.move_to_end(self._key(page))
+        while len(memory) > self.MEMORY_ITEMS:
+            memory.popitem(last=False)
+        self._pending.discard(page)
+        self.thumbnailReady.emit(pdf_path, page, thumbnail.image)
+
+    def _on_failed(self, generation, pdf_path, pages, message):
+        if generation != self._generation:
+            return
+        # 渲染失败的页面不再处于等待状态，之后的请求可以重新渲染
+        self._pending.difference_update(pages)
+        self.failed.emit(pdf_path, message)
+
+    def shutdown(self):
+        """取消未开始的任务并等待正在渲染的任务结束"""
+        self._pool.clear()
+        self._pool.waitForDone()
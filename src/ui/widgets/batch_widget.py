@@ -2,76 +2,49 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QLabel, QLineEdit, QFileDialog, QMessageBox,
                              QComboBox, QSpinBox, QListWidget, QProgressBar,
                              QDoubleSpinBox, QCheckBox, QGroupBox)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from src.core.editor import PDFEditor
+from PyQt6.QtCore import Qt
+from src.core.batch import BatchProcessor
+from src.core.progress import OperationCancelled
+from src.ui.jobs import Job, default_scheduler
 import os
 
-class BatchProcessThread(QThread):
-    """批量处理线程"""
-    progress = pyqtSignal(int)  # 进度信号
-    finished = pyqtSignal(bool, str)  # 完成信号，返回(是否成功, 消息)
-    
-    def __init__(self, task_type, files, params):
-        super().__init__()
-        self.task_type = task_type
-        self.files = files
-        self.params = params
-        
-    def run(self):
-        try:
-            total = len(self.files)
-            success_count = 0
-            failed_files = []
-            
-            for i, file_path in enumerate(self.files):
-                try:
-                    # 构建输出文件路径
-                    output_path = os.path.join(
-                        self.params['output_dir'],
-                        f"{os.path.splitext(os.path.basename(file_path))[0]}_{self.task_type}.pdf"
-                    )
-                    
-                    if self.task_type == 'watermark':
-                        success, message = PDFEditor.add_watermark(
-                            file_path,
-                            output_path,
-                            self.params['text'],
-                            self.params['opacity'],
-                            self.params['angle']
-                        )
-                    elif self.task_type == 'remove_watermark':
-                        success, message = PDFEditor.remove_watermark(
-                            file_path,
-                            output_path
-                        )
-                    elif self.task_type == 'compress':
-                        success, message = PDFEditor.compress_pdf(
-                            file_path,
-                            output_path,
-                            self.params['quality']
-                        )
-                    
-                    if success:
-                        success_count += 1
-                    else:
-                        failed_files.append(f"{os.path.basename(file_path)}: {message}")
-                        
-                except Exception as e:
-                    failed_files.append(f"{os.path.basename(file_path)}: {str(e)}")
-                    
-                # 更新进度
-                self.progress.emit(int((i + 1) / total * 100))
-            
-            # 生成详细的结果消息
-            result_message = f"批量处理完成\n成功: {success_count}\n失败: {total - success_count}"
-            if failed_files:
-                result_message += "\n\n失败文件详情:\n" + "\n".join(failed_files)
-            
-            # 发送完成信号
-            self.finished.emit(True, result_message)
-            
-        except Exception as e:
-            self.finished.emit(False, f"批量处理失败: {str(e)}")
+def run_batch(task_type, files, params, progress):
+    """
+    批量处理文件，在后台任务中执行
+    :param task_type: 任务类型
+    :param files: 输入PDF文件路径列表
+    :param params: 任务参数字典
+    :param progress: Progress，每处理完一个文件报告一次，取消时立即结束所有工作进程
+    :return: (bool, str) - (是否成功, 结果消息)
+    """
+    try:
+        total = len(files)
+        
+        # 使用多进程引擎处理所有文件
+        processor = BatchProcessor(
+            max_workers=params.get('workers'),
+            timeout=params.get('timeout')
+        )
+        results = processor.run(task_type, files, params, progress=progress)
+        
+        success_count = 0
+        failed_files = []
+        for file_path, success, message in results:
+            if success:
+                success_count += 1
+            else:
+                failed_files.append(f"{os.path.basename(file_path)}: {message}")
+        
+        # 生成详细的结果消息
+        result_message = f"批量处理完成\n成功: {success_count}\n失败: {total - success_count}"
+        if failed_files:
+            result_message += "\n\n失败文件详情:\n" + "\n".join(failed_files)
+        return True, result_message
+        
+    except OperationCancelled:
+        raise
+    except Exception as e:
+        return False, f"批量处理失败: {str(e)}"
 
 class BatchWidget(QWidget):
     def __init__(self):
@@ -182,10 +155,41 @@ class BatchWidget(QWidget):
         compress_group.setLayout(compress_layout)
         layout.addWidget(compress_group)
         
-        # 进度条
+        # 处理设置
+        settings_group = QGroupBox("处理设置")
+        settings_group_layout = QHBoxLayout()
+        
+        # 并行进程数
+        settings_group_layout.addWidget(QLabel("并行进程数:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spin.setValue(max(1, os.cpu_count() or 1))
+        settings_group_layout.addWidget(self.workers_spin)
+        
+        # 单文件超时
+        settings_group_layout.addWidget(QLabel("单文件超时(秒):"))
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(0, 86400)
+        self.timeout_spin.setValue(0)
+        self.timeout_spin.setSpecialValueText("不限")
+        settings_group_layout.addWidget(self.timeout_spin)
+        
+        settings_group.setLayout(settings_group_layout)
+        layout.addWidget(settings_group)
+        
+        # 进度条和取消按钮
+        progress_layout = QHBoxLayout()
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
-        layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.progress_bar)
+        
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.setVisible(False)
+        self.cancel_button.clicked.connect(self.cancel_batch_process)
+        progress_layout.addWidget(self.cancel_button)
+        layout.addLayout(progress_layout)
+        
+        self.job = None
         
     def add_files(self):
         """添加文件到列表"""
@@ -244,7 +248,11 @@ class BatchWidget(QWidget):
             return
             
         # 准备参数
-        params = {'output_dir': output_dir}
+        params = {
+            'output_dir': output_dir,
+            'workers': self.workers_spin.value(),
+            'timeout': self.timeout_spin.value()
+        }
         
         if task_type == 'watermark':
             # 检查水印文本
@@ -263,35 +271,52 @@ class BatchWidget(QWidget):
             quality_map = {"高": "high", "中": "medium", "低": "low"}
             params['quality'] = quality_map[self.quality_combo.currentText()]
             
-        # 创建并启动处理线程
-        self.process_thread = BatchProcessThread(task_type, self.files.copy(), params)
-        self.process_thread.progress.connect(self.update_progress)
-        self.process_thread.finished.connect(self.process_finished)
-        
-        # 显示进度条
+        # 创建后台任务
+        files = self.files.copy()
+        self.job = Job(lambda progress: run_batch(task_type, files, params, progress), "批量处理")
+        self.job.signals.progress.connect(self.update_progress)
+        self.job.signals.finished.connect(lambda result: self.process_finished(*result))
+        self.job.signals.failed.connect(lambda message: self.process_finished(False, message))
+        self.job.signals.cancelled.connect(lambda: self.process_finished(False, "批量处理已取消"))
+        
+        # 显示进度条和取消按钮
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
+        self.cancel_button.setVisible(True)
         
-        # 禁用界面
-        self.setEnabled(False)
+        # 处理期间禁用设置和文件列表
+        self.set_groups_enabled(False)
         
-        # 启动线程
-        self.process_thread.start()
+        # 启动任务
+        default_scheduler().submit(self.job)
         
-    def update_progress(self, value):
+    def cancel_batch_process(self):
+        """取消批量处理，正在处理的文件会被中止"""
+        if self.job is not None:
+            self.job.cancel()
+            
+    def set_groups_enabled(self, enabled):
+        """启用或禁用所有设置区域"""
+        for group in self.findChildren(QGroupBox):
+            group.setEnabled(enabled)
+        
+    def update_progress(self, phase, done, total):
         """更新进度条"""
-        self.progress_bar.setValue(value)
+        self.progress_bar.setValue(int(done / total * 100) if total else 0)
         
     def process_finished(self, success, message):
         """处理完成回调"""
+        self.job = None
+        
         # 启用界面
-        self.setEnabled(True)
+        self.set_groups_enabled(True)
         
         # 隐藏进度条
         self.progress_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
         
         # 显示结果
         if success:
             QMessageBox.information(self, "完成", message)
         else:
-            QMessageBox.critical(self, "错误", message) 
\ No newline at end of file
+            QMessageBox.critical(self, "错误", message)
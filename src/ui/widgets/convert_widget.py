@@ -7,6 +7,7 @@ from PyQt6.QtCore import Qt, QSize, QPoint
 from PyQt6.QtGui import QPixmap, QIcon, QImage, QTransform, QDragEnterEvent, QDropEvent
 from PIL import Image, ImageEnhance
 from src.core.converter import PDFConverter
+from src.ui.jobs import run_with_dialog
 import os
 
 class ImagePreviewDialog(QDialog):
@@ -330,19 +331,23 @@ class ConvertWidget(QWidget):
         )
         
         if output_dir:
-            success, message = PDFConverter.pdf_to_images(
-                self.input_file,
-                output_dir,
-                format=self.format_combo.currentText(),
-                dpi=self.dpi_spin.value(),
-                first_page=first_page,
-                last_page=last_page
+            input_file = self.input_file
+            image_format = self.format_combo.currentText()
+            dpi = self.dpi_spin.value()
+            run_with_dialog(
+                self,
+                lambda progress: PDFConverter.pdf_to_images(
+                    input_file,
+                    output_dir,
+                    format=image_format,
+                    dpi=dpi,
+                    first_page=first_page,
+                    last_page=last_page,
+                    progress=progress
+                ),
+                "正在转换...",
+                lambda message: self.page_input.clear()
             )
-            if success:
-                QMessageBox.information(self, "成功", message)
-                self.page_input.clear()
-            else:
-                QMessageBox.critical(self, "错误", message)
                 
     def add_images(self):
         """添加图片到列表"""
@@ -491,13 +496,11 @@ class ConvertWidget(QWidget):
                 else:
                     images_to_convert.append(image_path)
                     
-            success, message = PDFConverter.images_to_pdf(
-                images_to_convert,
-                output_path,
-                page_size=self.page_size_combo.currentText()
-            )
-            if success:
-                QMessageBox.information(self, "成功", message)
-                self.clear_images()
-            else:
-                QMessageBox.critical(self, "错误", message) 
\ No newline at end of file
+            page_size = self.page_size_combo.currentText()
+            run_with_dialog(
+                self,
+                lambda progress: PDFConverter.images_to_pdf(images_to_convert, output_path, page_size=page_size,
+                                                            progress=progress),
+                "正在转换...",
+                lambda message: self.clear_images()
+            ) 
\ No newline at end of file
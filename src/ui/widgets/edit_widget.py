@@ -4,6 +4,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QComboBox, QSpinBox, QTabWidget, QDoubleSpinBox)
 from PyQt6.QtCore import Qt
 from src.core.editor import PDFEditor
+from src.ui.jobs import run_with_dialog
 
 class EditWidget(QWidget):
     def __init__(self):
@@ -178,17 +179,15 @@ class EditWidget(QWidget):
             
         output_path = self.get_output_path("水印")
         if output_path:
-            success, message = PDFEditor.add_watermark(
-                self.input_file,
-                output_path,
-                watermark_text,
-                self.opacity_spin.value(),
-                self.angle_spin.value()
+            input_file = self.input_file
+            opacity = self.opacity_spin.value()
+            angle = self.angle_spin.value()
+            run_with_dialog(
+                self,
+                lambda progress: PDFEditor.add_watermark(input_file, output_path, watermark_text, opacity, angle,
+                                                        progress=progress),
+                "正在添加水印..."
             )
-            if success:
-                QMessageBox.information(self, "成功", message)
-            else:
-                QMessageBox.critical(self, "错误", message)
                 
     def parse_page_range(self, range_str):
         """解析页面范围字符串"""
@@ -228,16 +227,12 @@ class EditWidget(QWidget):
                 
         output_path = self.get_output_path("旋转")
         if output_path:
-            success, message = PDFEditor.rotate_pages(
-                self.input_file,
-                output_path,
-                rotation,
-                pages
+            input_file = self.input_file
+            run_with_dialog(
+                self,
+                lambda progress: PDFEditor.rotate_pages(input_file, output_path, rotation, pages),
+                "正在旋转页面..."
             )
-            if success:
-                QMessageBox.information(self, "成功", message)
-            else:
-                QMessageBox.critical(self, "错误", message)
                 
     def add_page_numbers(self):
         if not self.input_file:
@@ -247,16 +242,14 @@ class EditWidget(QWidget):
         output_path = self.get_output_path("页码")
         if output_path:
             position = 'bottom' if self.position_combo.currentText() == "底部" else 'top'
-            success, message = PDFEditor.add_page_numbers(
-                self.input_file,
-                output_path,
-                self.start_num_spin.value(),
-                position
+            input_file = self.input_file
+            start_number = self.start_num_spin.value()
+            run_with_dialog(
+                self,
+                lambda progress: PDFEditor.add_page_numbers(input_file, output_path, start_number, position,
+                                                           progress=progress),
+                "正在添加页码..."
             )
-            if success:
-                QMessageBox.information(self, "成功", message)
-            else:
-                QMessageBox.critical(self, "错误", message)
                 
     def compress_pdf(self):
         if not self.input_file:
@@ -269,12 +262,9 @@ class EditWidget(QWidget):
         
         output_path = self.get_output_path("压缩")
         if output_path:
-            success, message = PDFEditor.compress_pdf(
-                self.input_file,
-                output_path,
-                quality
-            )
-            if success:
-                QMessageBox.information(self, "成功", message)
-            else:
-                QMessageBox.critical(self, "错误", message)
\ No newline at end of file
+            input_file = self.input_file
+            run_with_dialog(
+                self,
+                lambda progress: PDFEditor.compress_pdf(input_file, output_path, quality, progress=progress),
+                "正在压缩..."
+            )
\ No newline at end of file
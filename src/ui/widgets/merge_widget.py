@@ -2,6 +2,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QPushButton,
                              QListWidget, QFileDialog, QMessageBox)
 from PyQt6.QtCore import Qt
 from src.core.merger import PDFMerger
+from src.ui.jobs import run_with_dialog
 
 class MergeWidget(QWidget):
     def __init__(self):
@@ -63,10 +64,15 @@ class MergeWidget(QWidget):
         )
         
         if output_path:
-            success, message = PDFMerger.merge_pdfs(self.pdf_files, output_path)
-            if success:
-                QMessageBox.information(self, "成功", message)
+            pdf_files = list(self.pdf_files)
+            
+            def on_success(message):
                 self.pdf_files.clear()
                 self.file_list.clear()
-            else:
-                QMessageBox.critical(self, "错误", message) 
\ No newline at end of file
+            
+            run_with_dialog(
+                self,
+                lambda progress: PDFMerger.merge_pdfs(pdf_files, output_path, progress=progress),
+                "正在合并...",
+                on_success
+            )
@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QApplication)
 from PyQt6.QtCore import Qt
 from src.core.metadata import PDFMetadata
+from src.ui.jobs import run_with_dialog
 
 class MetadataWidget(QWidget):
     def __init__(self):
@@ -238,19 +239,28 @@ class MetadataWidget(QWidget):
         
         output_path = self.get_output_path("元数据")
         if output_path:
-            success, message = PDFMetadata.set_metadata(
-                self.input_file,
-                output_path,
-                metadata
+            input_file = self.input_file
+            run_with_dialog(
+                self,
+                lambda progress: PDFMetadata.set_metadata(input_file, output_path, metadata, progress=progress),
+                "正在更新元数据...",
+                lambda message: self.open_output(output_path)
             )
-            if success:
-                QMessageBox.information(self, "成功", message)
-                # 更新当前文件和显示
-                self.input_file = output_path
-                self.file_label.setText(f"已选择: {output_path}")
-                self.load_metadata()
-            else:
-                QMessageBox.critical(self, "错误", message)
+    
+    def open_output(self, output_path, encrypted=False):
+        """处理完成后切换到输出文件"""
+        self.input_file = output_path
+        if encrypted:
+            # 清空密码输入框
+            self.user_password_edit.clear()
+            self.owner_password_edit.clear()
+            # 更新文件标签，提示文件已加密
+            self.file_label.setText(f"已选择(已加密): {output_path}")
+            # 清空元数据显示
+            self.metadata_label.setText("文件已加密，需要密码才能查看元数据")
+        else:
+            self.file_label.setText(f"已选择: {output_path}")
+            self.load_metadata()
                 
     def encrypt_pdf(self):
         """加密PDF文件"""
@@ -285,48 +295,23 @@ class MetadataWidget(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            # 直接在源文件上加密
-            success, message = PDFMetadata.add_encryption(
-                self.input_file,
-                self.input_file,  # 输入输出使用相同路径
-                user_password,
-                owner_password,
-                permissions
-            )
-            if success:
-                QMessageBox.information(self, "成功", message)
-                # 清空密码输入框
-                self.user_password_edit.clear()
-                self.owner_password_edit.clear()
-                # 更新文件标签，提示文件已加密
-                self.file_label.setText(f"已选择(已加密): {self.input_file}")
-                # 清空元数据显示
-                self.metadata_label.setText("文件已加密，需要密码才能查看元数据")
-            else:
-                QMessageBox.critical(self, "错误", message)
+            # 直接在源文件上加密，输入输出使用相同路径
+            output_path = self.input_file
         else:
             # 创建新文件
             output_path = self.get_output_path("加密")
-            if output_path:
-                success, message = PDFMetadata.add_encryption(
-                    self.input_file,
-                    output_path,
-                    user_password,
-                    owner_password,
-                    permissions
-                )
-                if success:
-                    QMessageBox.information(self, "成功", message)
-                    # 清空密码输入框
-                    self.user_password_edit.clear()
-                    self.owner_password_edit.clear()
-                    # 更新当前文件和显示
-                    self.input_file = output_path
-                    self.file_label.setText(f"已选择(已加密): {output_path}")
-                    # 清空元数据显示
-                    self.metadata_label.setText("文件已加密，需要密码才能查看元数据")
-                else:
-                    QMessageBox.critical(self, "错误", message) 
+            if not output_path:
+                return
+        
+        input_file = self.input_file
+        run_with_dialog(
+            self,
+            lambda progress: PDFMetadata.add_encryption(
+                input_file, output_path, user_password, owner_password, permissions, progress=progress
+            ),
+            "正在加密...",
+            lambda message: self.open_output(output_path, encrypted=True)
+        )
         
     def select_dict_file(self):
         """选择密码字典文件"""
@@ -357,27 +342,16 @@ class MetadataWidget(QWidget):
             QMessageBox.warning(self, "警告", "请先选择PDF文件")
             return
             
-        # 显示进度对话框
-        progress = QMessageBox(self)
-        progress.setIcon(QMessageBox.Icon.Information)
-        progress.setText("正在尝试破解密码，请稍候...")
-        progress.setStandardButtons(QMessageBox.StandardButton.NoButton)
-        progress.show()
-        
-        # 尝试破解
-        success, result = PDFMetadata.crack_password(
-            self.input_file,
-            self.dict_file_path,
-            self.common_passwords
-        )
+        input_file = self.input_file
+        dict_file_path = self.dict_file_path
+        common_passwords = list(self.common_passwords)
         
-        # 关闭进度对话框
-        progress.close()
+        def task(progress):
+            success, result = PDFMetadata.crack_password(input_file, dict_file_path, common_passwords,
+                                                         progress=progress)
+            return success, f"找到密码：{result}" if success else result
         
-        if success:
-            QMessageBox.information(self, "成功", f"找到密码：{result}")
-        else:
-            QMessageBox.warning(self, "提示", result) 
+        run_with_dialog(self, task, "正在尝试破解密码，请稍候...")
         
     def extract_content(self):
         """提取PDF内容"""
@@ -390,30 +364,10 @@ class MetadataWidget(QWidget):
         if not output_path:
             return
             
-        # 显示进度对话框
-        progress = QMessageBox()
-        progress.setWindowTitle("提示")
-        progress.setIcon(QMessageBox.Icon.Information)
-        progress.setText("正在提取内容，请稍候...")
-        progress.setStandardButtons(QMessageBox.StandardButton.NoButton)
-        progress.show()
-        
-        try:
-            # 尝试提取内容
-            success, message = PDFMetadata.extract_content(self.input_file, output_path)
-            
-            # 确保进度对话框被关闭
-            progress.done(0)
-            
-            if success:
-                QMessageBox.information(self, "成功", message)
-                # 更新当前文件和显示
-                self.input_file = output_path
-                self.file_label.setText(f"已选择: {output_path}")
-                self.load_metadata()
-            else:
-                QMessageBox.critical(self, "错误", message)
-        except Exception as e:
-            # 确保进度对话框被关闭
-            progress.done(0)
-            QMessageBox.critical(self, "错误", str(e)) 
\ No newline at end of file
+        input_file = self.input_file
+        run_with_dialog(
+            self,
+            lambda progress: PDFMetadata.extract_content(input_file, output_path, progress=progress),
+            "正在提取内容，请稍候...",
+            lambda message: self.open_output(output_path)
+        )
@@ -3,6 +3,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QCheckBox)
 from PyQt6.QtCore import Qt
 from src.core.splitter import PDFSplitter
+from src.ui.jobs import run_with_dialog
 
 class SplitWidget(QWidget):
     def __init__(self):
@@ -114,14 +115,12 @@ class SplitWidget(QWidget):
         )
         
         if output_dir:
-            success, message = PDFSplitter.split_pdf(
-                self.input_file,
-                output_dir,
-                page_groups,
-                self.separate_files_cb.isChecked()
+            input_file = self.input_file
+            separate_files = self.separate_files_cb.isChecked()
+            run_with_dialog(
+                self,
+                lambda progress: PDFSplitter.split_pdf(input_file, output_dir, page_groups, separate_files,
+                                                      progress=progress),
+                "正在提取页面...",
+                lambda message: self.page_input.clear()
             )
-            if success:
-                QMessageBox.information(self, "成功", message)
-                self.page_input.clear()
-            else:
-                QMessageBox.critical(self, "错误", message) 
\ No newline at end of file
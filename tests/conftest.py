@@ -0,0 +1,13 @@
+import os
+import pytest
+
+# 没有显示器的环境（CI）中使用离屏平台运行Qt相关测试
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """每个测试使用独立的缓存目录，不读写用户的缓存"""
+    cache_dir = tmp_path_factory.mktemp('cache')
+    monkeypatch.setenv('PDF_TOOLBOX_CACHE_DIR', str(cache_dir))
+    return cache_dir
@@ -0,0 +1,86 @@
+import pikepdf
+import pytest
+from reportlab.pdfgen import canvas
+from src.core import backend
+from src.core.metadata import PDFMetadata
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """创建一个3页的测试PDF"""
+    pdf_path = str(tmp_path / 'source.pdf')
+    c = canvas.Canvas(pdf_path)
+    for i in range(3):
+        c.drawString(100, 750, f"Page {i + 1}")
+        c.showPage()
+    c.save()
+    return pdf_path
+
+
+@pytest.mark.parametrize('name', ['qpdf', 'pypdf2'])
+def test_backends_produce_same_results(sample_pdf, tmp_path, name):
+    """测试两个后端写出的元数据和加密文件可以被两个后端读取"""
+    b = backend.get_backend(name)
+    output = str(tmp_path / 'metadata.pdf')
+    b.rewrite(sample_pdf, output, metadata={'Title': '标题'})
+    with pikepdf.open(output) as pdf:
+        assert str(pdf.docinfo['/Title']) == '标题'
+        assert len(pdf.pages) == 3
+
+    encrypted = str(tmp_path / 'encrypted.pdf')
+    b.rewrite(sample_pdf, encrypted, encryption=backend.encryption_options('secret', permissions={'print': False}))
+    for other in backend.BACKENDS.values():
+        assert other.is_encrypted(encrypted)
+        assert other.check_password(encrypted, 'secret')
+        assert not other.check_password(encrypted, 'wrong')
+        assert other.page_count(encrypted, 'secret') == 3
+    with pikepdf.open(encrypted, password='secret') as pdf:
+        assert pdf.encryption.R == 3
+        assert not pdf.allow.print_lowres and pdf.allow.extract and not pdf.allow.modify_other
+
+
+def test_call_falls_back_to_pypdf2(sample_pdf, tmp_path, mocker):
+    """测试 qpdf 无法处理时改用 PyPDF2，密码错误不会重试"""
+    mocker.patch.object(backend.QpdfBackend, 'page_count', side_effect=pikepdf.PdfError('damaged'))
+    assert backend.call('page_count', sample_pdf) == 3
+
+    mocker.patch.object(backend.QpdfBackend, 'check_password', side_effect=pikepdf.PasswordError('wrong'))
+    fallback = mocker.spy(backend.PyPDF2Backend, 'check_password')
+    with pytest.raises(pikepdf.PasswordError):
+        backend.call('check_password', sample_pdf, '')
+    assert fallback.call_count == 0
+
+
+def test_load_pdf_uses_backend(sample_pdf, tmp_path, mocker):
+    """测试 PDFEditor.load_pdf 通过后端打开文件，需要用户密码时报错"""
+    from PyPDF2 import PdfReader
+    from src.core.editor import PDFEditor
+    with PDFEditor.load_pdf(sample_pdf) as pdf:
+        assert isinstance(pdf, pikepdf.Pdf)
+
+    encrypted = str(tmp_path / 'encrypted.pdf')
+    backend.call('rewrite', sample_pdf, encrypted, encryption=backend.encryption_options('secret'))
+    with pytest.raises(Exception, match='密码'):
+        PDFEditor.load_pdf(encrypted)
+
+    mocker.patch.object(backend.QpdfBackend, 'open', side_effect=pikepdf.PdfError('damaged'))
+    reader = PDFEditor.load_pdf(sample_pdf)
+    assert isinstance(reader, PdfReader) and len(reader.pages) == 3
+
+
+def test_metadata_encryption_round_trip(sample_pdf, tmp_path):
+    """测试加密、破解和提取内容"""
+    encrypted = str(tmp_path / 'encrypted.pdf')
+    assert PDFMetadata.add_encryption(sample_pdf, encrypted, '2020')[0]
+    assert PDFMetadata.crack_password(encrypted, common_passwords=['1', '2020']) == (True, '2020')
+
+    output = str(tmp_path / 'extracted.pdf')
+    success, message = PDFMetadata.extract_content(encrypted, output)
+    assert success and '2020' in message
+    with pikepdf.open(output) as pdf:
+        assert not pdf.is_encrypted and len(pdf.pages) == 3
+
+    # 输出路径可以与输入相同
+    assert PDFMetadata.set_metadata(output, output, {'/Author': '作者'})[0]
+    with pikepdf.open(output) as pdf:
+        assert str(pdf.docinfo['/Author']) == '作者'
@@ -0,0 +1,56 @@
+import os
+import pytest
+from PyPDF2 import PdfReader
+from src.core.batch import BatchProcessor, build_output_path
+
+
+@pytest.fixture
+def batch_files(tmp_path):
+    """创建一组测试用的PDF文件，其中包含一个损坏的文件"""
+    from reportlab.pdfgen import canvas
+    files = []
+    for i in range(3):
+        pdf_path = str(tmp_path / f"doc{i}.pdf")
+        c = canvas.Canvas(pdf_path)
+        c.drawString(100, 750, f"批处理测试 {i}")
+        c.showPage()
+        c.save()
+        files.append(pdf_path)
+
+    broken_path = str(tmp_path / "broken.pdf")
+    with open(broken_path, 'wb') as f:
+        f.write(b'%PDF-1.4\nthis is not a pdf')
+    files.insert(1, broken_path)
+    return files
+
+
+def test_batch_compress_isolates_failures(batch_files, tmp_path):
+    """测试多进程批量压缩，损坏文件只影响自身"""
+    output_dir = str(tmp_path / "out")
+    os.makedirs(output_dir)
+
+    processor = BatchProcessor(max_workers=2, timeout=60)
+    results = processor.run('compress', batch_files, {'output_dir': output_dir, 'quality': 'medium'})
+
+    assert [r[0] for r in results] == batch_files
+    assert [r[1] for r in results] == [True, False, True, True]
+    for file_path, success, _ in results:
+        if success:
+            output_path = build_output_path(file_path, output_dir, 'compress')
+            assert len(PdfReader(output_path).pages) == 1
+
+
+def test_batch_ordered_callback(batch_files, tmp_path):
+    """测试按输入顺序回调结果"""
+    output_dir = str(tmp_path / "out")
+    os.makedirs(output_dir)
+
+    seen = []
+    processor = BatchProcessor(max_workers=3, ordered=True)
+    processor.run(
+        'watermark',
+        batch_files,
+        {'output_dir': output_dir, 'text': 'batch', 'opacity': 0.3, 'angle': 45},
+        lambda index, file_path, success, message: seen.append(index)
+    )
+    assert seen == list(range(len(batch_files)))
@@ -0,0 +1,33 @@
+import random
+from benchmarks import corpus, harness, suite
+
+
+def test_corpus_is_deterministic(tmp_path):
+    """测试同一种子生成的文件逐字节相同"""
+    first, second = str(tmp_path / 'a.pdf'), str(tmp_path / 'b.pdf')
+    corpus.mixed_sizes(first, 5, random.Random(corpus.SEED))
+    corpus.mixed_sizes(second, 5, random.Random(corpus.SEED))
+    with open(first, 'rb') as a, open(second, 'rb') as b:
+        assert a.read() == b.read()
+
+
+def test_run_benchmark_in_subprocess(tmp_path):
+    """测试用例在子进程中运行并返回耗时和峰值内存"""
+    path = str(tmp_path / 'text.pdf')
+    corpus.text_heavy(path, 3, random.Random(corpus.SEED))
+    result = harness.run_benchmark(suite.get('metadata.get_metadata'), {'text_heavy': path},
+                                   repeat=2, workdir=str(tmp_path))
+    assert result['status'] == 'ok', result.get('message')
+    assert len(result['times']) == 2 and result['min'] <= result['median']
+    assert result['peak_rss'] is None or result['peak_rss'] > 0
+
+
+def test_compare_flags_regressions():
+    """测试比较两次结果时标记超过阈值的退化"""
+    old = {'results': [{'name': 'a', 'status': 'ok', 'min': 1.0, 'peak_rss': 100},
+                       {'name': 'b', 'status': 'ok', 'min': 1.0, 'peak_rss': 100}]}
+    new = {'results': [{'name': 'a', 'status': 'ok', 'min': 1.05, 'peak_rss': 100},
+                       {'name': 'b', 'status': 'ok', 'min': 2.0, 'peak_rss': 100},
+                       {'name': 'c', 'status': 'ok', 'min': 1.0, 'peak_rss': 100}]}
+    rows = harness.compare(old, new, threshold=0.1)
+    assert [(row[0], row[-1]) for row in rows] == [('a', False), ('b', True)]
@@ -0,0 +1,136 @@
+import os
+import pytest
+from src.core.cache import ProbeCache, get_cache_dir
+from src.core.probe import PDFProbe
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """创建一个测试用的两页PDF文件"""
+    from reportlab.pdfgen import canvas
+    pdf_path = str(tmp_path / 'sample.pdf')
+    c = canvas.Canvas(pdf_path)
+    for i in range(2):
+        c.drawString(100, 750, f"第{i+1}页")
+        c.showPage()
+    c.save()
+    return pdf_path
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """记录实际解析文件的次数"""
+    calls = []
+    light = PDFProbe._probe_light
+
+    def counting_probe(pdf_path, page_sizes):
+        calls.append(page_sizes)
+        return light(pdf_path, page_sizes)
+
+    monkeypatch.setattr(PDFProbe, '_probe_light', staticmethod(counting_probe))
+    return calls
+
+
+def test_cache_dir_from_environment(isolated_cache_dir):
+    """测试通过环境变量指定缓存目录"""
+    assert get_cache_dir() == str(isolated_cache_dir)
+
+
+def test_probe_reuses_cached_result(sample_pdf, parse_calls):
+    """测试文件未修改时不再解析"""
+    success, first = PDFProbe.probe(sample_pdf)
+    assert success, first
+    success, second = PDFProbe.probe(sample_pdf)
+    assert success, second
+    assert parse_calls == [False]
+    assert second == first
+    assert isinstance(second['PageSize'], tuple)
+    assert 'Fingerprint' not in second
+
+    # 需要全部页面尺寸时重新解析一次，之后两种请求都命中缓存
+    success, sizes = PDFProbe.probe(sample_pdf, page_sizes=True)
+    assert sizes['PageSizes'] == [sizes['PageSize']] * 2
+    PDFProbe.probe(sample_pdf)
+    PDFProbe.probe(sample_pdf, page_sizes=True)
+    assert parse_calls == [False, True]
+
+
+def test_modified_file_is_reparsed(sample_pdf, parse_calls):
+    """测试文件修改后缓存失效"""
+    assert PDFProbe.get_page_count(sample_pdf) == (True, 2)
+    from reportlab.pdfgen import canvas
+    c = canvas.Canvas(sample_pdf)
+    c.showPage()
+    c.save()
+    assert PDFProbe.get_page_count(sample_pdf) == (True, 1)
+    assert len(parse_calls) == 2
+
+
+def test_fingerprint_computed_lazily_and_cached(sample_pdf, mocker):
+    """测试探测不计算指纹；指纹只计算一次，重新探测后仍然保留，文件修改后重新计算"""
+    hashing = mocker.spy(PDFProbe, 'fingerprint')
+    assert PDFProbe.probe(sample_pdf)[0]
+    assert hashing.call_count == 0
+
+    fingerprint = PDFProbe.get_fingerprint(sample_pdf)
+    assert len(fingerprint) == 64
+    assert PDFProbe.probe(sample_pdf, page_sizes=True)[0]
+    assert PDFProbe.get_fingerprint(sample_pdf) == fingerprint
+    assert hashing.call_count == 1
+    # 探测结果同样保留
+    assert 'PageSizes' in PDFProbe.get_cache().get(sample_pdf, page_sizes=True)
+
+    with open(sample_pdf, 'ab') as f:
+        f.write(b'\n')
+    assert PDFProbe.get_cache().get(sample_pdf) is None
+    assert PDFProbe.get_fingerprint(sample_pdf) != fingerprint
+    assert hashing.call_count == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path, sample_pdf):
+    """测试超过条目上限时淘汰最久未使用的条目"""
+    cache = ProbeCache(str(tmp_path / 'probe.sqlite3'), max_entries=2)
+    paths = []
+    for i in range(3):
+        path = str(tmp_path / f'copy{i}.pdf')
+        with open(sample_pdf, 'rb') as src, open(path, 'wb') as dst:
+            dst.write(src.read())
+        paths.append(path)
+
+    cache.put(paths[0], {'Pages': 0})
+    cache.put(paths[1], {'Pages': 1})
+    assert cache.get(paths[0]) == {'Pages': 0}
+    cache.put(paths[2], {'Pages': 2})
+    assert len(cache) == 2
+    assert cache.get(paths[1]) is None
+    assert cache.get(paths[0]) == {'Pages': 0}
+
+
+def test_probe_works_when_cache_unavailable(sample_pdf, monkeypatch, tmp_path):
+    """测试缓存目录不可用时仍能正常探测"""
+    blocker = tmp_path / 'not_a_dir'
+    blocker.write_text('')
+    monkeypatch.setenv('PDF_TOOLBOX_CACHE_DIR', str(blocker / 'cache'))
+    assert PDFProbe.get_page_count(sample_pdf) == (True, 2)
+
+
+def test_cache_closes_connections(tmp_path, sample_pdf, mocker):
+    """测试每次读写后都关闭数据库连接"""
+    import sqlite3
+    connections = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        connections.append(conn)
+        return conn
+
+    mocker.patch('src.core.cache.sqlite3.connect', side_effect=tracking_connect)
+    cache = ProbeCache(str(tmp_path / 'probe.sqlite3'))
+    cache.put(sample_pdf, {'Pages': 2})
+    assert cache.get(sample_pdf) == {'Pages': 2}
+    assert len(cache) == 1
+    assert len(connections) == 4
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+import pytest
+from PyPDF2 import PdfReader
+from src.cli import main
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """创建一个测试用的两页PDF文件"""
+    from reportlab.pdfgen import canvas
+    pdf_path = str(tmp_path / 'sample.pdf')
+    c = canvas.Canvas(pdf_path)
+    for i in range(2):
+        c.drawString(100, 750, f"第{i+1}页")
+        c.showPage()
+    c.save()
+    return pdf_path
+
+
+def test_help_does_not_import_heavy_modules():
+    """测试 --help 不会导入Qt和PDF处理库"""
+    code = (
+        "import sys\n"
+        "from src.cli import main\n"
+        "try:\n"
+        "    main(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "heavy = [m for m in ('PyQt6', 'pikepdf', 'PyPDF2', 'reportlab') if m in sys.modules]\n"
+        "print('HEAVY=' + ','.join(heavy))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0
+    assert result.stdout.strip().splitlines()[-1] == 'HEAVY='
+
+
+def test_compress_command(sample_pdf, tmp_path):
+    """测试压缩子命令"""
+    output_path = str(tmp_path / 'compressed.pdf')
+    assert main(['compress', sample_pdf, output_path, '--quality', 'low']) == 0
+    assert len(PdfReader(output_path).pages) == 2
+
+
+def test_merge_and_reorder_commands(sample_pdf, tmp_path):
+    """测试合并和重排序子命令"""
+    merged_path = str(tmp_path / 'merged.pdf')
+    assert main(['merge', sample_pdf, sample_pdf, '-o', merged_path]) == 0
+    assert len(PdfReader(merged_path).pages) == 4
+
+    reordered_path = str(tmp_path / 'reordered.pdf')
+    assert main(['reorder', merged_path, reordered_path, '--order', '4,1-3']) == 0
+    assert len(PdfReader(reordered_path).pages) == 4
+
+
+def test_failure_exit_code(tmp_path):
+    """测试失败时返回非零退出码"""
+    missing = str(tmp_path / 'missing.pdf')
+    assert main(['remove-watermark', missing, str(tmp_path / 'out.pdf')]) == 1
@@ -0,0 +1,54 @@
+import pikepdf
+from src.core.content import ContentRewriter, drop_instruction
+
+
+def _make_page(*streams):
+    """创建一个由给定内容流组成的单页PDF"""
+    pdf = pikepdf.new()
+    page = pdf.add_blank_page(page_size=(200, 200))
+    page.Contents = pikepdf.Array([pdf.make_stream(data) for data in streams])
+    return pdf, page
+
+
+def test_watermark_rules_only_touch_operators():
+    """测试只改写操作符，不影响字符串和名称中的相同字节"""
+    pdf, page = _make_page(
+        b'/GS0 gs /Watermark BMC BT /F1 12 Tf (hugs) Tj ET EMC',
+        b'/Stamp <</MCID 0>> BDC /Logs Do EMC'
+    )
+    changed = ContentRewriter.rewrite_page(pdf, page, ContentRewriter.WATERMARK_RULES)
+    assert changed == 3
+
+    instructions = pikepdf.parse_content_stream(page)
+    operators = [str(instruction.operator) for instruction in instructions]
+    assert 'gs' not in operators
+    assert operators.count('EMC') == 2
+    assert isinstance(page.Contents, pikepdf.Stream)
+
+    data = page.Contents.read_bytes()
+    assert b'/Artifact BMC' in data
+    assert b'(hugs) Tj' in data
+    assert b'/Logs Do' in data
+    assert b'/Watermark' not in data and b'/Stamp' not in data
+
+
+def test_rewrite_leaves_unmatched_page_untouched():
+    """测试没有匹配的指令时不改写页面"""
+    pdf, page = _make_page(b'/Span <</MCID 0>> BDC 0 0 m 10 10 l S EMC')
+    original = page.Contents
+    assert ContentRewriter.rewrite_page(pdf, page, ContentRewriter.WATERMARK_RULES) == 0
+    assert page.Contents == original
+
+
+def test_custom_rule_table():
+    """测试自定义规则表"""
+    pdf, page = _make_page(b'1 0 0 RG 0 0 m 10 10 l S')
+    ContentRewriter.rewrite_page(pdf, page, {'RG': drop_instruction})
+    assert [str(i.operator) for i in pikepdf.parse_content_stream(page)] == ['m', 'l', 'S']
+
+
+def test_rewrite_skips_pages_without_rule_operators(monkeypatch):
+    """测试内容流不含规则操作符时不解析"""
+    pdf, page = _make_page(b'0 0 m 10 10 l S')
+    monkeypatch.setattr(pikepdf, 'parse_content_stream', None)
+    assert ContentRewriter.rewrite_page(pdf, page, ContentRewriter.WATERMARK_RULES) == 0
@@ -0,0 +1,106 @@
+import os
+import pytest
+from PIL import Image
+from src.core.converter import PDFConverter
+import src.core.converter as converter_module
+
+
+@pytest.fixture
+def multi_page_pdf(tmp_path):
+    """创建一个5页的测试PDF文件"""
+    from reportlab.pdfgen import canvas
+    pdf_path = str(tmp_path / 'multi.pdf')
+    c = canvas.Canvas(pdf_path)
+    for i in range(5):
+        c.drawString(100, 750, f"第{i+1}页")
+        c.showPage()
+    c.save()
+    return pdf_path
+
+
+@pytest.fixture
+def fake_poppler(monkeypatch, tmp_path):
+    """用假的渲染函数替代poppler，记录每次渲染的页码范围"""
+    calls = []
+
+    def fake_convert_from_path(pdf_path, dpi=200, first_page=None, last_page=None, **kwargs):
+        calls.append((first_page, last_page))
+        return [Image.new('RGB', (20, 30), 'white') for _ in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(converter_module, 'convert_from_path', fake_convert_from_path)
+    monkeypatch.setattr(PDFConverter, 'get_poppler_path', staticmethod(lambda: str(tmp_path)))
+    return calls
+
+
+def test_estimate_chunk_size():
+    """测试按内存上限估算块大小"""
+    a4_area = 595.0 * 842.0
+    # 300 DPI 的A4页面约占50MB（缓冲区+图片）
+    assert PDFConverter.estimate_chunk_size(a4_area, 300, 512) == 10
+    # 单页超过上限时仍逐页渲染
+    assert PDFConverter.estimate_chunk_size(a4_area, 300, 1) == 1
+    assert PDFConverter.estimate_chunk_size(None, 300, 512) == PDFConverter.DEFAULT_CHUNK_SIZE
+
+
+def test_pdf_to_images_renders_in_chunks(multi_page_pdf, fake_poppler, tmp_path):
+    """测试分块渲染并逐页保存"""
+    output_dir = str(tmp_path / 'images')
+    success, message = PDFConverter.pdf_to_images(
+        multi_page_pdf, output_dir, format='PNG', dpi=300, first_page=2, max_memory_mb=100
+    )
+    assert success, message
+    assert fake_poppler == [(2, 3), (4, 5)]
+    assert sorted(os.listdir(output_dir)) == [f"multi_第{i}页.png" for i in range(2, 6)]
+
+
+def test_iter_pdf_images_with_chunk_size(multi_page_pdf, fake_poppler):
+    """测试生成器按指定块大小产出页面"""
+    pages = [page_num for page_num, _ in PDFConverter.iter_pdf_images(multi_page_pdf, chunk_size=1)]
+    assert pages == [1, 2, 3, 4, 5]
+    assert len(fake_poppler) == 5
+
+
+def test_images_to_pdf_embeds_sources(tmp_path, monkeypatch):
+    """测试图片转PDF：不在当前目录产生临时文件，JPEG原样嵌入"""
+    monkeypatch.chdir(tmp_path)
+    jpeg_path = str(tmp_path / 'a.jpg')
+    Image.new('RGB', (400, 300), 'blue').save(jpeg_path)
+    output_path = str(tmp_path / 'out.pdf')
+    success, message = PDFConverter.images_to_pdf(
+        [jpeg_path, Image.new('RGBA', (50, 80), 'red')], output_path
+    )
+    assert success, message
+    assert sorted(os.listdir(tmp_path)) == ['a.jpg', 'out.pdf']
+
+    import pikepdf
+    with pikepdf.open(output_path) as pdf:
+        assert len(pdf.pages) == 2
+        first = pdf.pages[0].Resources.XObject.Im0
+        assert first.Filter == '/DCTDecode'
+        with open(jpeg_path, 'rb') as f:
+            assert first.read_raw_bytes() == f.read()
+
+
+def test_plan_render_uses_probe(multi_page_pdf, mocker):
+    """测试规划渲染使用探测得到的页面尺寸，不用 pikepdf 解析文件"""
+    import pikepdf
+    parse = mocker.spy(pikepdf.Pdf, 'open')
+    first_page, last_page, area = PDFConverter._plan_render(multi_page_pdf, 2, None)
+    assert (first_page, last_page) == (2, 5)
+    assert area == pytest.approx(595.2756 * 841.8898)
+    assert parse.call_count == 0
+
+
+def test_plan_render_reads_unresolved_boxes(tmp_path, mocker):
+    """测试探测无法确定尺寸的页面用 pikepdf 读取"""
+    import pikepdf
+    pdf_path = str(tmp_path / 'no_mediabox.pdf')
+    with pikepdf.new() as pdf:
+        pdf.add_blank_page(page_size=(200, 300))
+        pdf.add_blank_page(page_size=(200, 300))
+        del pdf.pages[1].obj['/MediaBox']
+        pdf.save(pdf_path)
+    parse = mocker.spy(pikepdf.Pdf, 'open')
+    # 缺少 MediaBox 的页面按默认的 Letter 尺寸计算
+    assert PDFConverter._plan_render(pdf_path, None, None) == (1, 2, 612.0 * 792.0)
+    assert parse.call_count == 1
@@ -1,24 +1,19 @@
+import io
 import os
 import pytest
 from PyPDF2 import PdfReader
 from src.core.editor import PDFEditor
 
-# 测试文件路径
-TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), 'test_files')
-if not os.path.exists(TEST_FILES_DIR):
-    os.makedirs(TEST_FILES_DIR)
-
 @pytest.fixture
-def sample_pdf():
+def sample_pdf(tmp_path):
     """创建一个测试用的PDF文件"""
-    pdf_path = os.path.join(TEST_FILES_DIR, 'sample.pdf')
-    if not os.path.exists(pdf_path):
-        # 使用reportlab创建测试PDF
-        from reportlab.pdfgen import canvas
-        c = canvas.Canvas(pdf_path)
-        c.drawString(100, 750, "测试文档")
-        c.showPage()
-        c.save()
+    pdf_path = str(tmp_path / 'sample.pdf')
+    # 使用reportlab创建测试PDF
+    from reportlab.pdfgen import canvas
+    c = canvas.Canvas(pdf_path)
+    c.drawString(100, 750, "测试文档")
+    c.showPage()
+    c.save()
     return pdf_path
 
 def test_get_pdf_page_count(sample_pdf):
@@ -26,9 +21,9 @@ def test_get_pdf_page_count(sample_pdf):
     count = PDFEditor.get_pdf_page_count(sample_pdf)
     assert count == 1
 
-def test_add_watermark(sample_pdf):
+def test_add_watermark(sample_pdf, tmp_path):
     """测试添加水印"""
-    output_path = os.path.join(TEST_FILES_DIR, 'watermark.pdf')
+    output_path = str(tmp_path / 'watermark.pdf')
     success, message = PDFEditor.add_watermark(
         sample_pdf,
         output_path,
@@ -42,9 +37,65 @@ def test_add_watermark(sample_pdf):
     reader = PdfReader(output_path)
     assert len(reader.pages) == 1
 
-def test_remove_watermark(sample_pdf):
+def _mixed_size_pdf(path):
+    """创建包含三页Letter、一页小页面和一页旋转页面的PDF"""
+    import pikepdf
+    from reportlab.pdfgen import canvas
+    c = canvas.Canvas(path)
+    for i in range(3):
+        c.drawString(100, 750, f"第{i+1}页")
+        c.showPage()
+    c.setPageSize((300, 300))
+    c.drawString(10, 10, "小页面")
+    c.showPage()
+    c.save()
+    with pikepdf.Pdf.open(path, allow_overwriting_input=True) as pdf:
+        pdf.pages.append(pdf.pages[0])
+        pdf.pages[-1].Rotate = 90
+        pdf.save(path)
+    return path
+
+def test_add_watermark_shares_xobject(tmp_path):
+    """测试每种页面几何的水印只存储一次"""
+    import pikepdf
+    pdf_path = _mixed_size_pdf(str(tmp_path / 'pages.pdf'))
+    output_path = str(tmp_path / 'watermarked.pdf')
+    success, message = PDFEditor.add_watermark(pdf_path, output_path, "WM", 0.3, 45)
+    assert success, message
+    with pikepdf.Pdf.open(output_path) as pdf:
+        forms = [page.Resources.XObject.Wm.objgen for page in pdf.pages]
+        # 前三页尺寸相同共用一个水印，小页面和旋转页面各有一个
+        assert len(set(forms[:3])) == 1
+        assert len(set(forms)) == 3
+        assert pdf.pages[3].Resources.XObject.Wm.BBox == [0, 0, 300, 300]
+        stamps = {page.obj.Contents[-1].objgen for page in pdf.pages}
+        assert len(stamps) == 1
+        operators = [str(i.operator) for i in pikepdf.parse_content_stream(pdf.pages[3])]
+        assert operators[0] == 'q' and operators[-3:] == ['cm', 'Do', 'Q']
+
+def test_watermark_overlay_cache_across_files(tmp_path, monkeypatch):
+    """测试水印页面按几何缓存并在多个文件间复用"""
+    pdf_path = _mixed_size_pdf(str(tmp_path / 'pages.pdf'))
+    rendered = []
+    create = PDFEditor._create_watermark_overlay
+    monkeypatch.setattr(PDFEditor, '_watermark_cache', type(PDFEditor._watermark_cache)())
+    monkeypatch.setattr(PDFEditor, '_create_watermark_overlay',
+                        staticmethod(lambda *args: rendered.append(args) or create(*args)))
+    for i in range(2):
+        success, message = PDFEditor.add_watermark(pdf_path, str(tmp_path / f'out{i}.pdf'), "缓存")
+        assert success, message
+    assert len(rendered) == 3
+
+def test_add_watermark_merge_mode(sample_pdf, tmp_path):
+    """测试旧的逐页合并模式"""
+    output_path = str(tmp_path / 'merged_watermark.pdf')
+    success, message = PDFEditor.add_watermark(sample_pdf, output_path, "WM", mode='merge')
+    assert success, message
+    assert len(PdfReader(output_path).pages) == 1
+
+def test_remove_watermark(sample_pdf, tmp_path):
     """测试移除水印"""
-    output_path = os.path.join(TEST_FILES_DIR, 'no_watermark.pdf')
+    output_path = str(tmp_path / 'no_watermark.pdf')
     success, message = PDFEditor.remove_watermark(
         sample_pdf,
         output_path
@@ -55,9 +106,18 @@ def test_remove_watermark(sample_pdf):
     reader = PdfReader(output_path)
     assert len(reader.pages) == 1
 
-def test_compress_pdf(sample_pdf):
+def test_remove_watermark_to_bytesio(sample_pdf):
+    """测试移除水印后写入内存缓冲区"""
+    buffer = io.BytesIO()
+    success, message = PDFEditor.remove_watermark(sample_pdf, buffer)
+    assert success
+    buffer.seek(0)
+    reader = PdfReader(buffer)
+    assert len(reader.pages) == 1
+
+def test_compress_pdf(sample_pdf, tmp_path):
     """测试PDF压缩"""
-    output_path = os.path.join(TEST_FILES_DIR, 'compressed.pdf')
+    output_path = str(tmp_path / 'compressed.pdf')
     success, message = PDFEditor.compress_pdf(
         sample_pdf,
         output_path,
@@ -68,9 +128,9 @@ def test_compress_pdf(sample_pdf):
     # 验证压缩后的文件大小是否小于等于原文件
     assert os.path.getsize(output_path) <= os.path.getsize(sample_pdf)
 
-def test_split_pdf(sample_pdf):
+def test_split_pdf(sample_pdf, tmp_path):
     """测试PDF分割"""
-    output_dir = os.path.join(TEST_FILES_DIR, 'split')
+    output_dir = str(tmp_path / 'split')
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     success, message = PDFEditor.split_pdf(
@@ -81,9 +141,9 @@ def test_split_pdf(sample_pdf):
     # 验证是否生成了分割后��文件
     assert len(os.listdir(output_dir)) > 0
 
-def test_merge_pdfs(sample_pdf):
+def test_merge_pdfs(sample_pdf, tmp_path):
     """测试PDF合并"""
-    output_path = os.path.join(TEST_FILES_DIR, 'merged.pdf')
+    output_path = str(tmp_path / 'merged.pdf')
     success, message = PDFEditor.merge_pdfs(
         [sample_pdf, sample_pdf],
         output_path
@@ -94,10 +154,10 @@ def test_merge_pdfs(sample_pdf):
     reader = PdfReader(output_path)
     assert len(reader.pages) == 2
 
-def test_reorder_pages(sample_pdf):
+def test_reorder_pages(sample_pdf, tmp_path):
     """测试页面重排序"""
     # 先创建一个多页PDF用于测试
-    multi_page_pdf = os.path.join(TEST_FILES_DIR, 'multi_page.pdf')
+    multi_page_pdf = str(tmp_path / 'multi_page.pdf')
     from reportlab.pdfgen import canvas
     c = canvas.Canvas(multi_page_pdf)
     for i in range(3):
@@ -105,7 +165,7 @@ def test_reorder_pages(sample_pdf):
         c.showPage()
     c.save()
     
-    output_path = os.path.join(TEST_FILES_DIR, 'reordered.pdf')
+    output_path = str(tmp_path / 'reordered.pdf')
     success, message = PDFEditor.reorder_pages(
         multi_page_pdf,
         output_path,
@@ -117,9 +177,9 @@ def test_reorder_pages(sample_pdf):
     reader = PdfReader(output_path)
     assert len(reader.pages) == 3
 
-def test_add_page_numbers(sample_pdf):
+def test_add_page_numbers(sample_pdf, tmp_path):
     """测试添加页码"""
-    output_path = os.path.join(TEST_FILES_DIR, 'with_numbers.pdf')
+    output_path = str(tmp_path / 'with_numbers.pdf')
     success, message = PDFEditor.add_page_numbers(
         sample_pdf,
         output_path,
@@ -130,4 +190,81 @@ def test_add_page_numbers(sample_pdf):
     assert os.path.exists(output_path)
     # 验证处理后的PDF是否可以正常打开
     reader = PdfReader(output_path)
-    assert len(reader.pages) == 1 
\ No newline at end of file
+    assert len(reader.pages) == 1 
+
+def test_add_page_numbers_shares_font(tmp_path):
+    """测试页码共用一个字体资源并支持格式和位置"""
+    import pikepdf
+    pdf_path = _mixed_size_pdf(str(tmp_path / 'pages.pdf'))
+    output_path = str(tmp_path / 'numbered.pdf')
+    success, message = PDFEditor.add_page_numbers(
+        pdf_path, output_path, start_number=3, position='top-right', number_format='{page} / {total}'
+    )
+    assert success, message
+    with pikepdf.Pdf.open(output_path) as pdf:
+        fonts = {page.Resources.Font.PgNum.objgen for page in pdf.pages}
+        assert len(fonts) == 1
+        assert pdf.pages[0].Resources.Font.PgNum.BaseFont == '/Helvetica'
+        # 原有字体保持不变
+        assert '/F1' in pdf.pages[0].Resources.Font
+        assert b'(3 / 7) Tj' in pdf.pages[0].obj.Contents[-1].read_bytes()
+    text = PdfReader(output_path).pages[3].extract_text()
+    assert '6 / 7' in text
+
+def test_add_page_numbers_chinese_format(sample_pdf, tmp_path):
+    """测试中文页码格式使用CID字体"""
+    import pikepdf
+    output_path = str(tmp_path / 'numbered_cn.pdf')
+    success, message = PDFEditor.add_page_numbers(sample_pdf, output_path, number_format='第 {page} 页')
+    assert success, message
+    with pikepdf.Pdf.open(output_path) as pdf:
+        font = pdf.pages[0].Resources.Font.PgNum
+        assert font.Subtype == '/Type0'
+        # "第 1 页" 的UCS-2编码
+        assert b'<7b2c0020003100209875> Tj' in pdf.pages[0].obj.Contents[-1].read_bytes()
+
+def test_add_page_numbers_invalid_position(sample_pdf, tmp_path):
+    """测试不支持的页码位置"""
+    success, message = PDFEditor.add_page_numbers(sample_pdf, str(tmp_path / 'x.pdf'), position='middle')
+    assert not success
+
+def test_plan_render_shards():
+    """测试渲染分片覆盖所有页面且互不重叠"""
+    shards = PDFEditor.plan_render_shards(10, 2)
+    pages = [p for first, last in shards for p in range(first, last + 1)]
+    assert pages == list(range(1, 11))
+    assert len(shards) == 5
+    assert PDFEditor.plan_render_shards(3, 8) == [(1, 1), (2, 2), (3, 3)]
+    assert PDFEditor.plan_render_shards(0, 4) == []
+
+def test_pdf_to_images_shards(sample_pdf, monkeypatch, tmp_path):
+    """测试PDF转图片按分片调用poppler"""
+    import pdf2image
+    calls = []
+    monkeypatch.setattr(
+        pdf2image,
+        'convert_from_path',
+        lambda path, **kwargs: calls.append((kwargs['first_page'], kwargs['last_page'], kwargs['output_file'])) or []
+    )
+    output_dir = str(tmp_path / 'images')
+    success, message = PDFEditor.pdf_to_images(sample_pdf, output_dir, workers=4)
+    assert success
+    assert calls == [(1, 1, 'sample')]
+
+def test_images_to_pdf_page_size_and_margin(tmp_path):
+    """测试图片转PDF使用指定的页面大小和页边距，自动模式按图片DPI计算页面"""
+    from PIL import Image
+    png_path = str(tmp_path / 'scan.png')
+    Image.new('L', (300, 600), 255).save(png_path, dpi=(150, 150))
+    output_path = str(tmp_path / 'scan.pdf')
+
+    success, message = PDFEditor.images_to_pdf([png_path, png_path], output_path, 'A4', margin=10)
+    assert success, message
+    reader = PdfReader(output_path)
+    assert len(reader.pages) == 2
+    assert [round(float(v)) for v in reader.pages[0].mediabox] == [0, 0, 595, 842]
+
+    success, message = PDFEditor.images_to_pdf([png_path], output_path, '自动', margin=0)
+    assert success, message
+    page = PdfReader(output_path).pages[0]
+    assert [round(float(v)) for v in page.mediabox] == [0, 0, 144, 288]
@@ -0,0 +1,78 @@
+import pikepdf
+from PIL import Image
+from src.core.image_pdf import ImagePDFWriter, encode_image, fit_image, orientation_matrix, prepare_images
+
+
+def test_jpeg_is_embedded_without_reencoding(tmp_path):
+    """测试JPEG文件原样嵌入"""
+    jpeg_path = str(tmp_path / 'photo.jpg')
+    Image.effect_noise((64, 48), 40).convert('RGB').save(jpeg_path, quality=80)
+    image = encode_image(jpeg_path)
+    assert image.filter == '/DCTDecode'
+    with open(jpeg_path, 'rb') as f:
+        assert image.data == f.read()
+
+
+def test_png_with_alpha_is_flattened(tmp_path):
+    """测试带透明通道的图片与白色背景合成后以Flate压缩"""
+    png_path = str(tmp_path / 'alpha.png')
+    Image.new('RGBA', (10, 10), (255, 0, 0, 0)).save(png_path)
+    image = encode_image(png_path)
+    assert (image.filter, image.color_space) == ('/FlateDecode', '/DeviceRGB')
+
+
+def test_fit_image_centers_in_margins():
+    """测试图片等比缩放并居中"""
+    assert fit_image(100, 100, 300, 500, margin=50) == (50.0, 150.0, 200.0, 200.0)
+
+
+def test_writer_output_opens_in_pikepdf(tmp_path):
+    """测试写出的PDF结构正确，图片保持原始像素尺寸"""
+    output_path = str(tmp_path / 'out.pdf')
+    with ImagePDFWriter(output_path) as writer:
+        for size, mode in [((30, 20), 'RGB'), ((8, 8), 'L'), ((5, 7), 'CMYK')]:
+            writer.add_page(encode_image(Image.new(mode, size)), 200, 100, fit_image(*size, 200, 100))
+
+    with pikepdf.open(output_path) as pdf:
+        assert len(pdf.pages) == 3
+        assert [float(v) for v in pdf.pages[0].MediaBox] == [0, 0, 200, 100]
+        images = [pikepdf.PdfImage(page.Resources.XObject.Im0) for page in pdf.pages]
+        assert [(image.width, image.height) for image in images] == [(30, 20), (8, 8), (5, 7)]
+        assert images[1].as_pil_image().mode == 'L'
+
+
+def _rgb_jpeg(path, size, orientation=1):
+    """保存一张带EXIF方向的JPEG"""
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    Image.new('RGB', size, 'green').save(path, exif=exif.tobytes())
+    return path
+
+
+def test_orientation_matrix_rotates_jpeg(tmp_path):
+    """测试原样嵌入的JPEG通过变换矩阵按EXIF方向显示"""
+    image = encode_image(_rgb_jpeg(str(tmp_path / 'rotated.jpg'), (40, 20), orientation=6))
+    assert image.filter == '/DCTDecode'
+    assert image.display_size == (20, 40)
+    # 方向6：顺时针旋转90度，原图左上角显示在右上角
+    a, b, c, d, e, f = orientation_matrix(6, (0, 0, 20, 40))
+    u, v = 0, 1
+    assert (a * u + c * v + e, b * u + d * v + f) == (20, 40)
+
+
+def test_prepare_images_keeps_order(tmp_path):
+    """测试进程池处理图片时按输入顺序返回，错误单独返回"""
+    sources = [_rgb_jpeg(str(tmp_path / f'{i}.jpg'), (10 + i, 10)) for i in range(6)]
+    sources.insert(3, str(tmp_path / 'missing.png'))
+    results = list(prepare_images(sources, workers=2, window=2))
+    assert [image.width if image else None for image, _ in results] == [10, 11, 12, None, 13, 14, 15]
+    assert isinstance(results[3][1], OSError)
+
+
+def test_max_size_downsamples(tmp_path):
+    """测试超过像素上限的图片被缩小，分辨率同比例调整"""
+    path = str(tmp_path / 'big.png')
+    Image.new('RGB', (400, 200)).save(path, dpi=(300, 300))
+    image = encode_image(path, max_size=100)
+    assert (image.width, image.height) == (100, 50)
+    assert round(image.dpi[0]) == 75
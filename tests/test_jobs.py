@@ -0,0 +1,60 @@
+import threading
+from src.ui.jobs import Job, JobScheduler
+
+
+def test_job_emits_progress_and_result(qtbot):
+    """测试任务在后台线程中运行并发出进度和结果"""
+    scheduler = JobScheduler()
+    reports = []
+
+    def task(progress):
+        progress.start('处理页面', 1000)
+        for _ in range(1000):
+            progress.advance()
+        return True, threading.current_thread() is not threading.main_thread()
+
+    job = Job(task)
+    job.signals.progress.connect(lambda phase, done, total: reports.append(done))
+    with qtbot.waitSignal(job.signals.finished) as blocker:
+        scheduler.submit(job)
+    assert blocker.args == [(True, True)]
+    # 按百分比限制信号数量
+    assert len(reports) == 101
+    # 调度器在 finished 信号的另一个槽中移除任务
+    qtbot.waitUntil(lambda: scheduler.active_jobs == [])
+
+
+def test_job_cancel_stops_mid_document(qtbot):
+    """测试取消正在运行的任务"""
+    scheduler = JobScheduler()
+    started = threading.Event()
+    processed = []
+
+    def task(progress):
+        progress.start('处理页面', 10 ** 6)
+        started.set()
+        for page in range(10 ** 6):
+            processed.append(page)
+            progress.advance()
+        return True, ''
+
+    job = Job(task)
+    finished = []
+    job.signals.finished.connect(finished.append)
+    with qtbot.waitSignal(job.signals.cancelled):
+        scheduler.submit(job)
+        started.wait(5)
+        scheduler.cancel_all()
+    assert finished == []
+    assert len(processed) < 10 ** 6
+
+
+def test_job_failure_emits_message(qtbot):
+    """测试任务抛出异常时发出错误信息"""
+    def task(progress):
+        raise ValueError('损坏的文件')
+
+    job = Job(task)
+    with qtbot.waitSignal(job.signals.failed) as blocker:
+        JobScheduler().submit(job)
+    assert blocker.args == ['损坏的文件']
@@ -0,0 +1,141 @@
+import os
+import pikepdf
+import pytest
+from reportlab.pdfgen import canvas
+from src.core.editor import PDFEditor
+from src.core.merge_engine import MergeEngine, MergeInputError
+from src.core.merger import PDFMerger
+from src.core.progress import Progress
+
+
+@pytest.fixture
+def sources(tmp_path):
+    """创建10个2页的测试PDF，每个文件带有一个含子书签的书签"""
+    paths = []
+    for i in range(10):
+        path = str(tmp_path / f"source_{i}.pdf")
+        c = canvas.Canvas(path)
+        for page in range(2):
+            c.drawString(100, 750, f"File {i} page {page + 1}")
+            if page == 0:
+                c.bookmarkPage(f"file{i}")
+                c.addOutlineEntry(f"File {i}", f"file{i}", level=0)
+            else:
+                c.bookmarkPage(f"file{i}_end")
+                c.addOutlineEntry("End", f"file{i}_end", level=1)
+            c.showPage()
+        c.save()
+        paths.append(path)
+    return paths
+
+
+def _outline(path):
+    with pikepdf.open(path) as pdf:
+        index = {page.obj.objgen: i for i, page in enumerate(pdf.pages)}
+        with pdf.open_outline() as outline:
+            return [(item.title, index[item.destination[0].objgen],
+                     [(child.title, index[child.destination[0].objgen]) for child in item.children])
+                    for item in outline.root]
+
+
+def test_plan():
+    """测试合并树的层数"""
+    engine = MergeEngine(64, max_workers=1)
+    assert engine.plan(1) == [1]
+    assert engine.plan(64) == [1]
+    assert engine.plan(65) == [2, 1]
+    assert engine.plan(5000) == [79, 2, 1]
+
+    # 并行时按进程数切分，之后的层文件数较少时不再切分
+    engine = MergeEngine(500, max_workers=4)
+    assert engine.plan(200) == [1]
+    assert engine.plan(1000) == [4, 1]
+    assert MergeEngine(64, max_workers=4).plan(5000) == [79, 2, 1]
+
+
+def test_merge_tree_keeps_order_and_outlines(sources, tmp_path, mocker):
+    """测试分层合并时页面顺序和书签正确，同时打开的文件数不超过上限"""
+    counter = {'open': 0, 'max': 0}
+    open_pdf, close_pdf = pikepdf.Pdf.open, pikepdf.Pdf.close
+
+    def tracking_open(*args, **kwargs):
+        counter['open'] += 1
+        counter['max'] = max(counter['max'], counter['open'])
+        return open_pdf(*args, **kwargs)
+
+    def tracking_close(self):
+        if self.filename != 'empty PDF':
+            counter['open'] -= 1
+        close_pdf(self)
+
+    mocker.patch.object(pikepdf.Pdf, 'open', side_effect=tracking_open)
+    mocker.patch.object(pikepdf.Pdf, 'close', tracking_close)
+
+    output = str(tmp_path / 'merged.pdf')
+    progress = Progress()
+    assert MergeEngine(3, max_workers=1).merge(sources, output, progress) == 20
+    mocker.stopall()
+
+    # 10个输入 -> 4个临时文件 -> 2个临时文件 -> 输出
+    assert counter == {'open': 0, 'max': 3}
+    assert (progress.done, progress.total) == (100, 100)
+    with pikepdf.open(output) as pdf:
+        texts = [page.Contents.read_bytes() for page in pdf.pages]
+    assert all(b'File %d page %d' % (i // 2, i % 2 + 1) in text for i, text in enumerate(texts))
+    assert _outline(output) == [(f"File {i}", 2 * i, [("End", 2 * i + 1)]) for i in range(10)]
+    # 临时文件已删除
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(p) for p in sources] + ['merged.pdf'])
+
+
+@pytest.mark.parametrize('merge', [PDFEditor.merge_pdfs, PDFMerger.merge_pdfs])
+def test_merge_pdfs_bounded(sources, tmp_path, merge):
+    """测试 PDFEditor 和 PDFMerger 都能分组合并并保留书签"""
+    output = str(tmp_path / 'merged.pdf')
+    success, message = merge(sources, output, max_open_files=4)
+    assert success, message
+    assert [title for title, _, _ in _outline(output)] == [f"File {i}" for i in range(10)]
+
+
+def test_merge_reports_bad_input(sources, tmp_path):
+    """测试无法打开的输入文件"""
+    broken = str(tmp_path / 'broken.pdf')
+    with open(broken, 'wb') as f:
+        f.write(b'not a pdf')
+    with pytest.raises(MergeInputError) as info:
+        MergeEngine(4, max_workers=1).merge(sources + [broken], str(tmp_path / 'merged.pdf'))
+    assert info.value.path == broken
+    success, message = PDFMerger.merge_pdfs([sources[0], broken], str(tmp_path / 'merged.pdf'))
+    assert not success and broken in message
+
+
+def test_parallel_merge_keeps_order(sources, tmp_path, mocker):
+    """测试进程池并行合并时页面和书签的顺序与输入一致，出错的文件同样被报告"""
+    mocker.patch.object(MergeEngine, 'PARALLEL_MIN_INPUTS', 4)
+    engine = MergeEngine(max_workers=2)
+    assert engine.plan(10) == [2, 1]
+
+    output = str(tmp_path / 'merged.pdf')
+    progress = Progress()
+    assert engine.merge(sources, output, progress) == 20
+    assert _outline(output) == [(f"File {i}", 2 * i, [("End", 2 * i + 1)]) for i in range(10)]
+    assert not any(name.startswith('pdf-merge-') for name in os.listdir(tmp_path))
+
+    broken = str(tmp_path / 'broken.pdf')
+    with open(broken, 'wb') as f:
+        f.write(b'not a pdf')
+    with pytest.raises(MergeInputError) as info:
+        engine.merge(sources[:5] + [broken] + sources[5:], output)
+    assert info.value.path == broken
+
+
+def test_small_merge_does_not_start_pool(tmp_path, mocker):
+    """测试输入文件数低于 PARALLEL_MIN_INPUTS 时即使分成多组也在当前进程中合并"""
+    source = str(tmp_path / 'page.pdf')
+    with pikepdf.new() as pdf:
+        pdf.add_blank_page()
+        pdf.save(source)
+    pool = mocker.patch('src.core.merge_engine.ProcessPoolExecutor', side_effect=AssertionError("启动了进程池"))
+    engine = MergeEngine(max_workers=4)
+    assert engine.plan(100) == [2, 1]
+    assert engine.merge([source] * 100, str(tmp_path / 'merged.pdf')) == 100
+    assert pool.call_count == 0
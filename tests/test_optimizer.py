@@ -0,0 +1,130 @@
+import os
+import zlib
+import pytest
+import pikepdf
+from PIL import Image, ImageDraw
+from src.core.editor import PDFEditor
+from src.core.optimizer import PDFOptimizer
+
+
+def _make_photo(path, size=(1600, 1200)):
+    """生成一张带随机图案的JPEG图片"""
+    import random
+    rng = random.Random(0)
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    for _ in range(200):
+        x, y = rng.randint(0, size[0]), rng.randint(0, size[1])
+        color = (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
+        draw.ellipse([x, y, x + rng.randint(10, 200), y + rng.randint(10, 200)], fill=color)
+    image.save(path, quality=90)
+    return path
+
+
+@pytest.fixture
+def image_pdf(tmp_path):
+    """创建一个包含高分辨率JPEG图片的PDF，图片在第二页以更大尺寸再次出现"""
+    from reportlab.pdfgen import canvas
+    photo = _make_photo(str(tmp_path / 'photo.jpg'))
+    pdf_path = str(tmp_path / 'images.pdf')
+    c = canvas.Canvas(pdf_path)
+    c.drawImage(photo, 50, 400, width=160, height=120)
+    c.showPage()
+    c.drawImage(photo, 50, 50, width=320, height=240)
+    c.showPage()
+    c.save()
+    return pdf_path
+
+
+def _image_objects(pdf):
+    return [obj for obj in pdf.objects
+            if isinstance(obj, pikepdf.Stream) and obj.get('/Subtype') == pikepdf.Name.Image]
+
+
+def test_collect_image_placements_uses_largest_placement(image_pdf):
+    """测试同一图片多次使用时取最大显示尺寸"""
+    with pikepdf.Pdf.open(image_pdf) as pdf:
+        placements = PDFOptimizer.collect_image_placements(pdf)
+        assert list(placements.values()) == [(320.0, 240.0)]
+
+
+def test_compress_pdf_downsamples_images(image_pdf, tmp_path):
+    """测试压缩时按显示尺寸重新采样图片"""
+    output_path = str(tmp_path / 'compressed.pdf')
+    success, message = PDFEditor.compress_pdf(image_pdf, output_path, quality='medium', image_dpi=150)
+    assert success, message
+    assert os.path.getsize(output_path) < os.path.getsize(image_pdf) / 2
+
+    with pikepdf.Pdf.open(output_path) as pdf:
+        image = _image_objects(pdf)[0]
+        # 320点宽 = 4.44英寸，150 DPI 约为667像素
+        assert int(image.Width) == 667
+        assert int(image.Height) == 500
+        assert pikepdf.PdfImage(image).as_pil_image().size == (667, 500)
+
+
+def test_downsample_skips_images_below_target(image_pdf):
+    """测试显示分辨率未超过目标DPI的图片保持不变"""
+    with pikepdf.Pdf.open(image_pdf) as pdf:
+        assert PDFOptimizer.downsample_images(pdf, 400) == (0, 0, 0)
+
+
+def test_compress_reports_skipped_images(image_pdf, tmp_path, mocker):
+    """测试无法处理的图片被计数并在压缩结果中说明"""
+    mocker.patch.object(PDFOptimizer, '_downsample_image', side_effect=ValueError('broken'))
+    with pikepdf.Pdf.open(image_pdf) as pdf:
+        assert PDFOptimizer.downsample_images(pdf, 150) == (0, 0, 1)
+    success, message = PDFEditor.compress_pdf(image_pdf, str(tmp_path / 'compressed.pdf'), image_dpi=150)
+    assert success and '1张图片无法处理' in message
+
+
+def test_downsample_bilevel_image():
+    """测试1位黑白图片重新采样后仍为1位图片"""
+    pdf = pikepdf.new()
+    bilevel = Image.new('1', (800, 800), 1)
+    ImageDraw.Draw(bilevel).rectangle([100, 100, 700, 700], fill=0)
+    image = pikepdf.Stream(pdf, zlib.compress(bilevel.tobytes()))
+    image.Type = pikepdf.Name.XObject
+    image.Subtype = pikepdf.Name.Image
+    image.Width, image.Height = 800, 800
+    image.ColorSpace = pikepdf.Name.DeviceGray
+    image.BitsPerComponent = 1
+    image.Filter = pikepdf.Name.FlateDecode
+    page = pdf.add_blank_page(page_size=(200, 200))
+    page.Resources = pikepdf.Dictionary(XObject=pikepdf.Dictionary(Im0=pdf.make_indirect(image)))
+    page.Contents = pdf.make_stream(b'q 100 0 0 100 0 0 cm /Im0 Do Q')
+
+    count, _, skipped = PDFOptimizer.downsample_images(pdf, 300)
+    assert (count, skipped) == (1, 0)
+    image = page.Resources.XObject.Im0
+    assert (int(image.Width), int(image.Height), int(image.BitsPerComponent)) == (417, 417, 1)
+    pixels = Image.frombytes('1', (417, 417), image.read_bytes())
+    assert pixels.getpixel((208, 208)) == 0
+    assert pixels.getpixel((5, 5)) == 255
+
+
+def test_merge_deduplicates_images(image_pdf, tmp_path):
+    """测试合并时共享重复的图片"""
+    output_path = str(tmp_path / 'merged.pdf')
+    success, message = PDFEditor.merge_pdfs([image_pdf, image_pdf, image_pdf], output_path)
+    assert success, message
+    with pikepdf.Pdf.open(output_path) as pdf:
+        assert len(pdf.pages) == 6
+        assert len(_image_objects(pdf)) == 1
+    assert os.path.getsize(output_path) < os.path.getsize(image_pdf) * 1.5
+
+
+def test_deduplicate_ignores_different_content(image_pdf, tmp_path):
+    """测试内容不同的图片不会被合并"""
+    from reportlab.pdfgen import canvas
+    other_photo = _make_photo(str(tmp_path / 'other.jpg'), size=(800, 600))
+    other_pdf = str(tmp_path / 'other.pdf')
+    c = canvas.Canvas(other_pdf)
+    c.drawImage(other_photo, 50, 50, width=320, height=240)
+    c.save()
+
+    output_path = str(tmp_path / 'merged.pdf')
+    success, message = PDFEditor.merge_pdfs([image_pdf, other_pdf, image_pdf], output_path)
+    assert success, message
+    with pikepdf.Pdf.open(output_path) as pdf:
+        assert len(_image_objects(pdf)) == 2
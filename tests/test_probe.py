@@ -0,0 +1,152 @@
+import os
+import pytest
+import pikepdf
+from src.core.probe import PDFProbe
+import src.core.probe as probe_module
+
+
+@pytest.fixture
+def source_pdf(tmp_path):
+    """创建一个包含不同尺寸页面和中文标题的PDF"""
+    from reportlab.pdfgen import canvas
+    pdf_path = str(tmp_path / 'source.pdf')
+    c = canvas.Canvas(pdf_path)
+    c.setTitle('测试标题')
+    for i in range(4):
+        c.drawString(100, 750, f"第{i+1}页")
+        c.showPage()
+    c.setPageSize((300, 400))
+    c.showPage()
+    c.save()
+    return pdf_path
+
+
+@pytest.fixture
+def no_fallback(monkeypatch):
+    """禁止回退到完整解析，确保走的是轻量路径"""
+    def fail(*args):
+        raise AssertionError("不应回退到 pikepdf")
+    monkeypatch.setattr(PDFProbe, '_probe_full', staticmethod(fail))
+
+
+@pytest.mark.parametrize('save_options', [
+    {},
+    {'object_stream_mode': pikepdf.ObjectStreamMode.generate},
+    {'linearize': True},
+], ids=['xref-table', 'object-streams', 'linearized'])
+def test_probe_matches_full_parse(source_pdf, tmp_path, no_fallback, save_options):
+    """测试各种文件结构下轻量解析与完整解析结果一致"""
+    pdf_path = str(tmp_path / 'saved.pdf')
+    with pikepdf.Pdf.open(source_pdf) as pdf:
+        pdf.save(pdf_path, **save_options)
+
+    success, info = PDFProbe.probe(pdf_path, page_sizes=True)
+    assert success, info
+    assert info['Pages'] == 5
+    assert info['PageSize'] == (595.2756, 841.8898)
+    assert info['PageSizes'][-1] == (300, 400)
+    assert info['Info']['/Title'] == '测试标题'
+    assert info['Encrypted'] is False
+    assert info['Linearized'] == bool(save_options.get('linearize'))
+    assert info['FileSize'] == os.path.getsize(pdf_path)
+
+    with pikepdf.Pdf.open(pdf_path) as pdf:
+        assert info['PageSizes'] == [(float(p.mediabox[2]), float(p.mediabox[3])) for p in pdf.pages]
+        assert info['Info'] == {str(k): str(v) for k, v in pdf.docinfo.items()}
+
+
+def test_probe_incremental_update(source_pdf, tmp_path, no_fallback):
+    """测试增量更新后读取最新的页数和文档信息"""
+    with pikepdf.Pdf.open(source_pdf, allow_overwriting_input=True) as pdf:
+        del pdf.pages[0]
+        pdf.docinfo['/Title'] = '新标题'
+        pdf.save(source_pdf)
+    with open(source_pdf, 'rb') as f:
+        original = f.read()
+    # 手工追加一个增量更新段，修改作者
+    startxref = int(original.rsplit(b'startxref', 1)[1].split()[0])
+    with pikepdf.Pdf.open(source_pdf) as pdf:
+        root = pdf.trailer.Root.objgen[0]
+        info = pdf.trailer.Info.objgen[0]
+        size = int(pdf.trailer.Size)
+    body = f"\n{info} 0 obj\n<< /Title (Updated) /Author <FEFF4F5C8005> >>\nendobj\n".encode()
+    xref_pos = len(original) + body.find(f"{info} 0 obj".encode())
+    xref_offset = len(original) + len(body)
+    update = body + (
+        f"xref\n{info} 1\n{xref_pos:010d} 00000 n \n"
+        f"trailer\n<< /Size {size} /Root {root} 0 R /Info {info} 0 R /Prev {startxref} >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    ).encode()
+    with open(source_pdf, 'ab') as f:
+        f.write(update)
+
+    success, info = PDFProbe.probe(source_pdf)
+    assert success, info
+    assert info['Pages'] == 4
+    assert info['Info'] == {'/Title': 'Updated', '/Author': '作者'}
+
+
+def test_probe_falls_back_for_encrypted_object_streams(source_pdf, tmp_path):
+    """测试加密的对象流回退到完整解析"""
+    pdf_path = str(tmp_path / 'encrypted.pdf')
+    with pikepdf.Pdf.open(source_pdf) as pdf:
+        pdf.save(pdf_path, encryption=pikepdf.Encryption(owner='owner', user=''),
+                 object_stream_mode=pikepdf.ObjectStreamMode.generate)
+    success, info = PDFProbe.probe(pdf_path)
+    assert success, info
+    assert info['Encrypted'] is True
+    assert info['Pages'] == 5
+    assert info['Info'] == {}
+
+
+def test_probe_falls_back_for_malformed_page_tree(tmp_path):
+    """测试页面树中出现非字典对象时回退到完整解析"""
+    pdf_path = str(tmp_path / 'malformed.pdf')
+    with pikepdf.new() as pdf:
+        pdf.add_blank_page(page_size=(200, 300))
+        pdf.Root.Pages.Kids.append(7)
+        pdf.save(pdf_path)
+    success, info = PDFProbe.probe(pdf_path, page_sizes=True, use_cache=False)
+    assert success, info
+    assert info['Pages'] == 1
+    assert info['PageSizes'] == [(200, 300)]
+
+
+def test_probe_user_password(source_pdf, tmp_path):
+    """测试需要用户密码的文件不返回页数"""
+    pdf_path = str(tmp_path / 'locked.pdf')
+    with pikepdf.Pdf.open(source_pdf) as pdf:
+        pdf.save(pdf_path, encryption=pikepdf.Encryption(owner='owner', user='user'))
+    success, info = PDFProbe.probe(pdf_path, use_cache=False)
+    assert success, info
+    assert info['Encrypted'] is True
+    assert info['Pages'] is None
+    success, message = PDFProbe.get_page_count(pdf_path)
+    assert not success
+
+
+def test_get_page_count_missing_file(tmp_path):
+    """测试文件不存在"""
+    success, message = PDFProbe.get_page_count(str(tmp_path / 'missing.pdf'))
+    assert not success
+
+
+def test_metadata_uses_probe(source_pdf, monkeypatch):
+    """测试获取元数据不需要完整解析"""
+    from src.core.metadata import PDFMetadata
+    monkeypatch.setattr(probe_module.PDFProbe, '_probe_full', None)
+    success, metadata = PDFMetadata.get_metadata(source_pdf)
+    assert success, metadata
+    assert metadata['Title'] == '测试标题'
+    assert metadata['Pages'] == 5
+    assert metadata['FileSize'].endswith('KB')
+
+
+def test_fingerprint_covers_whole_file(tmp_path):
+    """测试只有中间内容不同的文件指纹也不同"""
+    first, second = tmp_path / 'a.pdf', tmp_path / 'b.pdf'
+    head, tail = b'%PDF-1.7\n' + b'h' * 200000, b't' * 200000 + b'%%EOF\n'
+    first.write_bytes(head + b'1' * 1000 + tail)
+    second.write_bytes(head + b'2' * 1000 + tail)
+    assert PDFProbe.fingerprint(str(first)) != PDFProbe.fingerprint(str(second))
+    assert PDFProbe.fingerprint(str(first)) == PDFProbe.fingerprint(str(first))
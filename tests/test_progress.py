@@ -0,0 +1,74 @@
+import os
+import pytest
+from src.core.progress import CancelToken, OperationCancelled, Progress
+
+
+def test_progress_reports_phases():
+    """测试进度回调收到阶段和页数"""
+    reports = []
+    progress = Progress(lambda p: reports.append((p.phase, p.done, p.total)))
+    progress.start('处理页面', 2)
+    progress.advance()
+    progress.advance()
+    progress.start('保存')
+    assert reports == [('处理页面', 0, 2), ('处理页面', 1, 2), ('处理页面', 2, 2), ('保存', 0, 0)]
+    assert progress.fraction is None
+
+
+def test_progress_raises_after_cancel():
+    """测试取消后下一次报告进度时抛出 OperationCancelled"""
+    token = CancelToken()
+    progress = Progress(token=token)
+    progress.start('处理页面', 10)
+    token.cancel()
+    with pytest.raises(OperationCancelled):
+        progress.advance()
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """创建一个5页的测试PDF"""
+    from reportlab.pdfgen import canvas
+    pdf_path = str(tmp_path / 'pages.pdf')
+    c = canvas.Canvas(pdf_path)
+    for i in range(5):
+        c.drawString(100, 750, f"Page {i + 1}")
+        c.showPage()
+    c.save()
+    return pdf_path
+
+
+def test_core_operation_reports_pages_and_bytes(sample_pdf, tmp_path):
+    """测试核心操作逐页报告进度，保存后记录写入的字节数"""
+    from src.core.editor import PDFEditor
+    reports = []
+    progress = Progress(lambda p: reports.append((p.phase, p.done, p.total)))
+    output_path = str(tmp_path / 'numbered.pdf')
+    success, message = PDFEditor.add_page_numbers(sample_pdf, output_path, progress=progress)
+    assert success, message
+
+    phases = [phase for phase, _, _ in reports]
+    page_phase = phases[0]
+    assert [done for phase, done, _ in reports if phase == page_phase] == [0, 1, 2, 3, 4, 5]
+    assert reports[-1][0] != page_phase
+    assert progress.bytes_written == os.path.getsize(output_path)
+
+
+def test_core_operation_stops_when_cancelled(sample_pdf, tmp_path):
+    """测试处理到一半时取消，操作失败且不再处理后面的页面"""
+    from src.core.editor import PDFEditor
+    token = CancelToken()
+    pages = []
+
+    def callback(progress):
+        pages.append(progress.done)
+        if progress.done == 2:
+            token.cancel()
+
+    output_path = str(tmp_path / 'watermarked.pdf')
+    success, message = PDFEditor.add_watermark(sample_pdf, output_path, 'TEST',
+                                               progress=Progress(callback, token))
+    assert not success
+    assert '操作已取消' in message
+    assert max(pages) == 2
+    assert not os.path.exists(output_path)
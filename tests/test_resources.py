@@ -0,0 +1,90 @@
+import os
+import zlib
+import pikepdf
+import pytest
+from pikepdf import Dictionary, Name
+from src.core.editor import PDFEditor
+from src.core.resources import ResourcePruner
+from src.core.split_engine import SplitEngine
+
+
+def _font(pdf, base):
+    return pdf.make_indirect(Dictionary(Type=Name.Font, Subtype=Name.Type1, BaseFont=Name('/' + base)))
+
+
+@pytest.fixture
+def shared_pdf(tmp_path):
+    """创建4页的测试PDF：页面树上共享一个资源字典，包含两个字体和一张较大的图片，
+    每页只用到其中一个字体，第4页通过一个没有自己资源的表单使用图片"""
+    pdf = pikepdf.new()
+    image = pikepdf.Stream(pdf, zlib.compress(os.urandom(60000)))
+    image.Type, image.Subtype, image.Width, image.Height = Name.XObject, Name.Image, 200, 100
+    image.ColorSpace, image.BitsPerComponent, image.Filter = Name.DeviceRGB, 8, Name.FlateDecode
+    form = pikepdf.Stream(pdf, b'q 200 0 0 100 0 0 cm /Im0 Do Q')
+    form.Type, form.Subtype, form.BBox = Name.XObject, Name.Form, [0, 0, 200, 100]
+    resources = pdf.make_indirect(Dictionary(
+        Font=Dictionary(F1=_font(pdf, 'Helvetica'), F2=_font(pdf, 'Courier')),
+        XObject=Dictionary(Im0=pdf.make_indirect(image), Fm0=pdf.make_indirect(form)),
+        ProcSet=[Name.PDF, Name.Text],
+    ))
+    contents = [b'BT /F1 12 Tf 72 720 Td (one) Tj ET', b'BT /F2 12 Tf 72 720 Td (two) Tj ET',
+                b'BT /F1 12 Tf 72 720 Td (three) Tj ET', b'/Fm0 Do']
+    for data in contents:
+        pdf.add_blank_page()
+        pdf.pages[-1].obj.Contents = pdf.make_stream(data)
+        del pdf.pages[-1].obj['/Resources']
+    pdf.Root.Pages.Resources = resources
+    path = str(tmp_path / 'shared.pdf')
+    pdf.save(path)
+    return path
+
+
+def test_prune_page_keeps_used_entries(shared_pdf):
+    """测试裁剪后页面只保留用到的资源，共享字典本身不变"""
+    with pikepdf.open(shared_pdf) as pdf:
+        # 打开时继承的资源字典已被下放到每个页面，各页面引用同一个对象
+        shared = pdf.pages[1].obj.Resources
+        assert ResourcePruner.prune_page(pdf.pages[1]) == 3
+        resources = pdf.pages[1].obj.Resources
+        assert set(resources.Font.keys()) == {'/F2'}
+        assert '/XObject' not in resources
+        assert resources.ProcSet == shared.ProcSet
+        assert set(shared.Font.keys()) == {'/F1', '/F2'}
+
+        # 表单没有自己的资源字典，它引用的图片同样保留
+        ResourcePruner.prune_page(pdf.pages[3])
+        assert set(pdf.pages[3].obj.Resources.XObject.keys()) == {'/Fm0', '/Im0'}
+
+
+def test_prune_page_keeps_all_for_unreadable_stream(shared_pdf):
+    """测试内容流无法解码时不做裁剪"""
+    with pikepdf.open(shared_pdf) as pdf:
+        shared = pdf.pages[0].obj.Resources
+        pdf.pages[0].obj.Contents.write(b'BT /F1 12 Tf ET', filter=Name.FlateDecode)
+        assert ResourcePruner.prune_page(pdf.pages[0]) == 0
+        assert pdf.pages[0].obj.Resources.objgen == shared.objgen
+
+
+@pytest.mark.parametrize('prune', [True, False])
+def test_split_outputs_carry_used_resources(shared_pdf, tmp_path, prune):
+    """测试分割出的文件只带有页面用到的字体和图片"""
+    outputs = [(str(tmp_path / f"{prune}_{i}.pdf"), [i]) for i in range(4)]
+    SplitEngine(1, prune_resources=prune).split(shared_pdf, outputs)
+    sizes = [os.path.getsize(path) for path, _ in outputs]
+    if prune:
+        # 只有第4页用到图片
+        assert max(sizes[:3]) < 10000 < sizes[3]
+        with pikepdf.open(outputs[1][0]) as pdf:
+            assert set(pdf.pages[0].Resources.Font.keys()) == {'/F2'}
+    else:
+        assert min(sizes) > 60000
+
+
+def test_reorder_pages_prunes_resources(shared_pdf, tmp_path):
+    """测试重排页面时同样裁剪资源"""
+    output = str(tmp_path / 'reordered.pdf')
+    success, _ = PDFEditor.reorder_pages(shared_pdf, output, '3,1')
+    assert success
+    with pikepdf.open(output) as pdf:
+        assert [set(page.Resources.Font.keys()) for page in pdf.pages] == [{'/F1'}, {'/F1'}]
+    assert os.path.getsize(output) < 10000
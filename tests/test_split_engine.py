@@ -0,0 +1,67 @@
+import os
+import pikepdf
+import pytest
+from reportlab.pdfgen import canvas
+from src.core.progress import CancelToken, OperationCancelled, Progress
+from src.core.split_engine import SplitEngine
+from src.core.splitter import PDFSplitter
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """创建一个40页的测试PDF，每页写有页码"""
+    pdf_path = str(tmp_path / 'source.pdf')
+    c = canvas.Canvas(pdf_path)
+    for i in range(40):
+        c.drawString(100, 750, f"Page {i + 1}")
+        c.showPage()
+    c.save()
+    return pdf_path
+
+
+def _page_text(path):
+    with pikepdf.open(path) as pdf:
+        return [page.Contents.read_bytes() for page in pdf.pages]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_split_engine_writes_all_outputs(sample_pdf, tmp_path, workers):
+    """测试当前进程和进程池两种方式写出的文件内容一致"""
+    outputs = [(str(tmp_path / f"{workers}_{i}.pdf"), [i, 39 - i]) for i in range(20)]
+    progress = Progress()
+    total = SplitEngine(workers).split(sample_pdf, outputs, progress)
+
+    source = _page_text(sample_pdf)
+    for i, (path, pages) in enumerate(outputs):
+        assert _page_text(path) == [source[i], source[39 - i]]
+    assert total == sum(os.path.getsize(path) for path, _ in outputs)
+    assert (progress.done, progress.total, progress.bytes_written) == (20, 20, total)
+
+
+def test_split_engine_cancel(sample_pdf, tmp_path):
+    """测试取消后抛出 OperationCancelled"""
+    token = CancelToken()
+    token.cancel()
+    outputs = [(str(tmp_path / f"{i}.pdf"), [i]) for i in range(40)]
+    with pytest.raises(OperationCancelled):
+        SplitEngine(2).split(sample_pdf, outputs, Progress(token=token))
+
+
+def test_splitter_separate_files(sample_pdf, tmp_path):
+    """测试按页提取时文件名和页面对应"""
+    output_dir = str(tmp_path / 'pages')
+    success, message = PDFSplitter.split_pdf(sample_pdf, output_dir, [[3, 5], [7]], separate_files=True)
+    assert success, message
+    assert sorted(os.listdir(output_dir)) == ['source_第3页.pdf', 'source_第5页.pdf', 'source_第7页.pdf']
+    assert _page_text(os.path.join(output_dir, 'source_第5页.pdf')) == [_page_text(sample_pdf)[4]]
+
+
+def test_split_parses_source_once(sample_pdf, tmp_path, mocker):
+    """测试分割时源文件只被 pikepdf 打开一次"""
+    from src.core.editor import PDFEditor
+    opened = mocker.spy(pikepdf.Pdf, 'open')
+    success, message = PDFEditor.split_pdf(sample_pdf, str(tmp_path / 'editor'), ["1-3", "5"], workers=1)
+    assert success, message
+    success, message = PDFSplitter.split_pdf(sample_pdf, str(tmp_path / 'splitter'), [[1, 2]], workers=1)
+    assert success, message
+    assert opened.call_count == 2
@@ -0,0 +1,180 @@
+import os
+import pytest
+from PIL import Image
+from reportlab.pdfgen import canvas
+from src.core.cache import ThumbnailCache
+from src.core.converter import PDFConverter
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """创建一个20页的测试PDF"""
+    pdf_path = str(tmp_path / 'pages.pdf')
+    c = canvas.Canvas(pdf_path)
+    for i in range(20):
+        c.drawString(100, 750, f"Page {i + 1}")
+        c.showPage()
+    c.save()
+    return pdf_path
+
+
+@pytest.fixture
+def fake_renderer(monkeypatch):
+    """用纯色图片代替poppler渲染，记录每次渲染的页码范围"""
+    calls = []
+
+    def convert_from_path(pdf_path, dpi, first_page, last_page, size, **kwargs):
+        calls.append((first_page, last_page))
+        return [Image.new('RGB', (size[0], size[1]), (page % 256, 0, 0))
+                for page in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr('src.core.converter.convert_from_path', convert_from_path)
+    return calls
+
+
+def test_thumbnail_cache_put_get(tmp_path):
+    """测试缩略图按 (指纹, 页码, 尺寸) 保存和读取"""
+    cache = ThumbnailCache(str(tmp_path / 'thumbs'))
+    assert cache.get('ab' * 32, 1, (120, 160)) is None
+
+    path = cache.put('ab' * 32, 1, (120, 160), Image.new('RGB', (120, 160), 'red'))
+    assert cache.get('ab' * 32, 1, (120, 160)) == path
+    assert cache.get('ab' * 32, 2, (120, 160)) is None
+    assert cache.get('ab' * 32, 1, (60, 80)) is None
+    assert Image.open(path).size == (120, 160)
+
+
+def test_thumbnail_cache_evicts_least_recently_used(tmp_path):
+    """测试超过大小上限时淘汰最久未使用的缩略图"""
+    cache = ThumbnailCache(str(tmp_path / 'thumbs'))
+    paths = [cache.put('cd' * 32, page, (120, 160), Image.effect_noise((120, 160), 64))
+             for page in range(1, 6)]
+    # 让第1页成为最近使用的
+    for i, path in enumerate(paths):
+        os.utime(path, ns=(i * 10 ** 9, i * 10 ** 9))
+    cache.get('cd' * 32, 1, (120, 160))
+
+    cache.max_bytes = sum(os.path.getsize(path) for path in paths[:1] + paths[3:])
+    cache.evict()
+    assert [os.path.exists(path) for path in paths] == [True, False, False, True, True]
+
+
+def test_render_thumbnails_pairs_page_numbers(sample_pdf, fake_renderer):
+    """测试渲染结果与页码对应"""
+    thumbnails = PDFConverter.render_thumbnails(sample_pdf, 5, 7, (60, 80))
+    assert fake_renderer == [(5, 7)]
+    assert [page for page, _ in thumbnails] == [5, 6, 7]
+    assert thumbnails[0][1].getpixel((0, 0)) == (5, 0, 0)
+
+
+def test_visible_range():
+    """测试根据滚动位置计算可见页面，包含一屏预取"""
+    pytest.importorskip('PyQt6.QtGui')
+    from src.ui.thumbnail_service import visible_range
+    assert visible_range(0, 650, 100, 130) == range(0, 10)
+    assert visible_range(1300, 650, 100, 130) == range(9, 20)
+    assert visible_range(12500, 650, 100, 130) == range(96, 100)
+    assert visible_range(0, 650, 0, 130) == range(0)
+
+
+def test_thumbnail_service_renders_on_demand(qtbot, sample_pdf, fake_renderer):
+    """测试服务只渲染请求的页面，再次请求时直接使用缓存"""
+    from src.ui.thumbnail_service import ThumbnailService
+    service = ThumbnailService((60, 80))
+    success, page_count = service.set_document(sample_pdf)
+    assert success and page_count == 20
+
+    ready = []
+    service.thumbnailReady.connect(lambda path, page, image: ready.append((page, image.size().width())))
+    service.request([1, 2, 3, 10])
+    qtbot.waitUntil(lambda: len(ready) == 4)
+    assert sorted(fake_renderer) == [(1, 3), (10, 10)]
+    assert sorted(ready) == [(1, 60), (2, 60), (3, 60), (10, 60)]
+
+    # 内存缓存：立即返回，不再渲染
+    ready.clear()
+    service.request([2])
+    assert ready == [(2, 60)]
+
+    # 磁盘缓存：新的服务实例（清空内存缓存后）也不需要重新渲染
+    ThumbnailService._memory.clear()
+    other = ThumbnailService((60, 80))
+    other.set_document(sample_pdf)
+    other.thumbnailReady.connect(lambda path, page, image: ready.append((page, image.size().width())))
+    other.request([3])
+    qtbot.waitUntil(lambda: len(ready) == 2)
+    assert len(fake_renderer) == 2
+    service.shutdown()
+    other.shutdown()
+
+
+def test_render_task_skips_pages_cached_on_disk(qtbot, sample_pdf, fake_renderer):
+    """测试磁盘缓存中已有的页面不会因为夹在缺少的页面之间而被重新渲染"""
+    from src.ui.thumbnail_service import ThumbnailService
+    ThumbnailService._memory.clear()
+    service = ThumbnailService((60, 80))
+    service.set_document(sample_pdf)
+    ready = []
+    service.thumbnailReady.connect(lambda path, page, image: ready.append(page))
+    service.request([2, 5])
+    qtbot.waitUntil(lambda: len(ready) == 2)
+
+    ThumbnailService._memory.clear()
+    fake_renderer.clear()
+    ready.clear()
+    service.request(range(1, 7))
+    qtbot.waitUntil(lambda: len(ready) == 6)
+    assert fake_renderer == [(1, 1), (3, 4), (6, 6)]
+    assert sorted(ready) == [1, 2, 3, 4, 5, 6]
+    service.shutdown()
+
+
+def test_set_document_does_not_hash_file(qtbot, sample_pdf, fake_renderer, mocker):
+    """测试切换文件时不在界面线程中计算指纹，指纹在渲染线程中只计算一次"""
+    import threading
+    from src.core.probe import PDFProbe
+    from src.ui.thumbnail_service import ThumbnailService
+    ThumbnailService._memory.clear()
+    threads = []
+    fingerprint = PDFProbe.fingerprint
+    mocker.patch.object(PDFProbe, 'fingerprint',
+                        side_effect=lambda path: threads.append(threading.current_thread()) or fingerprint(path))
+
+    service = ThumbnailService((60, 80))
+    assert service.set_document(sample_pdf) == (True, 20)
+    assert threads == []
+
+    ready = []
+    service.thumbnailReady.connect(lambda path, page, image: ready.append(page))
+    service.request(list(range(1, 20, 2)))
+    qtbot.waitUntil(lambda: len(ready) == 10)
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+    service.shutdown()
+
+
+def test_thumbnail_service_retries_failed_pages(qtbot, sample_pdf, fake_renderer, monkeypatch):
+    """测试渲染失败的页面再次请求时重新渲染"""
+    from src.ui.thumbnail_service import ThumbnailService
+    ThumbnailService._memory.clear()
+    service = ThumbnailService((60, 80))
+    service._disk_cache = None
+    service.set_document(sample_pdf)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("渲染失败")
+
+    import src.core.converter as converter
+    renderer = converter.convert_from_path
+    failed, ready = [], []
+    service.failed.connect(lambda path, message: failed.append(message))
+    service.thumbnailReady.connect(lambda path, page, image: ready.append(page))
+    monkeypatch.setattr(converter, 'convert_from_path', broken)
+    service.request([4, 5])
+    qtbot.waitUntil(lambda: len(failed) == 1)
+    assert ready == []
+
+    monkeypatch.setattr(converter, 'convert_from_path', renderer)
+    service.request([4, 5])
+    qtbot.waitUntil(lambda: len(ready) == 2)
+    assert sorted(ready) == [4, 5] and fake_renderer == [(4, 5)]
+    service.shutdown()